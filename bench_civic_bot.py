@@ -0,0 +1,215 @@
+"""Latency / throughput / memory benchmark for the next_gen_civic_bot hot paths.
+
+For each corpus scale (1 = the bundled ``train_topic_data.csv`` + ``hf_combined.csv``,
+N = a synthetic corpus N times larger) a fresh interpreter loads the datastore and
+times
+
+* ``load``                - ``CivicDataStore.load`` (one run);
+* ``infer_topic``         - one call per sampled query;
+* ``find_related_posts``  - one call per sampled query;
+* ``respond``             - ``NextGenCivicBot.respond`` over mixed complaint/info/status queries;
+* ``run_follow_up_cycle`` - one cycle per simulated hour over the tickets ``respond`` opened,
+
+reporting throughput, p50/p95/p99 latency and the process's peak RSS as JSON.
+
+    python bench_civic_bot.py --scales 1,10,100 --output bench.json
+    python bench_civic_bot.py --baseline bench.json        # exits 1 on regression
+
+Synthetic rows copy the originals, drop one word and add a per-copy marker token, so
+vocabulary and posting lists grow with the scale instead of collapsing to duplicates.
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+import math
+import multiprocessing
+import random
+import resource
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List
+
+from next_gen_civic_bot import SCORING_MODES, CivicDataStore, NextGenCivicBot
+
+TRAIN_FILE = "train_topic_data.csv"
+REDDIT_FILE = "hf_combined.csv"
+WARDS = [str(ward) for ward in range(1, 21)]
+STATUS_QUERIES = ["status of TKT-0001", "what is the status of TKT-0002"]
+FOLLOW_UP_HOURS = 24 * 6
+
+# Per-operation metrics compared against a baseline (higher is worse); peak RSS is compared too.
+COMPARED = ("seconds", "p95_ms")
+# Absolute increases below these are timer/allocator noise, whatever the ratio.
+NOISE_FLOOR = {"seconds": 0.05, "p95_ms": 1.0, "peak_rss_bytes": 4 * 1024 * 1024}
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100.0 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(latencies: List[float]) -> Dict[str, float]:
+    ordered = sorted(latencies)
+    total = sum(ordered)
+    return {
+        "count": len(ordered),
+        "seconds": round(total, 6),
+        "throughput_per_s": round(len(ordered) / total, 1) if total else 0.0,
+        "p50_ms": round(percentile(ordered, 50) * 1000, 4),
+        "p95_ms": round(percentile(ordered, 95) * 1000, 4),
+        "p99_ms": round(percentile(ordered, 99) * 1000, 4),
+    }
+
+
+def timed(call: Callable[[object], object], args: Iterable[object]) -> List[float]:
+    latencies = []
+    for arg in args:
+        started = time.perf_counter()
+        call(arg)
+        latencies.append(time.perf_counter() - started)
+    return latencies
+
+
+def write_scaled(source: str, target: Path, scale: int, seed: int) -> None:
+    """Writes ``scale`` perturbed copies of every row of ``source`` to ``target``."""
+    rng = random.Random(seed)
+    with open(source, newline="", encoding="utf-8") as src, target.open("w", newline="", encoding="utf-8") as dst:
+        reader = csv.DictReader(src)
+        writer = csv.DictWriter(dst, fieldnames=reader.fieldnames)
+        writer.writeheader()
+        rows = list(reader)
+        for copy in range(scale):
+            for row in rows:
+                if copy:
+                    words = (row.get("text") or "").split()
+                    if len(words) > 1:
+                        del words[rng.randrange(len(words))]
+                    row = dict(row, text=" ".join(words + [f"syn{copy}"]))
+                writer.writerow(row)
+
+
+def sample_queries(train_file: str, count: int, seed: int) -> List[str]:
+    with open(train_file, newline="", encoding="utf-8") as fp:
+        texts = [row["text"] for row in csv.DictReader(fp) if (row.get("text") or "").strip()]
+    return random.Random(seed).sample(texts, min(count, len(texts)))
+
+
+def run_scale(job: Dict[str, object]) -> Dict[str, object]:
+    """Benchmarks one corpus; runs in its own process so peak RSS is per scale."""
+    queries: List[str] = job["queries"]
+    datastore = CivicDataStore(job["train_file"], job["reddit_file"], scoring=job["scoring"])
+    started = time.perf_counter()
+    datastore.load()
+    load_seconds = time.perf_counter() - started
+
+    bot = NextGenCivicBot(datastore, predictive_threshold=3, escalation_threshold=5)
+    items = [(f"user{i}", WARDS[i % len(WARDS)], query) for i, query in enumerate(queries)]
+    items += [("user0", WARDS[0], query) for query in STATUS_QUERIES]
+    start = datetime.utcnow()
+    cycles = [start + timedelta(hours=hour) for hour in range(1, FOLLOW_UP_HOURS + 1)]
+
+    return {
+        "scale": job["scale"],
+        "corpus_docs": len(datastore.corpus_texts),
+        "topics": len(datastore.topic_matrix.labels),
+        "vocabulary": len(datastore.vocab),
+        "load": {"seconds": round(load_seconds, 4)},
+        "infer_topic": summarize(timed(datastore.infer_topic, queries)),
+        "find_related_posts": summarize(timed(datastore.find_related_posts, queries)),
+        "respond": summarize(timed(lambda item: bot.respond(*item), items)),
+        "run_follow_up_cycle": dict(summarize(timed(bot.run_follow_up_cycle, cycles)), tickets=len(bot.tickets)),
+        "peak_rss_bytes": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024,
+    }
+
+
+def compare(report: Dict[str, object], baseline: Dict[str, object], tolerance: float) -> List[str]:
+    """Human-readable regressions: any compared metric more than ``tolerance`` higher."""
+    regressions = []
+    previous = {entry["scale"]: entry for entry in baseline.get("scales", [])}
+    for entry in report["scales"]:
+        old = previous.get(entry["scale"])
+        if old is None:
+            continue
+        checks = [("peak_rss_bytes", "peak_rss_bytes", entry["peak_rss_bytes"], old.get("peak_rss_bytes"))]
+        for section, values in entry.items():
+            if isinstance(values, dict):
+                old_values = old.get(section) or {}
+                checks += [
+                    (f"{section}.{metric}", metric, values[metric], old_values.get(metric))
+                    for metric in COMPARED
+                    if metric in values
+                ]
+        for name, metric, value, before in checks:
+            if before and value > before * (1.0 + tolerance) and value - before > NOISE_FLOOR[metric]:
+                regressions.append(f"scale {entry['scale']}x {name}: {before} -> {value} (+{value / before - 1:.0%})")
+    return regressions
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark next_gen_civic_bot hot paths")
+    parser.add_argument("--scales", default="1,10,100", help="comma-separated corpus scale factors")
+    parser.add_argument("--queries", type=int, default=300, help="queries sampled per operation")
+    parser.add_argument("--scoring", choices=SCORING_MODES, default="bm25", help="related-post ranking")
+    parser.add_argument("--seed", type=int, default=7, help="seed for query sampling and synthetic rows")
+    parser.add_argument("--workdir", default="", help="where synthetic corpora are written (default: temp dir)")
+    parser.add_argument("--output", default="", help="write the JSON report here as well as stdout")
+    parser.add_argument("--baseline", default="", help="earlier report to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown/growth vs the baseline")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    scales = [int(scale) for scale in args.scales.split(",") if scale.strip()]
+    queries = sample_queries(TRAIN_FILE, args.queries, args.seed)
+    context = multiprocessing.get_context("spawn")
+
+    report: Dict[str, object] = {"queries": len(queries), "scoring": args.scoring, "scales": []}
+    with tempfile.TemporaryDirectory(dir=args.workdir or None) as workdir:
+        for scale in scales:
+            train_file, reddit_file = TRAIN_FILE, REDDIT_FILE
+            if scale > 1:
+                train_file = str(Path(workdir) / f"train_x{scale}.csv")
+                reddit_file = str(Path(workdir) / f"posts_x{scale}.csv")
+                write_scaled(TRAIN_FILE, Path(train_file), scale, args.seed)
+                write_scaled(REDDIT_FILE, Path(reddit_file), scale, args.seed)
+            job = {
+                "scale": scale,
+                "train_file": train_file,
+                "reddit_file": reddit_file,
+                "scoring": args.scoring,
+                "queries": queries,
+            }
+            with context.Pool(1) as pool:
+                report["scales"].append(pool.apply(run_scale, (job,)))
+            if scale > 1:
+                Path(train_file).unlink()
+                Path(reddit_file).unlink()
+
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        Path(args.output).write_text(text + "\n", encoding="utf-8")
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        regressions = compare(report, baseline, args.tolerance)
+        if regressions:
+            print(f"REGRESSION vs {args.baseline} (tolerance {args.tolerance:.0%}):", file=sys.stderr)
+            for line in regressions:
+                print(f"  {line}", file=sys.stderr)
+            sys.exit(1)
+        print(f"No regressions vs {args.baseline} (tolerance {args.tolerance:.0%}).", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""Memory benchmark: bytes per complaint for the legacy vs compact bot records.
+
+Registers N synthetic complaints (default 1M) into
+
+* ``legacy``  - the original dict-backed ``Complaint``/``Ticket`` dataclasses, with
+  complaints referenced from both ``complaints_by_key`` and ``Ticket.complaints``;
+* ``compact`` - ``NextGenCivicBot`` with slotted records, interned ward/topic/action
+  ids, epoch-second timestamps and array-backed complaint ids / action logs,
+
+and reports traced bytes per complaint for each.
+
+    python bench_memory_layout.py --count 1000000
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import time
+import tracemalloc
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Tuple
+
+from next_gen_civic_bot import CivicDataStore, Complaint, NextGenCivicBot
+
+DESCRIPTIONS = [f"synthetic complaint #{i}: water, garbage or road problem near the bus stop" for i in range(64)]
+
+
+@dataclass
+class LegacyComplaint:
+    user_id: str
+    ward: str
+    issue_type: str
+    description: str
+    created_at: datetime = field(default_factory=datetime.utcnow)
+
+
+@dataclass
+class LegacyTicket:
+    ticket_id: str
+    ward: str
+    issue_type: str
+    complaints: List[LegacyComplaint]
+    created_at: datetime = field(default_factory=datetime.utcnow)
+    status: str = "open"
+    last_action: str = "Ticket created"
+    action_log: List[Tuple[datetime, str]] = field(default_factory=list)
+
+    def __post_init__(self) -> None:
+        self.action_log.append((self.created_at, self.last_action))
+
+
+def synthetic_row(i: int, wards: int, topics: int) -> Tuple[str, str, str, str]:
+    return f"user{i % 50000}", str(i % wards), f"Topic {i % topics}", DESCRIPTIONS[i % len(DESCRIPTIONS)]
+
+
+def fill_legacy(count: int, wards: int, topics: int) -> object:
+    complaints_by_key: Dict[Tuple[str, str], List[LegacyComplaint]] = defaultdict(list)
+    open_tickets: Dict[Tuple[str, str], LegacyTicket] = {}
+    tickets: Dict[str, LegacyTicket] = {}
+    for i in range(count):
+        user_id, ward, topic, description = synthetic_row(i, wards, topics)
+        complaint = LegacyComplaint(user_id=user_id, ward=ward, issue_type=topic, description=description)
+        key = (ward, topic)
+        complaints_by_key[key].append(complaint)
+        ticket = open_tickets.get(key)
+        if ticket is None:
+            ticket_id = f"TKT-{len(tickets) + 1:04d}"
+            ticket = open_tickets[key] = tickets[ticket_id] = LegacyTicket(ticket_id, ward, topic, [])
+        ticket.complaints.append(complaint)
+    return complaints_by_key, tickets
+
+
+def fill_compact(count: int, wards: int, topics: int) -> object:
+    bot = NextGenCivicBot(CivicDataStore())
+    for i in range(count):
+        user_id, ward, topic, description = synthetic_row(i, wards, topics)
+        bot.add_complaint(Complaint(user_id=user_id, ward=ward, issue_type=topic, description=description))
+    return bot
+
+
+def measure(fill, count: int, wards: int, topics: int) -> Dict[str, float]:
+    gc.collect()
+    tracemalloc.start()
+    start_bytes, _ = tracemalloc.get_traced_memory()
+    started = time.perf_counter()
+    state = fill(count, wards, topics)
+    elapsed = time.perf_counter() - started
+    gc.collect()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del state
+    return {
+        "bytes": current - start_bytes,
+        "peak_bytes": peak - start_bytes,
+        "bytes_per_complaint": round((current - start_bytes) / count, 1),
+        "seconds": round(elapsed, 3),
+    }
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Bytes per complaint: legacy vs compact records")
+    parser.add_argument("--count", type=int, default=1_000_000, help="synthetic complaints to register")
+    parser.add_argument("--wards", type=int, default=200, help="distinct wards")
+    parser.add_argument("--topics", type=int, default=40, help="distinct topics")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    report = {
+        "count": args.count,
+        "legacy": measure(fill_legacy, args.count, args.wards, args.topics),
+        "compact": measure(fill_compact, args.count, args.wards, args.topics),
+    }
+    report["reduction"] = round(report["legacy"]["bytes"] / max(1, report["compact"]["bytes"]), 2)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
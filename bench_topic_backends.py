@@ -0,0 +1,229 @@
+"""Accuracy / throughput / memory benchmark for the topic classification backends.
+
+Every backend is trained (or was fine-tuned) on the same stratified 80% split of
+``train_topic_data.csv`` that ``train_e5_classifier.py`` uses, and is scored on the
+held-out 20%:
+
+* ``rules``  - ``CivicDataStore.infer_topics`` (token-overlap topic scores);
+* ``tfidf``  - ``HybridAIEngine`` with ``label_topic`` as the category, nearest-row match;
+* any ``--model NAME=DIR`` - a classifier directory served by the API: an E5 checkpoint
+  from ``train_e5_classifier.py`` or a student from ``scripts/distill_topic_classifier.py``.
+  ``models/e5_topic_classifier`` and its ``-hashed`` / ``-L2`` students are picked up
+  by default when present.
+
+Each (backend, thread count) pair runs in a fresh interpreter, so load time and peak
+RSS belong to that backend alone, and is timed at every batch size. Latency
+percentiles are per call, i.e. per batch. The pure-Python rules are single-threaded
+and only run at the first thread count. Backends whose model or runtime is missing
+are listed under ``skipped``.
+
+    python bench_topic_backends.py --threads 1,4 --batch-sizes 1,8,32,128 --output topics.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import importlib.util
+import json
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from bench_civic_bot import percentile
+
+TRAIN_FILE = "train_topic_data.csv"
+BACKEND_DIR = str(Path(__file__).resolve().parent / "civicai" / "backend")
+DEFAULT_MODEL_DIR = "models/e5_topic_classifier"
+# Same held-out split as train_e5_classifier.py.
+TEST_SIZE = 0.2
+SPLIT_SEED = 42
+BUILTIN_BACKENDS = ("rules", "tfidf")
+
+
+def split_rows(train_file: str):
+    from sklearn.model_selection import train_test_split
+
+    with open(train_file, newline="", encoding="utf-8") as fp:
+        rows = [row for row in csv.DictReader(fp) if (row.get("text") or "").strip()]
+    labels = [(row.get("label_topic") or "Unknown").strip() for row in rows]
+    return train_test_split(rows, test_size=TEST_SIZE, random_state=SPLIT_SEED, stratify=labels)
+
+
+def write_training_files(train_rows: List[Dict[str, str]], workdir: Path) -> Dict[str, str]:
+    """The training split in the layouts ``CivicDataStore`` and ``HybridAIEngine`` read."""
+    paths = {"rules": str(workdir / "train.csv"), "posts": str(workdir / "posts.csv"), "tfidf": str(workdir / "kb.csv")}
+    with open(paths["rules"], "w", newline="", encoding="utf-8") as fp:
+        writer = csv.writer(fp)
+        writer.writerow(["source", "text", "label_topic"])
+        writer.writerows([row.get("source", ""), row["text"], row["label_topic"]] for row in train_rows)
+    Path(paths["posts"]).write_text("source,text\n", encoding="utf-8")
+    with open(paths["tfidf"], "w", newline="", encoding="utf-8") as fp:
+        writer = csv.writer(fp)
+        writer.writerow(["text", "category", "solution", "department", "location", "resolved_status"])
+        writer.writerows([row["text"], row["label_topic"], "", "", "", ""] for row in train_rows)
+    return paths
+
+
+def default_models() -> Dict[str, str]:
+    candidates = {"e5": DEFAULT_MODEL_DIR, "hashed": f"{DEFAULT_MODEL_DIR}-hashed", "e5-L2": f"{DEFAULT_MODEL_DIR}-L2"}
+    return {name: path for name, path in candidates.items() if Path(path).is_dir()}
+
+
+def missing_runtime(model_dir: str, runtime: str) -> Optional[str]:
+    """Why a classifier directory cannot be benchmarked here, or ``None``."""
+    if not Path(model_dir).is_dir():
+        return f"{model_dir} not found"
+    if (Path(model_dir) / "hashed_ngram.npz").exists():
+        return None
+    needed = ["transformers", "onnxruntime" if runtime == "onnx" else "torch"]
+    absent = [name for name in needed if importlib.util.find_spec(name) is None]
+    return f"{', '.join(absent)} not installed" if absent else None
+
+
+def load_backend(job: Dict[str, object]) -> Callable[[List[str]], List[str]]:
+    """Batch predictor for the job's backend: texts -> topic labels."""
+    name, threads = job["backend"], job["threads"]
+    if name == "rules":
+        from next_gen_civic_bot import CivicDataStore
+
+        datastore = CivicDataStore(job["files"]["rules"], job["files"]["posts"])
+        datastore.load()
+        return lambda texts: [topic for topic, _ in datastore.infer_topics(texts)]
+
+    sys.path.insert(0, BACKEND_DIR)
+    if name == "tfidf":
+        from app.services.ai_engine import HybridAIEngine
+
+        engine = HybridAIEngine(job["files"]["tfidf"], cache_size=0)
+        return lambda texts: [result.match.category for result in engine.query_batch(texts, k=1)]
+
+    from app.services.topic_classifier import open_topic_classifier
+
+    classifier = open_topic_classifier(job["model_dir"], backend=job["runtime"], num_threads=threads)
+    classifier.load()
+    return lambda texts: [prediction.label for prediction in classifier.predict_batch(texts)]
+
+
+def run_backend(job: Dict[str, object]) -> Dict[str, object]:
+    """Benchmarks one backend at one thread count; runs in its own process."""
+    try:
+        from threadpoolctl import threadpool_limits
+
+        threadpool_limits(job["threads"])  # BLAS/OpenMP pools of NumPy and SciPy
+    except ImportError:
+        pass
+    texts: List[str] = job["texts"]
+    labels: List[str] = job["labels"]
+    started = time.perf_counter()
+    predict = load_backend(job)
+    load_seconds = time.perf_counter() - started
+    predict(texts[:8])  # warm-up
+
+    runs = []
+    for batch_size in job["batch_sizes"]:
+        latencies: List[float] = []
+        predictions: List[str] = []
+        for start in range(0, len(texts), batch_size):
+            began = time.perf_counter()
+            predictions.extend(predict(texts[start:start + batch_size]))
+            latencies.append(time.perf_counter() - began)
+        ordered = sorted(latencies)
+        runs.append({
+            "batch_size": batch_size,
+            "accuracy": round(sum(p == l for p, l in zip(predictions, labels)) / len(labels), 4),
+            "items_per_s": round(len(texts) / sum(latencies), 1),
+            "p50_ms": round(percentile(ordered, 50) * 1000, 3),
+            "p95_ms": round(percentile(ordered, 95) * 1000, 3),
+            "p99_ms": round(percentile(ordered, 99) * 1000, 3),
+        })
+    return {
+        "backend": job["backend"],
+        "threads": job["threads"],
+        "load_seconds": round(load_seconds, 3),
+        "peak_rss_bytes": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024,
+        "runs": runs,
+    }
+
+
+def format_table(results: List[Dict[str, object]]) -> str:
+    lines = [f"{'backend':<16}{'threads':>8}{'batch':>7}{'accuracy':>10}{'items/s':>11}{'p50 ms':>10}{'p99 ms':>10}{'RSS MB':>9}"]
+    for result in results:
+        for run in result["runs"]:
+            lines.append(
+                f"{result['backend']:<16}{result['threads']:>8}{run['batch_size']:>7}{run['accuracy']:>10.4f}"
+                f"{run['items_per_s']:>11.1f}{run['p50_ms']:>10.3f}{run['p99_ms']:>10.3f}{result['peak_rss_bytes'] / 2**20:>9.0f}"
+            )
+    return "\n".join(lines)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark topic classification backends")
+    parser.add_argument("--backends", default="rules,tfidf", help=f"built-in backends to run, from {BUILTIN_BACKENDS}")
+    parser.add_argument("--model", action="append", default=[], metavar="NAME=DIR", help="classifier directory to include (repeatable)")
+    parser.add_argument("--runtime", choices=("torch", "onnx"), default="torch", help="runtime for E5 checkpoints")
+    parser.add_argument("--threads", default=f"1,{os.cpu_count() or 1}", help="comma-separated thread counts")
+    parser.add_argument("--batch-sizes", default="1,8,32,128", help="comma-separated batch sizes")
+    parser.add_argument("--limit", type=int, default=2000, help="held-out items scored (0 = all)")
+    parser.add_argument("--train-file", default=TRAIN_FILE)
+    parser.add_argument("--output", default="", help="write the JSON report here")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    threads = sorted({int(n) for n in args.threads.split(",") if n.strip()})
+    batch_sizes = [int(n) for n in args.batch_sizes.split(",") if n.strip()]
+    models = dict(item.split("=", 1) for item in args.model) if args.model else default_models()
+
+    train_rows, test_rows = split_rows(args.train_file)
+    if args.limit:
+        test_rows = test_rows[: args.limit]
+    texts = [row["text"] for row in test_rows]
+    labels = [row["label_topic"].strip() for row in test_rows]
+
+    jobs, skipped = [], {}
+    for name in [n.strip() for n in args.backends.split(",") if n.strip()]:
+        if name not in BUILTIN_BACKENDS:
+            raise SystemExit(f"Unknown backend {name!r}; expected one of {BUILTIN_BACKENDS}")
+        jobs.extend({"backend": name, "threads": n} for n in (threads[:1] if name == "rules" else threads))
+    for name, model_dir in models.items():
+        reason = missing_runtime(model_dir, args.runtime)
+        if reason:
+            skipped[name] = reason
+            continue
+        jobs.extend({"backend": name, "model_dir": model_dir, "runtime": args.runtime, "threads": n} for n in threads)
+
+    context = multiprocessing.get_context("spawn")
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        files = write_training_files(train_rows, Path(workdir))
+        for job in jobs:
+            job.update(files=files, texts=texts, labels=labels, batch_sizes=batch_sizes)
+            print(f"running {job['backend']} ({job['threads']} threads)...", file=sys.stderr)
+            with context.Pool(1) as pool:
+                results.append(pool.apply(run_backend, (job,)))
+
+    report = {
+        "train_items": len(train_rows),
+        "test_items": len(texts),
+        "cpu_count": os.cpu_count(),
+        "results": results,
+        "skipped": skipped,
+    }
+    print(format_table(results))
+    for name, reason in skipped.items():
+        print(f"skipped {name}: {reason}")
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+    else:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""The data routes of :mod:`app.api.routes` on ``AsyncSession`` (``ASYNC_MODE=true``).
+
+Request handlers run on the event loop: database round trips are awaited, and
+similarity matching runs on the bounded ``match_workers`` pool, so a slow commit does
+not hold up matching for other requests and a burst of matching does not hold up
+commits. Queries that are plain SQLAlchemy ORM code (history, analytics, the status
+load) run through ``AsyncSession.run_sync``.
+"""
+
+from datetime import date
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.routes import bulk_complaints, get_service, require_admin
+from app.db.session import get_async_db
+from app.schemas.contracts import ChatBatchRequest, ChatBatchResponse, ChatRequest, ChatResponse, ComplaintRequest, ComplaintResponse, FeedbackRequest, TicketStatusRequest
+from app.services.analytics import summarize
+from app.services.grievance_service import GrievanceService, run_matching
+from app.services.history import history_page
+from app.services.status_cache import ticket_status_async
+
+router = APIRouter()
+# Parsing and filing run in the threadpool on a sync session either way.
+router.post("/complaints/bulk")(bulk_complaints)
+
+
+@router.post("/chat", response_model=ChatResponse)
+async def chat(payload: ChatRequest, db: AsyncSession = Depends(get_async_db), service: GrievanceService = Depends(get_service)):
+    reply, level, conf, similar, tracking_id = await service.process_chat_async(db, payload.user_id, payload.message, payload.location)
+    return ChatResponse(reply=reply, level=level, confidence=conf, similar_cases=similar, tracking_id=tracking_id)
+
+
+@router.post("/chat/batch", response_model=ChatBatchResponse)
+async def chat_batch(payload: ChatBatchRequest, db: AsyncSession = Depends(get_async_db), service: GrievanceService = Depends(get_service)):
+    outcomes = await service.process_chat_batch_async(db, [(m.user_id, m.message, m.location) for m in payload.messages])
+    return ChatBatchResponse(
+        results=[
+            ChatResponse(reply=reply, level=level, confidence=conf, similar_cases=similar, tracking_id=tracking_id)
+            for reply, level, conf, similar, tracking_id in outcomes
+        ]
+    )
+
+
+@router.post("/complaint", response_model=ComplaintResponse)
+async def complaint(payload: ComplaintRequest, db: AsyncSession = Depends(get_async_db), service: GrievanceService = Depends(get_service)):
+    match = await run_matching(service.ai.match, payload.text)
+    severity = service.ai.predict_severity(payload.text)
+    tracking = await service.create_ticket_async(db, payload.user_id, payload.text, match.category, payload.location, severity, match.department)
+    return ComplaintResponse(tracking_id=tracking, level=2, authority=match.department, status="OPEN")
+
+
+@router.get("/status/{ticket_id}")
+async def status(ticket_id: str, db: AsyncSession = Depends(get_async_db)):
+    payload = await ticket_status_async(db, ticket_id)
+    if payload is None:
+        raise HTTPException(status_code=404, detail="Ticket not found")
+    return payload
+
+
+@router.get("/history/{user_id}")
+async def history(
+    user_id: str,
+    response: Response,
+    limit: int = Query(50, ge=1, le=500),
+    cursor: str = "",
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Newest first; the ``X-Next-Cursor`` header, when present, fetches the next page."""
+    try:
+        items, next_cursor = await db.run_sync(history_page, user_id, limit, cursor or None)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return [{"text": c.text, "category": c.category, "location": c.location, "level": c.level} for c in items]
+
+
+@router.post("/feedback")
+async def feedback(payload: FeedbackRequest, db: AsyncSession = Depends(get_async_db), service: GrievanceService = Depends(get_service)):
+    await service.add_feedback_async(db, payload.user_id, payload.tracking_id, payload.rating, payload.comment)
+    return {"ok": True}
+
+
+@router.get("/analytics")
+async def analytics(start: Optional[date] = None, end: Optional[date] = None, db: AsyncSession = Depends(get_async_db)):
+    return await db.run_sync(summarize, start, end)
+
+
+@router.post("/admin/tickets/{ticket_id}/status", dependencies=[Depends(require_admin)])
+async def admin_ticket_status(
+    ticket_id: str, payload: TicketStatusRequest, db: AsyncSession = Depends(get_async_db), service: GrievanceService = Depends(get_service)
+):
+    if not await service.set_status_async(db, ticket_id, payload.status.upper()):
+        raise HTTPException(status_code=404, detail="Ticket not found")
+    return await ticket_status_async(db, ticket_id)
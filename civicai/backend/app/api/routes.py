@@ -1,60 +1,192 @@
-from collections import Counter
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy import select
+from datetime import date
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
 from app.core.config import settings
 from app.db.session import get_db
-from app.models.entities import Complaint, Feedback, Log, Ticket
-from app.schemas.contracts import ChatRequest, ChatResponse, ComplaintRequest, ComplaintResponse, FeedbackRequest
-from app.services.ai_engine import HybridAIEngine
+from app.schemas.contracts import ChatBatchRequest, ChatBatchResponse, ChatRequest, ChatResponse, ComplaintRequest, ComplaintResponse, FeedbackRequest, TicketStatusRequest
+from app.services.analytics import summarize
+from app.services.bulk_ingest import BulkIngester
+from app.services.engine_registry import EngineRegistry
 from app.services.grievance_service import GrievanceService
+from app.services.history import history_page, stream_export
+from app.services.status_cache import status_cache, ticket_status
+from app.services.topic_classifier import MicroBatcher, open_topic_classifier
 
 router = APIRouter()
-ai_engine = HybridAIEngine(settings.data_file)
-service = GrievanceService(ai_engine)
+admin_router = APIRouter()  # admin routes shared by both modes; none uses the request's session
+topic_classifier = None
+if settings.classifier_dir:
+    _classifier = open_topic_classifier(
+        settings.classifier_dir,
+        backend=settings.classifier_backend,
+        quantize=settings.classifier_quantize,
+        num_threads=settings.classifier_threads,
+    )
+    topic_classifier = MicroBatcher(_classifier.predict_batch, settings.classifier_max_batch, settings.classifier_max_wait_ms)
+dense_options = {}
+if settings.embedding_store:
+    from app.services.embedding_store import E5Encoder, EmbeddingStore
+
+    _encoder = E5Encoder(settings.embedding_model_dir or settings.classifier_dir, num_threads=settings.classifier_threads)
+    dense_options = dict(
+        embeddings=EmbeddingStore(settings.embedding_store),
+        query_encoder=MicroBatcher(_encoder.encode_queries, settings.classifier_max_batch, settings.classifier_max_wait_ms),
+        dense_weight=settings.dense_weight,
+        dense_candidates=settings.dense_candidates,
+    )
+registry = EngineRegistry(
+    settings.data_file,
+    settings.model_store,
+    cache_size=settings.query_cache_size,
+    cache_ttl=settings.query_cache_ttl,
+    search_mode=settings.search_mode,
+    n_lists=settings.ann_lists,
+    nprobe=settings.ann_nprobe,
+    classifier=topic_classifier,
+    classifier_min_confidence=settings.classifier_min_confidence,
+    **dense_options,
+)
+
+
+def get_service() -> GrievanceService:
+    """The current grievance service; a request keeps the one it started with across reloads."""
+    return registry.service
+
+
+def require_admin(x_admin_token: str = Header(default="")) -> None:
+    if settings.admin_token and x_admin_token != settings.admin_token:
+        raise HTTPException(status_code=403, detail="Admin token required")
 
 
 @router.post("/chat", response_model=ChatResponse)
-def chat(payload: ChatRequest, db: Session = Depends(get_db)):
+def chat(payload: ChatRequest, db: Session = Depends(get_db), service: GrievanceService = Depends(get_service)):
     reply, level, conf, similar, tracking_id = service.process_chat(db, payload.user_id, payload.message, payload.location)
     return ChatResponse(reply=reply, level=level, confidence=conf, similar_cases=similar, tracking_id=tracking_id)
 
 
+@router.post("/chat/batch", response_model=ChatBatchResponse)
+def chat_batch(payload: ChatBatchRequest, db: Session = Depends(get_db), service: GrievanceService = Depends(get_service)):
+    outcomes = service.process_chat_batch(db, [(m.user_id, m.message, m.location) for m in payload.messages])
+    return ChatBatchResponse(
+        results=[
+            ChatResponse(reply=reply, level=level, confidence=conf, similar_cases=similar, tracking_id=tracking_id)
+            for reply, level, conf, similar, tracking_id in outcomes
+        ]
+    )
+
+
 @router.post("/complaint", response_model=ComplaintResponse)
-def complaint(payload: ComplaintRequest, db: Session = Depends(get_db)):
-    match = ai_engine.match(payload.text)
-    severity = ai_engine.predict_severity(payload.text)
+def complaint(payload: ComplaintRequest, db: Session = Depends(get_db), service: GrievanceService = Depends(get_service)):
+    match = service.ai.match(payload.text)
+    severity = service.ai.predict_severity(payload.text)
     tracking = service.create_ticket(db, payload.user_id, payload.text, match.category, payload.location, severity, match.department)
     return ComplaintResponse(tracking_id=tracking, level=2, authority=match.department, status="OPEN")
 
 
+@router.post("/complaints/bulk")
+async def bulk_complaints(
+    request: Request,
+    fmt: str = Query("csv", alias="format", pattern="^(csv|ndjson)$"),
+    db: Session = Depends(get_db),
+    service: GrievanceService = Depends(get_service),
+):
+    """CSV or NDJSON rows of ``user_id``, ``text``, ``location``; one NDJSON result per row.
+
+    Rows are filed in chunks while the upload is still arriving; results are sent once
+    it has been read (the response stream and the request body share one receive channel).
+    """
+    ingester = BulkIngester(service, db, fmt)
+    consumed = False
+    try:
+        async for data in request.stream():
+            await run_in_threadpool(ingester.feed, data)
+        await run_in_threadpool(ingester.close)
+        consumed = True
+    except ValueError as exc:
+        detail = f"{exc} ({ingester.filed} rows already filed)" if ingester.filed else str(exc)
+        raise HTTPException(status_code=400, detail=detail)
+    finally:
+        if not consumed:  # iter_results, which closes the spool, will not run
+            ingester.results.close()
+    return StreamingResponse(ingester.iter_results(), media_type="application/x-ndjson")
+
+
 @router.get("/status/{ticket_id}")
 def status(ticket_id: str, db: Session = Depends(get_db)):
-    ticket = db.scalar(select(Ticket).where(Ticket.tracking_id == ticket_id))
-    if not ticket:
+    payload = ticket_status(db, ticket_id)
+    if payload is None:
         raise HTTPException(status_code=404, detail="Ticket not found")
-    logs = db.scalars(select(Log).where(Log.tracking_id == ticket_id)).all()
-    return {"tracking_id": ticket_id, "status": ticket.status, "authority": ticket.authority, "logs": [l.message for l in logs]}
+    return payload
 
 
 @router.get("/history/{user_id}")
-def history(user_id: str, db: Session = Depends(get_db)):
-    items = db.scalars(select(Complaint).where(Complaint.user_id == user_id)).all()
+def history(
+    user_id: str,
+    response: Response,
+    limit: int = Query(50, ge=1, le=500),
+    cursor: str = "",
+    db: Session = Depends(get_db),
+):
+    """Newest first; the ``X-Next-Cursor`` header, when present, fetches the next page."""
+    try:
+        items, next_cursor = history_page(db, user_id, limit, cursor or None)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     return [{"text": c.text, "category": c.category, "location": c.location, "level": c.level} for c in items]
 
 
 @router.post("/feedback")
-def feedback(payload: FeedbackRequest, db: Session = Depends(get_db)):
+def feedback(payload: FeedbackRequest, db: Session = Depends(get_db), service: GrievanceService = Depends(get_service)):
     service.add_feedback(db, payload.user_id, payload.tracking_id, payload.rating, payload.comment)
     return {"ok": True}
 
 
 @router.get("/analytics")
-def analytics(db: Session = Depends(get_db)):
-    complaints = db.scalars(select(Complaint)).all()
-    tickets = db.scalars(select(Ticket)).all()
-    by_category = Counter(c.category for c in complaints)
-    by_area = Counter(c.location for c in complaints)
-    sla_open = sum(1 for t in tickets if t.status != "RESOLVED")
-    return {"total_complaints": len(complaints), "total_tickets": len(tickets), "by_category": by_category, "by_area": by_area, "sla_open": sla_open}
+def analytics(start: Optional[date] = None, end: Optional[date] = None, db: Session = Depends(get_db)):
+    return summarize(db, start, end)
+
+
+@admin_router.post("/admin/reload", status_code=202, dependencies=[Depends(require_admin)])
+def admin_reload():
+    started = registry.reload()
+    return {"started": started, **registry.status()}
+
+
+@admin_router.get("/admin/export/complaints", dependencies=[Depends(require_admin)])
+def admin_export(
+    fmt: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$"),
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+):
+    media_type = "text/csv" if fmt == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        stream_export(fmt, start, end),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="complaints.{fmt}"'},
+    )
+
+
+@router.post("/admin/tickets/{ticket_id}/status", dependencies=[Depends(require_admin)])
+def admin_ticket_status(
+    ticket_id: str, payload: TicketStatusRequest, db: Session = Depends(get_db), service: GrievanceService = Depends(get_service)
+):
+    if not service.set_status(db, ticket_id, payload.status.upper()):
+        raise HTTPException(status_code=404, detail="Ticket not found")
+    return ticket_status(db, ticket_id)
+
+
+@admin_router.get("/admin/engine", dependencies=[Depends(require_admin)])
+def admin_engine():
+    return registry.status()
+
+
+@admin_router.get("/admin/caches", dependencies=[Depends(require_admin)])
+def admin_caches(service: GrievanceService = Depends(get_service)):
+    return {"status": status_cache.stats(), "query": service.ai.cache.stats()}
@@ -7,9 +7,33 @@ class Settings(BaseSettings):
     secret_key: str = "change-me"
     access_token_expire_minutes: int = 60
     database_url: str = "sqlite:///./civicai.db"
-    redis_url: str = "redis://redis:6379/0"
+    async_mode: bool = False  # serve the data routes from AsyncSession (aiosqlite / asyncpg)
+    async_database_url: str = ""  # defaults to database_url with its async driver
+    match_workers: int = 4  # threads for CPU-bound matching in async mode
+    redis_url: str = "redis://redis:6379/0"  # status cache; empty (or unreachable) = in-process LRU
+    status_cache_size: int = 10000  # in-process entries when Redis is not used
+    status_cache_ttl: float = 30.0  # seconds; bounds staleness if an invalidation is missed
     model_store: str = "./models"
     data_file: str = "../data/bbmp_reddit_data.csv"
+    query_cache_size: int = 1024
+    query_cache_ttl: float = 300.0
+    search_mode: str = "exact"  # "exact" or "approx" (cluster-pruned ANN index)
+    ann_lists: int = 0  # 0 = sqrt(rows)
+    ann_nprobe: int = 8
+    preload_engine: bool = True  # load the AI engine in the startup hook instead of on first request
+    reload_watch_interval: float = 0.0  # seconds between data_file checks for hot reload; 0 = off
+    classifier_dir: str = ""  # e.g. ./models/e5_topic_classifier; empty disables the E5 tier
+    classifier_backend: str = "torch"  # "torch" or "onnx"
+    classifier_quantize: bool = False  # int8 dynamic quantization for CPU
+    classifier_threads: int = 0  # intra-op threads; 0 = all cores
+    classifier_max_batch: int = 32
+    classifier_max_wait_ms: float = 5.0
+    classifier_min_confidence: float = 0.6
+    embedding_store: str = ""  # e.g. ./models/embeddings; empty disables dense similar cases
+    embedding_model_dir: str = ""  # E5 encoder; defaults to classifier_dir
+    dense_weight: float = 0.5  # share of the embedding cosine in the fused similar-case score
+    dense_candidates: int = 50
+    admin_token: str = ""  # required as X-Admin-Token on /admin/* when set
     rate_limit: str = "60/minute"
 
     class Config:
@@ -6,10 +6,12 @@ from slowapi.errors import RateLimitExceeded
 from slowapi.middleware import SlowAPIMiddleware
 from slowapi import _rate_limit_exceeded_handler
 
-from app.api.routes import router
+from app.api.routes import admin_router, get_service, registry, router, topic_classifier
 from app.core.config import settings
 from app.db.base import Base
-from app.db.session import engine
+from app.db.session import SessionLocal, engine
+from app.models.entities import Complaint
+from app.services.analytics import backfill_rollups
 
 limiter = Limiter(key_func=get_remote_address, default_limits=[settings.rate_limit])
 app = FastAPI(title="CivicAI API", version="1.0.0")
@@ -22,13 +24,30 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
-app.include_router(router)
+if settings.async_mode:
+    from app.api.async_routes import router as async_router
+
+    app.include_router(async_router)
+else:
+    app.include_router(router)
+app.include_router(admin_router)
 
 
 @app.on_event("startup")
 def startup() -> None:
     Base.metadata.create_all(bind=engine)
+    for index in Complaint.__table__.indexes:  # create_all skips tables that already exist
+        index.create(bind=engine, checkfirst=True)
+    with SessionLocal() as db:
+        backfill_rollups(db)
+    if settings.preload_engine:
+        get_service()
+        if topic_classifier is not None:
+            topic_classifier.predict("warm up")  # loads the classifier model
+    if settings.reload_watch_interval > 0:
+        registry.watch(settings.reload_watch_interval)
 
 
 @app.get("/")
@@ -1,5 +1,5 @@
-from datetime import datetime
-from sqlalchemy import Boolean, DateTime, Float, ForeignKey, Integer, String, Text
+from datetime import date, datetime
+from sqlalchemy import Boolean, Date, DateTime, Float, ForeignKey, Index, Integer, String, Text
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.db.base import Base
@@ -25,6 +25,19 @@ class Complaint(Base):
     level: Mapped[int] = mapped_column(Integer, default=1)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
 
+    # Keyset pagination of a user's history (see app.services.history).
+    __table_args__ = (Index("ix_complaints_user_created_id", "user_id", "created_at", "id"),)
+
+
+class ComplaintRollup(Base):
+    """Complaint counts per category x location x day, kept up to date with each ticket."""
+
+    __tablename__ = "complaint_rollups"
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    category: Mapped[str] = mapped_column(String(120), primary_key=True)
+    location: Mapped[str] = mapped_column(String(120), primary_key=True)
+    complaints: Mapped[int] = mapped_column(Integer, default=0)
+
 
 class Solution(Base):
     __tablename__ = "solutions"
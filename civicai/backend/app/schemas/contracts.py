@@ -16,6 +16,14 @@ class ChatResponse(BaseModel):
     tracking_id: Optional[str] = None
 
 
+class ChatBatchRequest(BaseModel):
+    messages: List[ChatRequest] = Field(min_length=1, max_length=256)
+
+
+class ChatBatchResponse(BaseModel):
+    results: List[ChatResponse]
+
+
 class ComplaintRequest(BaseModel):
     user_id: str
     text: str
@@ -36,6 +44,10 @@ class FeedbackRequest(BaseModel):
     comment: str = ""
 
 
+class TicketStatusRequest(BaseModel):
+    status: str = Field(min_length=1, max_length=30)
+
+
 class TokenResponse(BaseModel):
     access_token: str
     token_type: str = "bearer"
@@ -1,13 +1,29 @@
 from __future__ import annotations
 
+import logging
 import os
+import re
+import threading
+import time
 import uuid
+from collections import OrderedDict
 from dataclasses import dataclass
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple
 
-import pandas as pd
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+# pandas, scikit-learn and SciPy are imported where first needed so that importing the
+# API (and answering health checks) does not pay for them.
+
+DEMO_ROW = {"text": "water leakage", "category": "Water", "solution": "Raise BBMP water complaint", "department": "BWSSB", "location": "Bengaluru", "resolved_status": "yes"}
+REQUIRED_COLUMNS = {"text", "category", "solution", "department", "location", "resolved_status"}
+ROW_FIELDS = ("text", "category", "solution", "department", "location")
+# Nearest rows scanned for one in the classifier's category before falling back to the best row.
+TIER_CANDIDATES = 20
+URGENCY_TERMS = ("urgent", "danger", "flood", "fire", "accident", "blocked", "no water")
+# A lookahead finds every term occurrence, including ones overlapping another term
+# ("floodanger"), so one scan gives the same result as one substring test per term.
+_URGENCY_RE = re.compile("(?=(" + "|".join(re.escape(term) for term in URGENCY_TERMS) + "))")
+
+logger = logging.getLogger(__name__)
 
 
 @dataclass
@@ -17,48 +33,265 @@ class MatchResult:
     department: str
     location: str
     confidence: float
+    topic_confidence: Optional[float] = None  # set when the classifier tier chose the category
+
+
+@dataclass(frozen=True)
+class QueryResult:
+    match: MatchResult
+    similar: Tuple[str, ...]
+
+
+_WORD_RE = re.compile(r"\w+")
+
+
+def normalize_message(text: str) -> str:
+    """Lower-cased words joined by single spaces.
+
+    The TF-IDF vectorizer lower-cases and only sees word characters, so two messages
+    with the same normalized form always get the same vector.
+    """
+    return " ".join(_WORD_RE.findall(text.lower()))
+
+
+class QueryCache:
+    """Thread-safe LRU cache whose entries also expire ``ttl`` seconds after insertion."""
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 300.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._items: "OrderedDict[object, Tuple[float, object]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: object) -> Optional[object]:
+        with self._lock:
+            item = self._items.get(key)
+            if item is None or item[0] < time.monotonic():
+                if item is not None:
+                    del self._items[key]
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return item[1]
+
+    def put(self, key: object, value: object) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._items[key] = (time.monotonic() + self.ttl, value)
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def discard(self, key: object) -> None:
+        with self._lock:
+            self._items.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {"size": len(self._items), "maxsize": self.maxsize, "hits": self.hits, "misses": self.misses}
+
+
+def read_dataset(data_file: str) -> Dict[str, List[str]]:
+    """The grievance CSV as string columns (a one-row demo set if the file is missing)."""
+    import pandas as pd
+
+    df = pd.read_csv(data_file) if os.path.exists(data_file) else pd.DataFrame([DEMO_ROW])
+    missing = REQUIRED_COLUMNS - set(df.columns)
+    if missing:
+        raise ValueError(f"Missing dataset columns: {missing}")
+    return {field: df[field].astype(str).tolist() for field in ROW_FIELDS}
+
+
+def fit_vectorizer(texts: List[str]):
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    vectorizer = TfidfVectorizer(stop_words="english", ngram_range=(1, 2), min_df=1)
+    return vectorizer, vectorizer.fit_transform(texts)
 
 
 class HybridAIEngine:
-    def __init__(self, data_file: str):
-        if not os.path.exists(data_file):
-            self.df = pd.DataFrame(
-                [{"text": "water leakage", "category": "Water", "solution": "Raise BBMP water complaint", "department": "BWSSB", "location": "Bengaluru", "resolved_status": "yes"}]
+    def __init__(self, data_file: str, **options):
+        rows = read_dataset(data_file)
+        vectorizer, vectors = fit_vectorizer(rows["text"])
+        self._setup(vectorizer, vectors, rows, **options)
+        self.version = "fitted"
+
+    @classmethod
+    def from_artifacts(cls, artifacts, **options) -> "HybridAIEngine":
+        """Engine over prebuilt :class:`~app.services.artifacts.ModelArtifacts` (no refit)."""
+        engine = cls.__new__(cls)
+        engine._setup(artifacts.vectorizer, artifacts.vectors, artifacts.rows, **options)
+        engine.version = artifacts.version
+        return engine
+
+    def _setup(
+        self,
+        vectorizer,
+        vectors,
+        rows: Dict[str, List[str]],
+        cache_size: int = 1024,
+        cache_ttl: float = 300.0,
+        search_mode: str = "exact",
+        classifier=None,
+        classifier_min_confidence: float = 0.6,
+        embeddings=None,
+        query_encoder=None,
+        dense_weight: float = 0.5,
+        dense_candidates: int = 50,
+        **index_params,
+    ) -> None:
+        """Optional tiers:
+
+        * ``classifier`` - anything with ``predict(text) -> TopicPrediction`` (e.g. a
+          :class:`~app.services.topic_classifier.MicroBatcher`); its label replaces the
+          nearest row's category when at least ``classifier_min_confidence`` sure.
+        * ``embeddings`` + ``query_encoder`` - an :class:`~app.services.embedding_store.EmbeddingStore`
+          and ``predict(text) -> vector``; similar cases are then ranked by
+          ``(1 - dense_weight) * tfidf + dense_weight * embedding`` cosine.
+        """
+        from app.services.ann_index import build_index
+
+        self.vectorizer = vectorizer
+        self.text_vectors = vectors
+        self.rows = rows
+        self.index = build_index(vectors, search_mode, **index_params)
+        self.cache = QueryCache(cache_size, cache_ttl)
+        self.classifier = classifier
+        self.classifier_min_confidence = classifier_min_confidence
+        self.dense = None
+        if embeddings is not None and query_encoder is not None:
+            from app.services.embedding_store import DenseRetriever
+
+            self.dense = DenseRetriever(embeddings, rows["text"], query_encoder)
+        self.dense_weight = dense_weight
+        self.dense_candidates = dense_candidates
+
+    def query(self, message: str, k: int = 3) -> QueryResult:
+        """Best match plus the ``k`` most similar texts, from one similarity pass.
+
+        Results are cached on the normalized message, so repeats of the same complaint
+        (common during an outage) skip vectorizing and scoring entirely. The message
+        itself is what gets scored: the classifier and query encoder were trained on
+        raw text, and TF-IDF vectorizes both forms alike.
+        """
+        key = (normalize_message(message), k)
+        result = self.cache.get(key)
+        if result is None:
+            result = self._query(message, k)
+            self.cache.put(key, result)
+        return result
+
+    def query_batch(self, messages: List[str], k: int = 3, cache: bool = True) -> List[QueryResult]:
+        """:meth:`query` for many messages at once.
+
+        Uncached messages are vectorized with one ``transform`` and scored with one
+        sparse similarity product; messages with the same normalized form are computed
+        once, from the first of them. ``cache=False`` neither reads nor fills the query
+        cache (bulk imports).
+        """
+        normalized = [normalize_message(message) for message in messages]
+        first: Dict[str, str] = {}
+        for text, message in zip(normalized, messages):
+            first.setdefault(text, message)
+        if not cache:
+            computed = dict(zip(first, self._query_batch(list(first.values()), k)))
+            return [computed[text] for text in normalized]
+        results = [self.cache.get((text, k)) for text in normalized]
+        pending = list(dict.fromkeys(text for text, result in zip(normalized, results) if result is None))
+        if pending:
+            computed = dict(zip(pending, self._query_batch([first[text] for text in pending], k)))
+            for text, result in computed.items():
+                self.cache.put((text, k), result)
+            results = [computed[text] if result is None else result for text, result in zip(normalized, results)]
+        return results
+
+    def _query(self, text: str, k: int) -> QueryResult:
+        return self._query_batch([text], k)[0]
+
+    def _query_batch(self, texts: List[str], k: int) -> List[QueryResult]:
+        topics = self._predict_topics(texts)
+        qvs = self.vectorizer.transform(texts)
+        n = max(k, 1, TIER_CANDIDATES if any(topics) else 0, self.dense_candidates if self.dense else 0)
+        if len(texts) == 1:
+            hits = [self.index.search(qvs, n)]
+        else:
+            hits = self.index.search_batch(qvs, n)
+        rows = self.rows
+        # One encoder round trip for the batch, not one micro-batcher wait per text.
+        query_vectors = self.dense.encode_batch(texts) if self.dense is not None else [None] * len(texts)
+        results = []
+        for position, (query_vector, topic, (ids, scores)) in enumerate(zip(query_vectors, topics, hits)):
+            best = 0
+            if topic is not None:
+                # Take solution/department from the nearest row filed under the predicted topic.
+                best = next((pos for pos, i in enumerate(ids) if rows["category"][int(i)] == topic.label), 0)
+            idx = int(ids[best])
+            match = MatchResult(
+                category=topic.label if topic else rows["category"][idx],
+                solution=rows["solution"][idx],
+                department=rows["department"][idx],
+                location=rows["location"][idx],
+                confidence=float(scores[best]),
+                topic_confidence=topic.confidence if topic else None,
             )
+            similar = self._fused_similar(query_vector, qvs[position], ids, k) if self.dense is not None else ids[:k]
+            results.append(QueryResult(match=match, similar=tuple(rows["text"][int(i)] for i in similar)))
+        return results
+
+    def _predict_topics(self, texts: List[str]) -> list:
+        """Confident classifier predictions per text (``None`` where unsure or without a classifier)."""
+        if self.classifier is None:
+            return [None] * len(texts)
+        if len(texts) > 1 and hasattr(self.classifier, "submit"):
+            # Queue the whole batch before waiting so the micro-batcher can group it.
+            futures = [self.classifier.submit(text) for text in texts]
+            topics = [future.result() for future in futures]
         else:
-            self.df = pd.read_csv(data_file)
-        required = {"text", "category", "solution", "department", "location", "resolved_status"}
-        missing = required - set(self.df.columns)
-        if missing:
-            raise ValueError(f"Missing dataset columns: {missing}")
-        self.vectorizer = TfidfVectorizer(stop_words="english", ngram_range=(1, 2), min_df=1)
-        self.text_vectors = self.vectorizer.fit_transform(self.df["text"].astype(str).tolist())
+            topics = [self.classifier.predict(text) for text in texts]
+        return [topic if topic.confidence >= self.classifier_min_confidence else None for topic in topics]
+
+    def _fused_similar(self, query_vector, qv, lexical_ids, k: int):
+        """Top ``k`` of the lexical and dense candidates by the weighted sum of both cosines."""
+        import numpy as np
+
+        from app.services.ann_index import top_k_indices
+
+        dense_ids, _, store_scores = self.dense.search_vector(query_vector, self.dense_candidates)
+        candidates = np.union1d(lexical_ids, dense_ids)
+        lexical = (self.text_vectors[candidates] @ qv.T).toarray().ravel()
+        dense = self.dense.row_scores(candidates, store_scores)
+        fused = (1.0 - self.dense_weight) * lexical + self.dense_weight * dense
+        return candidates[top_k_indices(fused, k)]
 
     def match(self, query: str) -> MatchResult:
-        qv = self.vectorizer.transform([query])
-        sims = cosine_similarity(qv, self.text_vectors).flatten()
-        idx = int(sims.argmax())
-        row = self.df.iloc[idx]
-        return MatchResult(
-            category=str(row["category"]),
-            solution=str(row["solution"]),
-            department=str(row["department"]),
-            location=str(row["location"]),
-            confidence=float(sims[idx]),
-        )
+        return self.query(query).match
 
     def top_similar(self, query: str, k: int = 3) -> List[str]:
-        qv = self.vectorizer.transform([query])
-        sims = cosine_similarity(qv, self.text_vectors).flatten()
-        top_idx = sims.argsort()[-k:][::-1]
-        return [self.df.iloc[int(i)]["text"] for i in top_idx]
+        return list(self.query(query, k).similar)
 
     def predict_severity(self, query: str) -> float:
-        urgency_terms = ["urgent", "danger", "flood", "fire", "accident", "blocked", "no water"]
-        text = query.lower()
-        score = 0.2 + sum(0.12 for term in urgency_terms if term in text)
+        score = 0.2 + 0.12 * len(set(_URGENCY_RE.findall(query.lower())))
         return round(min(score, 1.0), 2)
 
 
+def load_engine(data_file: str, model_store: str, **options) -> HybridAIEngine:
+    """Engine from the prebuilt artifacts in ``model_store``, fitting on ``data_file`` if
+    there are none (or they were built from a different CSV)."""
+    from app.services.artifacts import load_artifacts
+
+    artifacts = load_artifacts(model_store, data_file)
+    if artifacts is not None:
+        return HybridAIEngine.from_artifacts(artifacts, **options)
+    logger.warning("No current artifacts in %s; fitting on %s", model_store, data_file)
+    return HybridAIEngine(data_file, **options)
+
+
 def build_tracking_id() -> str:
     return f"CIV-{uuid.uuid4().hex[:10].upper()}"
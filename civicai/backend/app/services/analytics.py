@@ -0,0 +1,96 @@
+"""Dashboard aggregates computed in SQL.
+
+Complaint counts come from ``complaint_rollups`` (category x location x day), which
+``GrievanceService`` increments in the same transaction that files the complaints, so
+``/analytics`` reads a table that grows with days x categories x areas rather than
+with complaints. Ticket totals are a single aggregate query over ``tickets``.
+"""
+
+from __future__ import annotations
+
+from collections import Counter
+from datetime import date, datetime, time, timedelta
+from typing import Dict, Iterable, Mapping, Optional
+
+from sqlalchemy import case, func, insert, select
+from sqlalchemy.orm import Session
+
+from app.models.entities import Complaint, ComplaintRollup, Ticket
+
+
+def record_complaints(db: Session, complaints: Iterable[Mapping[str, object]]) -> None:
+    """Adds inserted complaints (their ``created_at``, ``category`` and ``location`` values)
+    to the rollup; the caller commits."""
+    counts = Counter((c["created_at"].date(), c["category"], c["location"]) for c in complaints)
+    upsert = _upsert_insert(db.get_bind().dialect.name)
+    for (day, category, location), count in counts.items():
+        values = {"day": day, "category": category, "location": location, "complaints": count}
+        if upsert is not None:
+            # Atomic increment, so concurrent writers of a new key cannot collide.
+            statement = upsert(ComplaintRollup).values(**values)
+            db.execute(
+                statement.on_conflict_do_update(
+                    index_elements=["day", "category", "location"],
+                    set_={"complaints": ComplaintRollup.complaints + statement.excluded.complaints},
+                )
+            )
+            continue
+        row = db.get(ComplaintRollup, (day, category, location))
+        if row is None:
+            db.add(ComplaintRollup(**values))
+        else:
+            row.complaints += count
+
+
+def backfill_rollups(db: Session) -> int:
+    """Builds the rollup from ``complaints`` if it is still empty (first start after upgrade).
+
+    Returns the number of rollup rows written.
+    """
+    if db.scalar(select(ComplaintRollup.day).limit(1)) is not None:
+        return 0
+    # date() yields ISO text on SQLite, which is also how SQLAlchemy stores Date there.
+    day = func.date(Complaint.created_at)
+    grouped = select(day, Complaint.category, Complaint.location, func.count()).group_by(day, Complaint.category, Complaint.location)
+    result = db.execute(insert(ComplaintRollup).from_select(["day", "category", "location", "complaints"], grouped))
+    db.commit()
+    return result.rowcount
+
+
+def summarize(db: Session, start: Optional[date] = None, end: Optional[date] = None) -> Dict[str, object]:
+    """Totals for complaints and tickets filed between ``start`` and ``end`` (inclusive days)."""
+    rollup_filters = []
+    ticket_filters = []
+    if start is not None:
+        rollup_filters.append(ComplaintRollup.day >= start)
+        ticket_filters.append(Ticket.created_at >= datetime.combine(start, time.min))
+    if end is not None:
+        rollup_filters.append(ComplaintRollup.day <= end)
+        ticket_filters.append(Ticket.created_at < datetime.combine(end + timedelta(days=1), time.min))
+
+    total = func.sum(ComplaintRollup.complaints)
+    by_category = db.execute(select(ComplaintRollup.category, total).where(*rollup_filters).group_by(ComplaintRollup.category)).all()
+    by_area = db.execute(select(ComplaintRollup.location, total).where(*rollup_filters).group_by(ComplaintRollup.location)).all()
+    total_tickets, sla_open = db.execute(
+        select(func.count(), func.coalesce(func.sum(case((Ticket.status != "RESOLVED", 1), else_=0)), 0)).where(*ticket_filters)
+    ).one()
+    return {
+        "total_complaints": sum(count for _, count in by_category),
+        "total_tickets": total_tickets,
+        "by_category": dict(by_category),
+        "by_area": dict(by_area),
+        "sla_open": sla_open,
+    }
+
+
+def _upsert_insert(dialect: str):
+    """``insert`` with ``on_conflict_do_update`` for ``dialect``, or ``None``."""
+    if dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+
+        return insert
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+
+        return insert
+    return None
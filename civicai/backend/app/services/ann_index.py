@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import math
+from typing import List, Tuple
+
+import numpy as np
+from scipy import sparse
+
+SEARCH_MODES = ("exact", "approx")
+
+
+def top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the ``k`` largest scores, best first (ties to the lower index), without a full sort."""
+    k = min(k, scores.shape[0])
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+    if k < scores.shape[0]:
+        kth = scores[np.argpartition(scores, -k)[-k]]
+        above = np.flatnonzero(scores > kth)
+        top = np.concatenate([above, np.flatnonzero(scores == kth)[: k - above.shape[0]]])
+    else:
+        top = np.arange(scores.shape[0])
+    return top[np.lexsort((top, -scores[top]))]
+
+
+class ExactIndex:
+    """Brute-force cosine search over L2-normalized sparse rows (TF-IDF output)."""
+
+    def __init__(self, vectors: sparse.spmatrix):
+        self.vectors = sparse.csr_matrix(vectors)
+
+    def search(self, query: sparse.spmatrix, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """``(row ids, cosine scores)`` of the ``k`` nearest rows, best first."""
+        scores = (self.vectors @ query.T).toarray().ravel()
+        top = top_k_indices(scores, k)
+        return top, scores[top]
+
+    def search_batch(self, queries: sparse.spmatrix, k: int) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """:meth:`search` for every row of ``queries``, from one sparse matrix product."""
+        scores = (self.vectors @ queries.T).tocsc()
+        results = []
+        for column in range(queries.shape[0]):
+            dense = np.zeros(self.vectors.shape[0], dtype=scores.dtype)
+            span = slice(scores.indptr[column], scores.indptr[column + 1])
+            dense[scores.indices[span]] = scores.data[span]
+            top = top_k_indices(dense, k)
+            results.append((top, dense[top]))
+        return results
+
+
+class ClusterPrunedIndex:
+    """IVF-style index: rows are bucketed by nearest centroid and a query only
+    rescores the rows in its ``nprobe`` closest buckets.
+
+    Centroids start as randomly chosen rows (cluster pruning) and are refined by
+    ``n_iter`` rounds of spherical k-means, each truncated to its ``centroid_terms``
+    heaviest terms so the centroid matrix stays sparse. Candidates are rescored
+    exactly, so ``nprobe`` trades recall for latency and ``nprobe == n_lists`` is
+    exact search.
+    """
+
+    def __init__(
+        self,
+        vectors: sparse.spmatrix,
+        n_lists: int = 0,
+        nprobe: int = 8,
+        n_iter: int = 2,
+        centroid_terms: int = 256,
+        seed: int = 0,
+        chunk_rows: int = 8192,
+    ):
+        self.vectors = sparse.csr_matrix(vectors)
+        n_rows = self.vectors.shape[0]
+        self.n_lists = max(1, min(n_rows, n_lists or int(math.sqrt(n_rows))))
+        self.nprobe = nprobe
+        self.chunk_rows = chunk_rows
+
+        rng = np.random.default_rng(seed)
+        centroids = self.vectors[rng.choice(n_rows, size=self.n_lists, replace=False)]
+        assignments = self._assign(centroids)
+        for _ in range(n_iter):
+            centroids = self._recompute(assignments, centroids, centroid_terms)
+            assignments = self._assign(centroids)
+        self.centroids = centroids
+
+        # Inverted lists as CSR-style offsets into row ids grouped by list.
+        order = np.argsort(assignments, kind="stable")
+        self.list_rows = order.astype(np.int64)
+        self.list_offsets = np.searchsorted(assignments[order], np.arange(self.n_lists + 1))
+        self._empty_lists = np.diff(self.list_offsets) == 0
+
+    def _assign(self, centroids: sparse.csr_matrix) -> np.ndarray:
+        assignments = np.empty(self.vectors.shape[0], dtype=np.int64)
+        centroids_t = centroids.T.tocsc()
+        for start in range(0, self.vectors.shape[0], self.chunk_rows):
+            block = (self.vectors[start:start + self.chunk_rows] @ centroids_t).toarray()
+            assignments[start:start + block.shape[0]] = block.argmax(axis=1)
+        return assignments
+
+    def _recompute(self, assignments: np.ndarray, previous: sparse.csr_matrix, terms: int) -> sparse.csr_matrix:
+        membership = sparse.csr_matrix(
+            (np.ones(assignments.shape[0]), (assignments, np.arange(assignments.shape[0]))),
+            shape=(self.n_lists, self.vectors.shape[0]),
+        )
+        sums = (membership @ self.vectors).tocsr()
+        rows = []
+        for list_id in range(self.n_lists):
+            row = sums.getrow(list_id)
+            if row.nnz == 0:
+                rows.append(previous.getrow(list_id))  # empty bucket keeps its old centroid
+                continue
+            if row.nnz > terms:
+                keep = np.argpartition(row.data, -terms)[-terms:]
+                row = sparse.csr_matrix((row.data[keep], row.indices[keep], [0, terms]), shape=row.shape)
+                row.sort_indices()
+            norm = math.sqrt(float(row.multiply(row).sum())) or 1.0
+            rows.append(row / norm)
+        return sparse.vstack(rows, format="csr")
+
+    def search(self, query: sparse.spmatrix, k: int, nprobe: int = 0) -> Tuple[np.ndarray, np.ndarray]:
+        """``(row ids, cosine scores)`` of the best ``k`` rows among the probed lists, best first."""
+        centroid_scores = (self.centroids @ query.T).toarray().ravel()
+        return self._search_lists(query, centroid_scores, k, nprobe)
+
+    def search_batch(self, queries: sparse.spmatrix, k: int, nprobe: int = 0) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """:meth:`search` for every row of ``queries``; centroids are scored in one product."""
+        queries = sparse.csr_matrix(queries)
+        centroid_scores = (self.centroids @ queries.T).toarray()
+        return [self._search_lists(queries[i], centroid_scores[:, i], k, nprobe) for i in range(queries.shape[0])]
+
+    def _search_lists(self, query: sparse.spmatrix, centroid_scores: np.ndarray, k: int, nprobe: int) -> Tuple[np.ndarray, np.ndarray]:
+        probe = min(self.n_lists, nprobe or self.nprobe)
+        centroid_scores[self._empty_lists] = -np.inf
+        lists = top_k_indices(centroid_scores, probe)
+        candidates = np.concatenate([self.list_rows[self.list_offsets[i]:self.list_offsets[i + 1]] for i in lists])
+        candidates.sort()
+        scores = (self.vectors[candidates] @ query.T).toarray().ravel()
+        top = top_k_indices(scores, k)
+        return candidates[top], scores[top]
+
+
+def build_index(vectors: sparse.spmatrix, mode: str = "exact", **params):
+    """Index for ``mode`` (see :data:`SEARCH_MODES`); ``params`` go to the approximate index."""
+    if mode == "exact":
+        return ExactIndex(vectors)
+    if mode == "approx":
+        return ClusterPrunedIndex(vectors, **params)
+    raise ValueError(f"Unknown search mode {mode!r}; expected one of {SEARCH_MODES}")
@@ -0,0 +1,143 @@
+"""Prebuilt retrieval artifacts in ``settings.model_store``.
+
+Layout::
+
+    model_store/
+        CURRENT                  # name of the live version directory
+        <version>/
+            manifest.json        # format, source fingerprint, shapes
+            vectorizer.joblib    # fitted TfidfVectorizer
+            vectors.data.npy     # CSR arrays of the TF-IDF matrix, mmap-able
+            vectors.indices.npy
+            vectors.indptr.npy
+            rows.json            # text/category/solution/department/location columns
+
+A build writes a fresh version directory and then swaps ``CURRENT`` with an atomic
+rename, so a reader never sees a half-written set.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional
+
+ARTIFACT_FORMAT = 1
+KEEP_VERSIONS = 2
+
+
+@dataclass
+class ModelArtifacts:
+    version: str
+    manifest: Dict[str, object]
+    vectorizer: object
+    vectors: object  # scipy.sparse.csr_matrix over memory-mapped arrays
+    rows: Dict[str, List[str]]
+
+
+def file_fingerprint(path: str) -> Dict[str, object]:
+    digest = hashlib.sha256()
+    with open(path, "rb") as fp:
+        for block in iter(lambda: fp.read(1 << 20), b""):
+            digest.update(block)
+    return {"size": os.path.getsize(path), "sha256": digest.hexdigest()}
+
+
+def current_version(model_store: str) -> Optional[str]:
+    try:
+        return (Path(model_store) / "CURRENT").read_text(encoding="utf-8").strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def build_artifacts(data_file: str, model_store: str) -> Dict[str, object]:
+    """Fits the vectorizer on ``data_file`` and publishes it as the current version."""
+    import joblib
+    import numpy as np
+
+    from app.services.ai_engine import fit_vectorizer, read_dataset
+
+    started = time.perf_counter()
+    rows = read_dataset(data_file)
+    vectorizer, vectors = fit_vectorizer(rows["text"])
+    vectorizer.stop_words_ = None  # only needed for introspection; can be large
+    # Plain ints unpickle several times faster than the NumPy scalars sklearn stores.
+    vectorizer.vocabulary_ = {term: int(column) for term, column in vectorizer.vocabulary_.items()}
+
+    store = Path(model_store)
+    store.mkdir(parents=True, exist_ok=True)
+    source = file_fingerprint(data_file) if os.path.exists(data_file) else None
+    version = time.strftime("%Y%m%dT%H%M%S") + "-" + (source["sha256"][:8] if source else "demo")
+    target = store / version
+    staging = store / f".{version}.tmp"
+    shutil.rmtree(staging, ignore_errors=True)
+    staging.mkdir()
+
+    joblib.dump(vectorizer, staging / "vectorizer.joblib")
+    for name in ("data", "indices", "indptr"):
+        np.save(staging / f"vectors.{name}.npy", getattr(vectors, name))
+    (staging / "rows.json").write_text(json.dumps(rows), encoding="utf-8")
+    manifest = {
+        "format": ARTIFACT_FORMAT,
+        "version": version,
+        "source": source,
+        "rows": vectors.shape[0],
+        "features": vectors.shape[1],
+        "build_seconds": round(time.perf_counter() - started, 3),
+    }
+    (staging / "manifest.json").write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    shutil.rmtree(target, ignore_errors=True)  # same second and same source: same content
+    os.replace(staging, target)
+
+    pointer = store / ".CURRENT.tmp"
+    pointer.write_text(version, encoding="utf-8")
+    os.replace(pointer, store / "CURRENT")
+    _prune_versions(store, keep=version)
+    return manifest
+
+
+def _prune_versions(store: Path, keep: str) -> None:
+    versions = sorted(p for p in store.iterdir() if p.is_dir() and not p.name.startswith("."))
+    for path in versions[:-KEEP_VERSIONS]:
+        if path.name != keep:
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def load_artifacts(model_store: str, data_file: Optional[str] = None) -> Optional[ModelArtifacts]:
+    """Loads the current version, or ``None`` if there is none or it is stale.
+
+    Artifacts count as stale when ``data_file`` exists and its size or hash differs
+    from the one they were built from; without the CSV they are used as they are.
+    """
+    version = current_version(model_store)
+    if version is None:
+        return None
+    directory = Path(model_store) / version
+    try:
+        manifest = json.loads((directory / "manifest.json").read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return None
+    if manifest.get("format") != ARTIFACT_FORMAT:
+        return None
+    if data_file and os.path.exists(data_file) and manifest.get("source") != file_fingerprint(data_file):
+        return None
+
+    import joblib
+    import numpy as np
+    from scipy import sparse
+
+    arrays = [np.load(directory / f"vectors.{name}.npy", mmap_mode="r") for name in ("data", "indices", "indptr")]
+    vectors = sparse.csr_matrix(tuple(arrays), shape=(manifest["rows"], manifest["features"]), copy=False)
+    rows = json.loads((directory / "rows.json").read_text(encoding="utf-8"))
+    return ModelArtifacts(
+        version=version,
+        manifest=manifest,
+        vectorizer=joblib.load(directory / "vectorizer.joblib"),
+        vectors=vectors,
+        rows=rows,
+    )
@@ -0,0 +1,203 @@
+"""Bulk complaint ingestion for ``POST /complaints/bulk``.
+
+Uploads are CSV with a header row or NDJSON objects, both with ``user_id``, ``text``
+and ``location``. :class:`BulkIngester` is fed the body as it arrives, cuts it at
+record boundaries, and files every ``chunk_rows`` rows through
+:meth:`GrievanceService.ingest_complaints`: one classification batch, one executemany
+per table and one commit per chunk. It writes one NDJSON result per input row, in
+order, to a spooled file, which the route streams back once the upload is consumed.
+"""
+
+from __future__ import annotations
+
+import codecs
+import csv
+import io
+import json
+import logging
+import re
+import tempfile
+from typing import Dict, Iterator, List, Tuple, Union
+
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+BULK_FORMATS = ("csv", "ndjson")
+BULK_CHUNK_ROWS = 500
+BULK_FIELDS = ("user_id", "text", "location")
+FIELD_LENGTHS = {"user_id": 64, "location": 120}  # column sizes in app.models.entities
+SPOOL_BYTES = 1 << 20  # results beyond this go to a temporary file
+MAX_RECORD_CHARS = 1 << 20  # an incomplete record larger than this fails as one row
+CSV_SPECIAL = re.compile(r'[,\r\n"]')
+
+
+class BulkIngester:
+    def __init__(self, service, db: Session, fmt: str, chunk_rows: int = BULK_CHUNK_ROWS):
+        if fmt not in BULK_FORMATS:
+            raise ValueError(f"Unknown upload format {fmt!r}; expected one of {BULK_FORMATS}")
+        self.service = service
+        self.db = db
+        self.fmt = fmt
+        self.chunk_rows = chunk_rows
+        self.decoder = codecs.getincrementaldecoder("utf-8-sig")()  # spreadsheet exports often carry a BOM
+        self.buffer = ""
+        # CSV record scanner state at buffer[scan]: inside a quoted field / at a field start.
+        self.scan = 0
+        self.quoted = False
+        self.field_start = True
+        self.header: Union[List[str], None] = None
+        self.rows = 0
+        self.filed = 0
+        self.pending: List[Tuple[int, Union[Tuple[str, str, str], str]]] = []
+        self.results = tempfile.SpooledTemporaryFile(max_size=SPOOL_BYTES, mode="w+", encoding="utf-8")
+
+    def feed(self, data: bytes) -> None:
+        """Parses the complete records in ``data`` (plus any carried-over partial one)."""
+        self.buffer += self.decoder.decode(data)
+        cut = self._complete_prefix()
+        if cut:
+            self._parse(self.buffer[:cut])
+            self.buffer = self.buffer[cut:]
+            self.scan -= cut
+        if len(self.buffer) > MAX_RECORD_CHARS:
+            # Most likely an unbalanced quote; buffering the rest of the upload would defeat streaming.
+            if self.fmt == "csv" and self.header is None:
+                raise ValueError(f"CSV header row longer than {MAX_RECORD_CHARS} characters")
+            self._add(f"record longer than {MAX_RECORD_CHARS} characters (unclosed quote?)")
+            self.buffer = ""
+            self.scan, self.quoted, self.field_start = 0, False, True
+
+    def close(self) -> None:
+        """Parses the trailing record, files what is left, and rewinds the results."""
+        self.buffer += self.decoder.decode(b"", final=True)
+        if self.buffer.strip():
+            self._parse(self.buffer)
+        self.buffer = ""
+        if self.fmt == "csv" and self.header is None:
+            raise ValueError("Empty upload: expected a CSV header row")
+        self._flush()
+        self.results.seek(0)
+        logger.info("Bulk upload: %d rows, %d filed", self.rows, self.filed)
+
+    def iter_results(self) -> Iterator[str]:
+        try:
+            yield from iter(lambda: self.results.read(1 << 16), "")
+        finally:
+            self.results.close()
+
+    def _complete_prefix(self) -> int:
+        """Length of the buffer's leading run of complete records.
+
+        For CSV this follows the csv module's quoting, scanning only text not seen
+        before: a quote opens a quoted field only as a field's first character (so a
+        stray one inside an unquoted field is literal), inside one a doubled quote is
+        literal, and only line breaks outside quoted fields end records (cut at ``\\n``).
+        """
+        buffer = self.buffer
+        if self.fmt == "ndjson":
+            return buffer.rfind("\n") + 1
+        pos, cut = self.scan, 0
+        while pos < len(buffer):
+            if self.quoted:
+                end = buffer.find('"', pos)
+                if end == -1 or end + 1 == len(buffer):  # a closing or doubled quote needs the next character
+                    pos = len(buffer) if end == -1 else end
+                    break
+                if buffer[end + 1] == '"':
+                    pos = end + 2
+                else:
+                    self.quoted, self.field_start, pos = False, False, end + 1
+                continue
+            match = CSV_SPECIAL.search(buffer, pos)
+            if match is None:
+                self.field_start = False
+                pos = len(buffer)
+                break
+            char = match.group()
+            if char == '"':
+                self.quoted = self.field_start and match.start() == pos
+                self.field_start = False
+            else:
+                self.field_start = True
+                if char == "\n":
+                    cut = match.end()
+            pos = match.end()
+        self.scan = pos
+        return cut
+
+    def _parse(self, text: str) -> None:
+        if self.fmt == "ndjson":
+            for line in text.split("\n"):  # not splitlines(): JSON strings may hold U+2028
+                if line.strip():
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        self._add("not valid JSON")
+                        continue
+                    self._add(record if isinstance(record, dict) else "not a JSON object")
+            return
+        reader = csv.reader(io.StringIO(text, newline=""))
+        while True:
+            try:
+                record = next(reader)
+            except StopIteration:
+                return
+            except csv.Error as exc:  # e.g. a field over csv.field_size_limit(); the reader resumes at the next line
+                if self.header is None:
+                    raise ValueError(f"Malformed CSV header: {exc}")
+                self._add(f"malformed CSV: {exc}")
+                continue
+            if not record:
+                continue
+            if self.header is None:
+                self.header = [name.strip().lower() for name in record]
+                missing = [name for name in BULK_FIELDS if name not in self.header]
+                if missing:
+                    raise ValueError(f"CSV header is missing {', '.join(missing)}")
+                continue
+            self._add(dict(zip(self.header, record)))
+
+    def _add(self, record: Union[Dict[str, object], str]) -> None:
+        self.rows += 1
+        self.pending.append((self.rows, _validate(record) if isinstance(record, dict) else record))
+        if len(self.pending) >= self.chunk_rows:
+            self._flush()
+
+    def _flush(self) -> None:
+        rows = [values for _, values in self.pending if isinstance(values, tuple)]
+        filed = []
+        error = None
+        if rows:
+            try:
+                filed = self.service.ingest_complaints(self.db, rows)
+            except Exception as exc:  # database or classification: fail this chunk, keep going
+                self.db.rollback()
+                logger.exception("Bulk ingestion chunk of %d rows failed", len(rows))
+                error = f"not filed: {exc.__class__.__name__}"
+        filed = iter(filed)
+        lines = []
+        for row, values in self.pending:
+            if isinstance(values, str):
+                result = {"row": row, "error": values}
+            elif error is not None:
+                result = {"row": row, "error": error}
+            else:
+                tracking_id, category, authority = next(filed)
+                result = {"row": row, "tracking_id": tracking_id, "category": category, "authority": authority, "status": "OPEN"}
+                self.filed += 1
+            lines.append(json.dumps(result) + "\n")
+        self.results.write("".join(lines))
+        self.pending = []
+
+
+def _validate(record: Dict[str, object]) -> Union[Tuple[str, str, str], str]:
+    """``(user_id, text, location)``, or why the record cannot be filed."""
+    values = tuple(str(record.get(name) or "").strip() for name in BULK_FIELDS)
+    missing = [name for name, value in zip(BULK_FIELDS, values) if not value]
+    if missing:
+        return f"missing {', '.join(missing)}"
+    too_long = [name for name, value in zip(BULK_FIELDS, values) if len(value) > FIELD_LENGTHS.get(name, len(value))]
+    if too_long:
+        return f"too long: {', '.join(too_long)}"
+    return values
@@ -0,0 +1,214 @@
+"""Precomputed E5 sentence embeddings of the knowledge base, for semantic similar cases.
+
+Store layout (append-only, so new rows are embedded incrementally)::
+
+    store_dir/
+        meta.json        # {"dim", "count", "model_dir"}; rows past "count" are ignored
+        vectors.f16      # count x dim float16, L2-normalized, row-major
+        row_keys.i64     # count int64 keys: 64-bit blake2b of the row text
+
+Rows are keyed by their text rather than by CSV position, so the store survives the
+CSV being re-sorted or having rows removed, and a text is only ever encoded once.
+Serving encodes the query alone and scores the memory-mapped matrix with BLAS.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from app.services.ann_index import top_k_indices
+
+# Rows converted to float32 per BLAS call (~12 MB at dim 768). The float16 -> float32
+# cast dominates the cost, so chunks are spread over all cores; both the cast and the
+# BLAS matvec release the GIL.
+SCORE_CHUNK_ROWS = 4096
+_score_pool: Optional[ThreadPoolExecutor] = None
+_score_pool_lock = threading.Lock()
+
+
+def _scoring_pool() -> ThreadPoolExecutor:
+    global _score_pool
+    if _score_pool is None:
+        with _score_pool_lock:
+            if _score_pool is None:
+                _score_pool = ThreadPoolExecutor(max_workers=os.cpu_count() or 1, thread_name_prefix="dense-score")
+    return _score_pool
+
+
+def text_key(text: str) -> int:
+    return int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "little", signed=True)
+
+
+class E5Encoder:
+    """Mean-pooled, L2-normalized E5 embeddings (``query: `` / ``passage: `` prefixes)."""
+
+    def __init__(self, model_dir: str, max_length: int = 128, batch_size: int = 64, num_threads: int = 0):
+        self.model_dir = model_dir
+        self.max_length = max_length
+        self.batch_size = batch_size
+        self.num_threads = num_threads or os.cpu_count() or 1
+        self._lock = threading.Lock()
+        self._model = None
+
+    def _load(self) -> None:
+        with self._lock:
+            if self._model is not None:
+                return
+            import torch
+            from transformers import AutoModel, AutoTokenizer
+
+            torch.set_num_threads(self.num_threads)
+            self._tokenizer = AutoTokenizer.from_pretrained(self.model_dir)
+            # The classifier checkpoint's encoder weights load into the bare model.
+            self._model = AutoModel.from_pretrained(self.model_dir).eval()
+
+    def encode(self, texts: List[str], prefix: str = "passage: ") -> np.ndarray:
+        import torch
+
+        if self._model is None:
+            self._load()
+        out = []
+        for start in range(0, len(texts), self.batch_size):
+            batch = [prefix + text for text in texts[start:start + self.batch_size]]
+            encoded = self._tokenizer(batch, padding=True, truncation=True, max_length=self.max_length, return_tensors="pt")
+            with torch.inference_mode():
+                hidden = self._model(**encoded).last_hidden_state
+            mask = encoded["attention_mask"].unsqueeze(-1).to(hidden.dtype)
+            pooled = (hidden * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1)
+            out.append(torch.nn.functional.normalize(pooled, dim=-1).numpy())
+        return np.concatenate(out) if out else np.empty((0, 0), dtype=np.float32)
+
+    def encode_queries(self, texts: List[str]) -> List[np.ndarray]:
+        """Per-text query vectors; shaped for :class:`~app.services.topic_classifier.MicroBatcher`."""
+        return list(self.encode(texts, prefix="query: "))
+
+
+class EmbeddingStore:
+    def __init__(self, directory: str):
+        self.directory = Path(directory)
+
+    @property
+    def meta_path(self) -> Path:
+        return self.directory / "meta.json"
+
+    def meta(self) -> Optional[Dict[str, object]]:
+        try:
+            return json.loads(self.meta_path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return None
+
+    def open(self) -> Tuple[np.ndarray, np.ndarray]:
+        """``(vectors, keys)`` memory-mapped up to the committed row count."""
+        meta = self.meta()
+        if not meta or not meta["count"]:
+            return np.empty((0, (meta or {}).get("dim", 0)), dtype=np.float16), np.empty(0, dtype=np.int64)
+        count, dim = meta["count"], meta["dim"]
+        vectors = np.memmap(self.directory / "vectors.f16", dtype=np.float16, mode="r", shape=(count, dim))
+        keys = np.memmap(self.directory / "row_keys.i64", dtype=np.int64, mode="r", shape=(count,))
+        return vectors, keys
+
+    def append(self, keys: np.ndarray, vectors: np.ndarray, model_dir: str = "") -> int:
+        """Appends rows, then commits them by rewriting ``meta.json`` atomically."""
+        meta = self.meta() or {"dim": int(vectors.shape[1]), "count": 0, "model_dir": model_dir}
+        if vectors.shape[1] != meta["dim"]:
+            raise ValueError(f"Embedding dim {vectors.shape[1]} does not match store dim {meta['dim']}")
+        self.directory.mkdir(parents=True, exist_ok=True)
+        # Drop any bytes from an interrupted append before adding new rows.
+        for name, itemsize, data in (
+            ("vectors.f16", 2 * meta["dim"], vectors.astype(np.float16)),
+            ("row_keys.i64", 8, keys.astype(np.int64)),
+        ):
+            with open(self.directory / name, "ab") as fp:
+                fp.truncate(meta["count"] * itemsize)
+                fp.write(np.ascontiguousarray(data).tobytes())
+                fp.flush()
+                os.fsync(fp.fileno())
+        meta["count"] += int(keys.shape[0])
+        staging = self.meta_path.with_suffix(".tmp")
+        staging.write_text(json.dumps(meta), encoding="utf-8")
+        os.replace(staging, self.meta_path)
+        return meta["count"]
+
+
+def build_embeddings(texts: Iterable[str], store: EmbeddingStore, encoder: E5Encoder, chunk: int = 4096) -> int:
+    """Embeds the texts not yet in ``store`` (by key), committing every ``chunk`` rows."""
+    _, keys = store.open()
+    known = set(keys.tolist())
+    pending: Dict[int, str] = {}
+    for text in texts:
+        key = text_key(text)
+        if key not in known and key not in pending:
+            pending[key] = text
+    items = list(pending.items())
+    for start in range(0, len(items), chunk):
+        batch = items[start:start + chunk]
+        vectors = encoder.encode([text for _, text in batch])
+        store.append(np.array([key for key, _ in batch], dtype=np.int64), vectors, model_dir=str(encoder.model_dir))
+    return len(items)
+
+
+class DenseRetriever:
+    """Cosine top-k over a store, reported in the engine's own row numbering."""
+
+    def __init__(self, store: EmbeddingStore, row_texts: List[str], query_encoder):
+        self.vectors, keys = store.open()
+        self.query_encoder = query_encoder  # anything with predict(text) -> vector
+        row_keys = [text_key(text) for text in row_texts]
+        first_row: Dict[int, int] = {}
+        for row, key in enumerate(row_keys):
+            first_row.setdefault(key, row)
+        # store row -> engine row (-1 for texts no longer in the knowledge base), and back;
+        # engine rows with duplicate texts share one embedding.
+        store_keys = keys.tolist()
+        self.store_to_row = np.array([first_row.get(key, -1) for key in store_keys], dtype=np.int64)
+        by_key = {key: store_row for store_row, key in enumerate(store_keys)}
+        self.row_to_store = np.array([by_key.get(key, -1) for key in row_keys], dtype=np.int64)
+        self.coverage = float((self.row_to_store >= 0).mean()) if row_keys else 0.0
+
+    def scores(self, query_vector: np.ndarray) -> np.ndarray:
+        """Cosine score of every store row (float32 BLAS matvec over float16 chunks)."""
+        query = np.asarray(query_vector, dtype=np.float32)
+        out = np.empty(self.vectors.shape[0], dtype=np.float32)
+
+        def score_chunk(start: int) -> None:
+            block = self.vectors[start:start + SCORE_CHUNK_ROWS].astype(np.float32)
+            np.dot(block, query, out=out[start:start + block.shape[0]])
+
+        starts = range(0, self.vectors.shape[0], SCORE_CHUNK_ROWS)
+        if len(starts) <= 1:
+            for start in starts:
+                score_chunk(start)
+        else:
+            list(_scoring_pool().map(score_chunk, starts))
+        return out
+
+    def encode_batch(self, texts: List[str]) -> List[np.ndarray]:
+        """Query vectors for ``texts``; a micro-batching encoder gets them all queued first."""
+        if len(texts) > 1 and hasattr(self.query_encoder, "submit"):
+            futures = [self.query_encoder.submit(text) for text in texts]
+            return [future.result() for future in futures]
+        return [self.query_encoder.predict(text) for text in texts]
+
+    def search(self, text: str, n: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """``(engine rows, their dense scores, all store scores)`` for the ``n`` nearest rows."""
+        return self.search_vector(self.query_encoder.predict(text), n)
+
+    def search_vector(self, query_vector: np.ndarray, n: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """:meth:`search` for an already encoded query."""
+        store_scores = self.scores(query_vector)
+        store_scores[self.store_to_row < 0] = -np.inf
+        top = top_k_indices(store_scores, n)
+        top = top[np.isfinite(store_scores[top])]
+        return self.store_to_row[top], store_scores[top], store_scores
+
+    def row_scores(self, rows: np.ndarray, store_scores: np.ndarray) -> np.ndarray:
+        stores = self.row_to_store[rows]
+        return np.where(stores >= 0, store_scores[np.maximum(stores, 0)], 0.0)
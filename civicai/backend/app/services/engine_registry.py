@@ -0,0 +1,130 @@
+"""Holds the live :class:`GrievanceService` and swaps in rebuilt engines without downtime.
+
+A reload refits the TF-IDF artifacts in a separate process, so the fit never competes
+with request threads for the GIL. It then loads the new artifacts in a background
+thread (memory-mapped, no refit) and publishes the new service with one reference
+assignment. Requests that already hold the old service finish on the old index.
+"""
+
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Dict, Optional
+
+from app.services.ai_engine import HybridAIEngine, load_engine
+from app.services.artifacts import build_artifacts, load_artifacts
+from app.services.grievance_service import GrievanceService
+
+logger = logging.getLogger(__name__)
+
+
+class EngineRegistry:
+    def __init__(self, data_file: str, model_store: str, **engine_options):
+        self.data_file = data_file
+        self.model_store = model_store
+        self.engine_options = engine_options
+        self._service: Optional[GrievanceService] = None
+        self._lock = threading.Lock()
+        self._reload_thread: Optional[threading.Thread] = None
+        self._watch_stop = threading.Event()
+        self.loaded_at: Optional[datetime] = None
+        self.last_reload_seconds: Optional[float] = None
+        self.last_error: Optional[str] = None
+
+    @property
+    def service(self) -> GrievanceService:
+        """The current service, loading the engine on first use."""
+        service = self._service
+        if service is None:
+            with self._lock:
+                if self._service is None:
+                    self._publish(load_engine(self.data_file, self.model_store, **self.engine_options))
+                service = self._service
+        return service
+
+    def _publish(self, engine: HybridAIEngine) -> None:
+        self._service = GrievanceService(engine)
+        self.loaded_at = datetime.utcnow()
+
+    @property
+    def reloading(self) -> bool:
+        thread = self._reload_thread
+        return thread is not None and thread.is_alive()
+
+    def reload(self, wait: bool = False) -> bool:
+        """Starts a background rebuild; ``False`` if one is already running."""
+        with self._lock:
+            if self.reloading:
+                return False
+            self._reload_thread = threading.Thread(target=self._reload, name="engine-reload", daemon=True)
+            self._reload_thread.start()
+        if wait:
+            self._reload_thread.join()
+        return True
+
+    def _reload(self) -> None:
+        started = time.perf_counter()
+        try:
+            with ProcessPoolExecutor(
+                max_workers=1, mp_context=multiprocessing.get_context("spawn"), initializer=_lower_priority
+            ) as pool:
+                pool.submit(build_artifacts, self.data_file, self.model_store).result()
+            artifacts = load_artifacts(self.model_store, self.data_file)
+            if artifacts is None:
+                raise RuntimeError(f"rebuilt artifacts in {self.model_store} did not load")
+            self._publish(HybridAIEngine.from_artifacts(artifacts, **self.engine_options))
+            self.last_error = None
+        except Exception as exc:  # keep serving the old engine
+            logger.exception("Engine reload failed")
+            self.last_error = repr(exc)
+        finally:
+            self.last_reload_seconds = round(time.perf_counter() - started, 3)
+
+    def watch(self, interval: float) -> None:
+        """Reloads whenever the data file's size or mtime changes (checked every ``interval`` s)."""
+        self._watch_stop.clear()
+        threading.Thread(target=self._watch, args=(interval,), name="engine-watch", daemon=True).start()
+
+    def _watch(self, interval: float) -> None:
+        last = _stat_key(self.data_file)
+        while not self._watch_stop.wait(interval):
+            current = _stat_key(self.data_file)
+            if current != last and current is not None:
+                logger.info("%s changed; reloading engine", self.data_file)
+                if self.reload():
+                    last = current
+
+    def stop_watching(self) -> None:
+        self._watch_stop.set()
+
+    def status(self) -> Dict[str, object]:
+        service = self._service
+        classifier = self.engine_options.get("classifier")
+        return {
+            "version": service.ai.version if service else None,
+            "classifier": classifier.stats() if classifier is not None else None,
+            "loaded_at": self.loaded_at.isoformat() if self.loaded_at else None,
+            "reloading": self.reloading,
+            "last_reload_seconds": self.last_reload_seconds,
+            "last_error": self.last_error,
+        }
+
+
+def _lower_priority() -> None:
+    """Runs in the rebuild process: yield CPU to request handlers when cores are scarce."""
+    if hasattr(os, "nice"):
+        os.nice(10)
+
+
+def _stat_key(path: str):
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
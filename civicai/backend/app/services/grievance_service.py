@@ -1,8 +1,36 @@
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from typing import List, Optional, Tuple
+
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from app.core.config import settings
 from app.models.entities import Complaint, Feedback, Log, Ticket
 from app.services.ai_engine import HybridAIEngine, build_tracking_id
+from app.services.analytics import record_complaints
+from app.services.status_cache import status_cache
+
+_match_executor: Optional[ThreadPoolExecutor] = None
+_match_executor_lock = threading.Lock()
+
+
+async def run_matching(call, *args):
+    """Runs CPU-bound engine work on the bounded ``match_workers`` pool.
+
+    Async routes await it instead of running it on the event loop or Starlette's
+    shared threadpool, so matching and database I/O never queue behind each other.
+    """
+    global _match_executor
+    if _match_executor is None:
+        with _match_executor_lock:
+            if _match_executor is None:
+                _match_executor = ThreadPoolExecutor(max_workers=settings.match_workers, thread_name_prefix="match")
+    return await asyncio.get_running_loop().run_in_executor(_match_executor, functools.partial(call, *args))
 
 
 class GrievanceService:
@@ -10,48 +38,157 @@ class GrievanceService:
         self.ai = ai
 
     def process_chat(self, db: Session, user_id: str, message: str, location: str):
-        match = self.ai.match(message)
-        similar = self.ai.top_similar(message)
-        severity = self.ai.predict_severity(message)
-        level = 1 if match.confidence >= 0.32 else 2
-        tracking_id = None
-        if level == 2:
-            tracking_id = self.create_ticket(db, user_id, message, match.category, location, severity, match.department)
-        reply = (
-            f"Department: {match.department}\n"
-            f"Solution: {match.solution}\n"
-            f"Expected time: 48h\n"
-            f"Helpline: 1533\n"
-            f"Confidence: {match.confidence:.2f}"
-        )
-        if level == 2:
-            reply += f"\nEscalated to Level-2. Tracking ID: {tracking_id}"
-        return reply, level, match.confidence, similar, tracking_id
+        return self.process_chat_batch(db, [(user_id, message, location)])[0]
+
+    def process_chat_batch(self, db: Session, messages: List[Tuple[str, str, str]]):
+        """``process_chat`` for ``(user_id, message, location)`` triples.
+
+        Matching runs as one engine batch and every Level-2 ticket is written in a
+        single transaction.
+        """
+        results = self.ai.query_batch([message for _, message, _ in messages])
+        tracking_ids = self._create_tickets(db, self._escalations(messages, results))
+        return self._replies(results, tracking_ids)
+
+    async def process_chat_async(self, db: AsyncSession, user_id: str, message: str, location: str):
+        return (await self.process_chat_batch_async(db, [(user_id, message, location)]))[0]
+
+    async def process_chat_batch_async(self, db: AsyncSession, messages: List[Tuple[str, str, str]]):
+        """:meth:`process_chat_batch` on an ``AsyncSession``, matching on the match pool."""
+        results = await run_matching(self.ai.query_batch, [message for _, message, _ in messages])
+        tracking_ids = await self._create_tickets_async(db, self._escalations(messages, results))
+        return self._replies(results, tracking_ids)
+
+    def _escalations(self, messages: List[Tuple[str, str, str]], results) -> List[Tuple[str, str, str, str, float, str]]:
+        escalations = []
+        for (user_id, message, location), result in zip(messages, results):
+            match = result.match
+            if match.confidence < 0.32:
+                severity = self.ai.predict_severity(message)
+                escalations.append((user_id, message, match.category, location, severity, match.department))
+        return escalations
+
+    def _replies(self, results, tracking_ids: List[str]):
+        tracking_ids = iter(tracking_ids)
+        replies = []
+        for result in results:
+            match = result.match
+            level = 1 if match.confidence >= 0.32 else 2
+            tracking_id = next(tracking_ids) if level == 2 else None
+            reply = (
+                f"Department: {match.department}\n"
+                f"Solution: {match.solution}\n"
+                f"Expected time: 48h\n"
+                f"Helpline: 1533\n"
+                f"Confidence: {match.confidence:.2f}"
+            )
+            if level == 2:
+                reply += f"\nEscalated to Level-2. Tracking ID: {tracking_id}"
+            replies.append((reply, level, match.confidence, list(result.similar), tracking_id))
+        return replies
 
     def create_ticket(self, db: Session, user_id: str, text: str, category: str, location: str, severity: float, authority: str):
-        complaint = Complaint(user_id=user_id, text=text, category=category, location=location, severity=severity, level=2)
-        db.add(complaint)
-        db.flush()
-        tracking_id = build_tracking_id()
-        ticket = Ticket(tracking_id=tracking_id, complaint_id=complaint.id, authority=authority, escalated=True, status="OPEN")
-        db.add(ticket)
-        db.add(Log(tracking_id=tracking_id, message="Day1: Ticket created"))
-        db.commit()
-        return tracking_id
+        return self._create_tickets(db, [(user_id, text, category, location, severity, authority)])[0]
+
+    async def create_ticket_async(self, db: AsyncSession, user_id: str, text: str, category: str, location: str, severity: float, authority: str):
+        return (await self._create_tickets_async(db, [(user_id, text, category, location, severity, authority)]))[0]
+
+    def _create_tickets(self, db: Session, tickets: List[Tuple[str, str, str, str, float, str]]) -> List[str]:
+        """Complaint + ticket + first log per ``(user_id, text, category, location, severity, authority)``,
+        plus the analytics rollup, with one flush and one commit for the lot."""
+        if not tickets:
+            return []
+        tracking_ids = self._stage_tickets(db, tickets)
+        db.commit()  # new tracking IDs have no status cache entries to invalidate
+        return tracking_ids
+
+    async def _create_tickets_async(self, db: AsyncSession, tickets: List[Tuple[str, str, str, str, float, str]]) -> List[str]:
+        if not tickets:
+            return []
+        tracking_ids = await db.run_sync(self._stage_tickets, tickets)
+        await db.commit()
+        return tracking_ids
+
+    def _stage_tickets(self, db: Session, tickets: List[Tuple[str, str, str, str, float, str]]) -> List[str]:
+        """Inserts the complaints, tickets and logs with one executemany each; the caller commits."""
+        now = datetime.utcnow()
+        complaints = [
+            {"user_id": user_id, "text": text, "category": category, "location": location, "severity": severity, "level": 2, "created_at": now}
+            for user_id, text, category, location, severity, _ in tickets
+        ]
+        complaint_ids = db.scalars(insert(Complaint).returning(Complaint.id, sort_by_parameter_order=True), complaints).all()
+        record_complaints(db, complaints)
+        # Tracking IDs are random, so they need no sequence round trip.
+        tracking_ids = [build_tracking_id() for _ in tickets]
+        db.execute(
+            insert(Ticket),
+            [
+                {"tracking_id": tracking_id, "complaint_id": complaint_id, "authority": authority, "escalated": True, "status": "OPEN", "created_at": now}
+                for tracking_id, complaint_id, (*_, authority) in zip(tracking_ids, complaint_ids, tickets)
+            ],
+        )
+        db.execute(insert(Log), [{"tracking_id": tracking_id, "message": "Day1: Ticket created", "created_at": now} for tracking_id in tracking_ids])
+        return tracking_ids
+
+    def ingest_complaints(self, db: Session, rows: List[Tuple[str, str, str]]) -> List[Tuple[str, str, str]]:
+        """Files ``(user_id, text, location)`` rows the way ``/complaint`` does, with one
+        classification batch and one commit; ``(tracking_id, category, authority)`` per row.
+
+        Skips the query cache so a large upload does not evict the chat working set.
+        """
+        results = self.ai.query_batch([text for _, text, _ in rows], k=1, cache=False)
+        tickets = [
+            (user_id, text, result.match.category, location, self.ai.predict_severity(text), result.match.department)
+            for (user_id, text, location), result in zip(rows, results)
+        ]
+        tracking_ids = self._create_tickets(db, tickets)
+        return [(tracking_id, category, authority) for tracking_id, (_, _, category, _, _, authority) in zip(tracking_ids, tickets)]
 
     def add_feedback(self, db: Session, user_id: str, tracking_id: str, rating: int, comment: str):
         db.add(Feedback(user_id=user_id, tracking_id=tracking_id, rating=rating, comment=comment))
         db.commit()
 
+    async def add_feedback_async(self, db: AsyncSession, user_id: str, tracking_id: str, rating: int, comment: str):
+        db.add(Feedback(user_id=user_id, tracking_id=tracking_id, rating=rating, comment=comment))
+        await db.commit()
+
     def follow_up(self, db: Session, ticket: Ticket):
+        db.add(Log(tracking_id=ticket.tracking_id, message=self._follow_up_message(ticket)))
+        db.commit()
+        status_cache.invalidate(ticket.tracking_id)
+
+    async def follow_up_async(self, db: AsyncSession, ticket: Ticket):
+        db.add(Log(tracking_id=ticket.tracking_id, message=self._follow_up_message(ticket)))
+        await db.commit()
+        await status_cache.invalidate_async(ticket.tracking_id)
+
+    def _follow_up_message(self, ticket: Ticket) -> str:
         age = (datetime.utcnow() - ticket.created_at).days
         if age >= 5:
-            msg = "Day5: Public alert"
-        elif age >= 3:
-            msg = "Day3: Escalated to Level-2 authority"
-        elif age >= 2:
-            msg = "Day2: Reminder sent"
-        else:
-            msg = "Day1: Ticket created"
-        db.add(Log(tracking_id=ticket.tracking_id, message=msg))
+            return "Day5: Public alert"
+        if age >= 3:
+            return "Day3: Escalated to Level-2 authority"
+        if age >= 2:
+            return "Day2: Reminder sent"
+        return "Day1: Ticket created"
+
+    def set_status(self, db: Session, tracking_id: str, status: str) -> bool:
+        """Moves a ticket to ``status`` and logs it; ``False`` if there is no such ticket."""
+        ticket = db.scalar(select(Ticket).where(Ticket.tracking_id == tracking_id))
+        if ticket is None:
+            return False
+        ticket.status = status
+        db.add(Log(tracking_id=tracking_id, message=f"Status changed to {status}"))
         db.commit()
+        status_cache.invalidate(tracking_id)
+        return True
+
+    async def set_status_async(self, db: AsyncSession, tracking_id: str, status: str) -> bool:
+        ticket = await db.scalar(select(Ticket).where(Ticket.tracking_id == tracking_id))
+        if ticket is None:
+            return False
+        ticket.status = status
+        db.add(Log(tracking_id=tracking_id, message=f"Status changed to {status}"))
+        await db.commit()
+        await status_cache.invalidate_async(tracking_id)
+        return True
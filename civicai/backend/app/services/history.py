@@ -0,0 +1,120 @@
+"""Paged complaint history and streamed complaint exports.
+
+History pages are keyset-paginated on ``(user_id, created_at, id)``, newest first,
+which the ``ix_complaints_user_created_id`` index serves directly: every page is an
+index range scan, however deep the cursor. Exports read through a server-side cursor
+in ``EXPORT_BATCH_ROWS`` partitions and are written out as they arrive.
+"""
+
+from __future__ import annotations
+
+import base64
+import csv
+import io
+import json
+from datetime import date, datetime, time, timedelta
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import and_, or_, select
+from sqlalchemy.orm import Session
+
+from app.db.session import SessionLocal
+from app.models.entities import Complaint, Ticket
+
+EXPORT_FORMATS = ("ndjson", "csv")
+EXPORT_BATCH_ROWS = 1000
+EXPORT_COLUMNS = (
+    "id",
+    "user_id",
+    "text",
+    "category",
+    "location",
+    "severity",
+    "level",
+    "created_at",
+    "tracking_id",
+    "status",
+    "authority",
+)
+
+
+def encode_cursor(complaint: Complaint) -> str:
+    raw = json.dumps([complaint.created_at.isoformat(), complaint.id]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """``(created_at, id)`` of the last complaint on the previous page; ``ValueError`` if malformed."""
+    try:
+        created_at, complaint_id = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return datetime.fromisoformat(created_at), int(complaint_id)
+    except (TypeError, ValueError, UnicodeDecodeError) as exc:
+        raise ValueError(f"Invalid cursor {cursor!r}") from exc
+
+
+def history_page(db: Session, user_id: str, limit: int, cursor: Optional[str] = None) -> Tuple[List[Complaint], Optional[str]]:
+    """Up to ``limit`` of the user's complaints after ``cursor``, and the cursor of the next page."""
+    query = select(Complaint).where(Complaint.user_id == user_id)
+    if cursor:
+        created_at, complaint_id = decode_cursor(cursor)
+        query = query.where(
+            or_(Complaint.created_at < created_at, and_(Complaint.created_at == created_at, Complaint.id < complaint_id))
+        )
+    # One extra row tells whether another page exists.
+    rows = db.scalars(query.order_by(Complaint.created_at.desc(), Complaint.id.desc()).limit(limit + 1)).all()
+    if len(rows) > limit:
+        return rows[:limit], encode_cursor(rows[limit - 1])
+    return rows, None
+
+
+def stream_export(fmt: str, start: Optional[date] = None, end: Optional[date] = None) -> Iterator[str]:
+    """Complaints (with their ticket, if any) filed between ``start`` and ``end`` as NDJSON or CSV text.
+
+    Opens its own session: the generator outlives the request's dependencies.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format {fmt!r}; expected one of {EXPORT_FORMATS}")
+    query = (
+        select(
+            Complaint.id,
+            Complaint.user_id,
+            Complaint.text,
+            Complaint.category,
+            Complaint.location,
+            Complaint.severity,
+            Complaint.level,
+            Complaint.created_at,
+            Ticket.tracking_id,
+            Ticket.status,
+            Ticket.authority,
+        )
+        .outerjoin(Ticket, Ticket.complaint_id == Complaint.id)
+        .order_by(Complaint.id)
+    )
+    if start is not None:
+        query = query.where(Complaint.created_at >= datetime.combine(start, time.min))
+    if end is not None:
+        query = query.where(Complaint.created_at < datetime.combine(end + timedelta(days=1), time.min))
+
+    with SessionLocal() as db:
+        result = db.execute(query.execution_options(stream_results=True, yield_per=EXPORT_BATCH_ROWS))
+        if fmt == "csv":
+            yield _csv_lines([EXPORT_COLUMNS])
+        for rows in result.partitions():
+            records = [_record(row) for row in rows]
+            if fmt == "csv":
+                yield _csv_lines([[record[column] for column in EXPORT_COLUMNS] for record in records])
+            else:
+                yield "".join(json.dumps(record) + "\n" for record in records)
+
+
+def _record(row) -> Dict[str, object]:
+    record = dict(zip(EXPORT_COLUMNS, row))
+    record["created_at"] = record["created_at"].isoformat() if record["created_at"] else None
+    return record
+
+
+def _csv_lines(rows) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    return buffer.getvalue()
@@ -0,0 +1,216 @@
+"""Read-through cache for ``/status/{ticket_id}`` payloads.
+
+Entries live in Redis (``settings.redis_url``) so every API worker shares them, or in
+an in-process LRU when Redis is not configured or not reachable (it is retried with
+exponential backoff). ``GrievanceService`` invalidates a ticket's entry after
+committing any change to it.
+
+Invalidation leaves a short-lived tombstone instead of deleting, and read-through
+puts only fill an empty slot: a status loaded before a change but put after its
+invalidation is dropped rather than cached for the full TTL. The TTL bounds how
+stale an entry can get when an invalidation is missed (a Redis error, or another
+worker's local LRU).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import json
+import logging
+import threading
+import time
+from typing import Dict, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.entities import Log, Ticket
+from app.services.ai_engine import QueryCache
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "civicai:status:"
+TOMBSTONE_TTL = 5.0  # seconds; far longer than a status load takes
+RETRY_MIN = 1.0  # seconds before the first Redis reconnect attempt, doubling per failure
+RETRY_MAX = 60.0
+
+
+class StatusCache:
+    def __init__(self, redis_url: str = "", maxsize: int = 10000, ttl: float = 30.0, tombstone_ttl: float = TOMBSTONE_TTL):
+        self.redis_url = redis_url
+        self.ttl = ttl
+        self.tombstone_ttl = tombstone_ttl
+        self.local = QueryCache(maxsize, ttl)  # payload dicts, or a tombstone's monotonic deadline
+        self._redis = None
+        self._retry_at = 0.0
+        self._backoff = RETRY_MIN
+        self._lock = threading.Lock()
+        self._local_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    def _client(self):
+        """The Redis client; ``None`` means the local LRU (no URL, or Redis down until the next retry)."""
+        if self._redis is not None or not self.redis_url or time.monotonic() < self._retry_at:
+            return self._redis
+        with self._lock:
+            if self._redis is None and time.monotonic() >= self._retry_at:
+                client = self._connect()
+                if client is None:
+                    self._retry_at = time.monotonic() + self._backoff
+                    self._backoff = min(self._backoff * 2, RETRY_MAX)
+                else:
+                    self._backoff = RETRY_MIN
+                    self.local.clear()  # invalidations since the fallback went to Redis
+                    self._redis = client
+        return self._redis
+
+    def _connect(self):
+        try:
+            import redis
+
+            client = redis.Redis.from_url(self.redis_url, socket_connect_timeout=0.5, socket_timeout=0.5)
+            client.ping()
+            return client
+        except Exception as exc:  # missing package, DNS, refused connection
+            logger.warning("Redis at %s unavailable (%r); caching ticket status in-process", self.redis_url, exc)
+            return None
+
+    def _failed(self, client) -> None:
+        """Counts a Redis error and falls back to the local LRU until the next retry."""
+        self._count("errors")
+        with self._lock:
+            if self._redis is client:
+                logger.warning("Redis at %s failed; caching ticket status in-process", self.redis_url)
+                self._redis = None
+                self._retry_at = time.monotonic() + self._backoff
+
+    def _count(self, counter: str) -> None:
+        with self._stats_lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def get(self, tracking_id: str) -> Optional[Dict[str, object]]:
+        client = self._client()
+        if client is None:
+            value = self.local.get(tracking_id)
+            if not isinstance(value, dict):  # tombstone
+                value = None
+        else:
+            try:
+                raw = client.get(KEY_PREFIX + tracking_id)
+            except Exception:
+                self._failed(client)
+                raw = None
+            value = json.loads(raw) if raw else None  # b"" is a tombstone
+        self._count("misses" if value is None else "hits")
+        return value
+
+    def put(self, tracking_id: str, payload: Dict[str, object], loaded_at: Optional[float] = None) -> None:
+        """Caches ``payload`` unless the slot is taken (a live entry or a tombstone).
+
+        ``loaded_at`` is the ``time.monotonic()`` at which the payload was read; a load
+        that outlived the tombstones is not cached, as an invalidation may have expired.
+        """
+        if loaded_at is not None and time.monotonic() - loaded_at >= self.tombstone_ttl:
+            return
+        client = self._client()
+        if client is None:
+            with self._local_lock:
+                current = self.local.get(tracking_id)
+                if current is None or (not isinstance(current, dict) and current <= time.monotonic()):
+                    self.local.put(tracking_id, payload)
+            return
+        try:
+            client.set(KEY_PREFIX + tracking_id, json.dumps(payload), px=int(self.ttl * 1000), nx=True)
+        except Exception:
+            self._failed(client)
+
+    def invalidate(self, *tracking_ids: str) -> None:
+        if not tracking_ids:
+            return
+        client = self._client()
+        if client is None:
+            with self._local_lock:
+                for tracking_id in tracking_ids:
+                    self.local.put(tracking_id, time.monotonic() + self.tombstone_ttl)
+            return
+        try:
+            pipe = client.pipeline(transaction=False)
+            for tracking_id in tracking_ids:
+                pipe.set(KEY_PREFIX + tracking_id, b"", px=int(self.tombstone_ttl * 1000))
+            pipe.execute()
+        except Exception:
+            self._failed(client)
+
+    # Async callers: Redis I/O (including the first-use connect) runs on a worker thread
+    # so a slow or unreachable Redis never stalls the event loop. Without a Redis URL
+    # there is no I/O and the LRU is used inline.
+
+    async def get_async(self, tracking_id: str) -> Optional[Dict[str, object]]:
+        return await self._off_loop(self.get, tracking_id)
+
+    async def put_async(self, tracking_id: str, payload: Dict[str, object], loaded_at: Optional[float] = None) -> None:
+        await self._off_loop(self.put, tracking_id, payload, loaded_at)
+
+    async def invalidate_async(self, *tracking_ids: str) -> None:
+        await self._off_loop(self.invalidate, *tracking_ids)
+
+    async def _off_loop(self, call, *args):
+        if not self.redis_url:
+            return call(*args)
+        return await asyncio.get_running_loop().run_in_executor(None, functools.partial(call, *args))
+
+    def stats(self) -> Dict[str, object]:
+        backend = "redis" if self._client() is not None else "local"
+        with self._stats_lock:
+            return {"backend": backend, "hits": self.hits, "misses": self.misses, "errors": self.errors}
+
+
+status_cache = StatusCache(settings.redis_url, settings.status_cache_size, settings.status_cache_ttl)
+
+
+def ticket_status(db: Session, tracking_id: str) -> Optional[Dict[str, object]]:
+    """The ``/status`` payload for ``tracking_id`` (``None`` if no such ticket), via the cache.
+
+    A miss loads the ticket and its logs in one query (ticket outer-joined to its logs).
+    """
+    payload = status_cache.get(tracking_id)
+    if payload is None:
+        loaded_at = time.monotonic()
+        payload = _load_status(db, tracking_id)
+        if payload is not None:
+            status_cache.put(tracking_id, payload, loaded_at)
+    return payload
+
+
+async def ticket_status_async(db: AsyncSession, tracking_id: str) -> Optional[Dict[str, object]]:
+    payload = await status_cache.get_async(tracking_id)
+    if payload is None:
+        loaded_at = time.monotonic()
+        payload = await db.run_sync(_load_status, tracking_id)
+        if payload is not None:
+            await status_cache.put_async(tracking_id, payload, loaded_at)
+    return payload
+
+
+def _load_status(db: Session, tracking_id: str) -> Optional[Dict[str, object]]:
+    rows = db.execute(
+        select(Ticket.status, Ticket.authority, Log.message)
+        .outerjoin(Log, Log.tracking_id == Ticket.tracking_id)
+        .where(Ticket.tracking_id == tracking_id)
+        .order_by(Log.id)
+    ).all()
+    if not rows:
+        return None
+    payload = {
+        "tracking_id": tracking_id,
+        "status": rows[0].status,
+        "authority": rows[0].authority,
+        "logs": [row.message for row in rows if row.message is not None],
+    }
+    return payload
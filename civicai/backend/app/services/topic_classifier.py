@@ -0,0 +1,307 @@
+"""CPU inference for the fine-tuned E5 topic classifier (``train_e5_classifier.py``).
+
+``E5TopicClassifier`` wraps the saved model directory (weights, tokenizer and
+``label_encoder.pkl``) and can run it through PyTorch, PyTorch with dynamic int8
+quantization of the Linear layers, or ONNX Runtime (exported on first use and
+optionally int8-quantized). ``HashedNgramClassifier`` is the distilled linear
+student (``scripts/distill_topic_classifier.py``), which needs neither torch nor a
+tokenizer. ``MicroBatcher`` gathers concurrent single-text calls, e.g. from parallel
+``/chat`` requests, into one padded batch per forward pass.
+
+torch / transformers / onnxruntime are imported on first load, never at import time.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+CLASSIFIER_BACKENDS = ("torch", "onnx")
+HASHED_MODEL_FILE = "hashed_ngram.npz"
+
+
+@dataclass(frozen=True)
+class TopicPrediction:
+    label: str
+    confidence: float
+
+
+class E5TopicClassifier:
+    def __init__(self, model_dir: str, backend: str = "torch", quantize: bool = False, max_length: int = 128, num_threads: int = 0):
+        if backend not in CLASSIFIER_BACKENDS:
+            raise ValueError(f"Unknown classifier backend {backend!r}; expected one of {CLASSIFIER_BACKENDS}")
+        self.model_dir = Path(model_dir)
+        self.backend = backend
+        self.quantize = quantize
+        self.max_length = max_length
+        self.num_threads = num_threads or os.cpu_count() or 1
+        self._lock = threading.Lock()
+        self._run = None  # tokenized batch -> logits (numpy)
+
+    def load(self) -> None:
+        with self._lock:
+            if self._run is not None:
+                return
+            import joblib
+            from transformers import AutoTokenizer
+
+            started = time.perf_counter()
+            self.tokenizer = AutoTokenizer.from_pretrained(self.model_dir)
+            self.labels = [str(label) for label in joblib.load(self.model_dir / "label_encoder.pkl").classes_]
+            self._run = self._load_onnx() if self.backend == "onnx" else self._load_torch()
+            logger.info("Loaded %s classifier (%s%s) in %.1fs", self.model_dir, self.backend, ", int8" if self.quantize else "", time.perf_counter() - started)
+
+    def _load_torch(self) -> Callable:
+        import torch
+        from transformers import AutoModelForSequenceClassification
+
+        torch.set_num_threads(self.num_threads)
+        model = AutoModelForSequenceClassification.from_pretrained(self.model_dir).eval()
+        if self.quantize:
+            model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+        def run(encoded):
+            with torch.inference_mode():
+                return model(**{name: torch.from_numpy(value) for name, value in encoded.items()}).logits.numpy()
+
+        return run
+
+    def _load_onnx(self) -> Callable:
+        import onnxruntime as ort
+
+        path = self.export_onnx()
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = self.num_threads
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        session = ort.InferenceSession(str(path), options, providers=["CPUExecutionProvider"])
+        inputs = {node.name for node in session.get_inputs()}
+
+        def run(encoded):
+            return session.run(None, {name: value for name, value in encoded.items() if name in inputs})[0]
+
+        return run
+
+    def export_onnx(self) -> Path:
+        """Exports the model to ``<model_dir>/onnx`` once (and its int8 variant if ``quantize``)."""
+        target = self.model_dir / "onnx" / "model.onnx"
+        if not target.exists():
+            import torch
+            from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+            target.parent.mkdir(parents=True, exist_ok=True)
+            model = AutoModelForSequenceClassification.from_pretrained(self.model_dir).eval()
+            sample = AutoTokenizer.from_pretrained(self.model_dir)(["sample grievance"], return_tensors="pt")
+            names = [name for name in ("input_ids", "attention_mask", "token_type_ids") if name in sample]
+            axes = {name: {0: "batch", 1: "sequence"} for name in names}
+            torch.onnx.export(
+                model,
+                tuple(sample[name] for name in names),
+                str(target),
+                input_names=names,
+                output_names=["logits"],
+                dynamic_axes=dict(axes, logits={0: "batch"}),
+                opset_version=17,
+            )
+        if not self.quantize:
+            return target
+        quantized = target.with_name("model.int8.onnx")
+        if not quantized.exists():
+            from onnxruntime.quantization import QuantType, quantize_dynamic
+
+            quantize_dynamic(str(target), str(quantized), weight_type=QuantType.QInt8)
+        return quantized
+
+    def predict_proba(self, texts: List[str]):
+        """Softmax over ``labels`` per text; padding is to the longest text in the batch."""
+        import numpy as np
+
+        if self._run is None:
+            self.load()
+        encoded = dict(self.tokenizer(texts, padding=True, truncation=True, max_length=self.max_length, return_tensors="np"))
+        logits = self._run({name: value.astype(np.int64) for name, value in encoded.items()})
+        return _softmax(logits)
+
+    def predict_batch(self, texts: List[str]) -> List[TopicPrediction]:
+        """Top label and softmax probability per text."""
+        return _top_predictions(self.predict_proba(texts), self.labels)
+
+
+class HashedNgramClassifier:
+    """Softmax regression over hashed word 1-2 grams.
+
+    The model directory holds ``hashed_ngram.npz`` (weights, bias, feature count) and
+    the teacher's ``label_encoder.pkl``; scoring is one sparse-dense product.
+    """
+
+    def __init__(self, model_dir: str):
+        self.model_dir = Path(model_dir)
+        self._lock = threading.Lock()
+        self.weights = None
+
+    def load(self) -> None:
+        with self._lock:
+            if self.weights is not None:
+                return
+            import joblib
+            import numpy as np
+
+            with np.load(self.model_dir / HASHED_MODEL_FILE) as model:
+                self.vectorizer = _hashing_vectorizer(int(model["n_features"]))
+                self.bias = model["bias"]
+                weights = model["weights"]
+            self.labels = [str(label) for label in joblib.load(self.model_dir / "label_encoder.pkl").classes_]
+            self.weights = weights
+
+    def predict_proba(self, texts: List[str]):
+        if self.weights is None:
+            self.load()
+        return _softmax(self.vectorizer.transform(texts) @ self.weights + self.bias)
+
+    def predict_batch(self, texts: List[str]) -> List[TopicPrediction]:
+        return _top_predictions(self.predict_proba(texts), self.labels)
+
+    @classmethod
+    def fit(
+        cls,
+        texts: List[str],
+        targets,
+        label_encoder,
+        model_dir: str,
+        n_features: int = 1 << 16,
+        epochs: int = 8,
+        learning_rate: float = 0.5,
+        batch_size: int = 256,
+        seed: int = 0,
+    ) -> "HashedNgramClassifier":
+        """Trains on ``targets`` (rows are probability distributions over the label
+        encoder's classes, e.g. softened teacher outputs) and saves to ``model_dir``.
+
+        Minibatch AdaGrad on the cross-entropy; only the weight rows of the hashed
+        features present in a batch are touched.
+        """
+        import joblib
+        import numpy as np
+        from scipy import sparse
+
+        features = _hashing_vectorizer(n_features).transform(texts)
+        targets = np.asarray(targets, dtype=np.float32)
+        weights = np.zeros((n_features, targets.shape[1]), dtype=np.float32)
+        bias = np.zeros(targets.shape[1], dtype=np.float32)
+        weight_sq = np.full_like(weights, 1e-8)
+        bias_sq = np.full_like(bias, 1e-8)
+        rng = np.random.default_rng(seed)
+        for _ in range(epochs):
+            order = rng.permutation(features.shape[0])
+            for start in range(0, order.shape[0], batch_size):
+                rows = order[start:start + batch_size]
+                batch = features[rows]
+                columns, local = np.unique(batch.indices, return_inverse=True)
+                batch = sparse.csr_matrix((batch.data, local, batch.indptr), shape=(rows.shape[0], columns.shape[0]))
+                error = (_softmax(batch @ weights[columns] + bias) - targets[rows]) / rows.shape[0]
+                grad = batch.T @ error
+                weight_sq[columns] += grad * grad
+                weights[columns] -= learning_rate * grad / np.sqrt(weight_sq[columns])
+                grad_bias = error.sum(axis=0)
+                bias_sq += grad_bias * grad_bias
+                bias -= learning_rate * grad_bias / np.sqrt(bias_sq)
+
+        directory = Path(model_dir)
+        directory.mkdir(parents=True, exist_ok=True)
+        np.savez(directory / HASHED_MODEL_FILE, weights=weights, bias=bias, n_features=n_features)
+        joblib.dump(label_encoder, directory / "label_encoder.pkl")
+        return cls(model_dir)
+
+
+def open_topic_classifier(model_dir: str, backend: str = "torch", **options):
+    """The classifier saved in ``model_dir``: a hashed student or an E5 checkpoint."""
+    if (Path(model_dir) / HASHED_MODEL_FILE).exists():
+        return HashedNgramClassifier(model_dir)
+    return E5TopicClassifier(model_dir, backend=backend, **options)
+
+
+def _hashing_vectorizer(n_features: int):
+    import numpy as np
+    from sklearn.feature_extraction.text import HashingVectorizer
+
+    return HashingVectorizer(ngram_range=(1, 2), n_features=n_features, alternate_sign=False, dtype=np.float32)
+
+
+def _softmax(logits):
+    import numpy as np
+
+    logits = logits - logits.max(axis=1, keepdims=True)
+    probs = np.exp(logits)
+    probs /= probs.sum(axis=1, keepdims=True)
+    return probs
+
+
+def _top_predictions(probs, labels: List[str]) -> List[TopicPrediction]:
+    best = probs.argmax(axis=1)
+    return [TopicPrediction(labels[int(i)], float(probs[row, i])) for row, i in enumerate(best)]
+
+
+class MicroBatcher:
+    """Collects single predictions from many threads into batches for ``predict_batch``.
+
+    A batch is dispatched once it holds ``max_batch_size`` texts or ``max_wait_ms``
+    after its first text arrived, whichever comes first.
+    """
+
+    def __init__(self, predict_batch: Callable[[List[str]], List[object]], max_batch_size: int = 32, max_wait_ms: float = 5.0):
+        self.predict_batch = predict_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue: "queue.Queue[tuple]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.items = 0
+
+    def submit(self, text: str) -> Future:
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._serve, name="classifier-batcher", daemon=True)
+                    self._thread.start()
+        future: Future = Future()
+        self._queue.put((text, future))
+        return future
+
+    def predict(self, text: str, timeout: Optional[float] = None):
+        return self.submit(text).result(timeout)
+
+    def _serve(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            texts = [text for text, _ in batch]
+            try:
+                results = self.predict_batch(texts)
+            except Exception as exc:
+                for _, future in batch:
+                    future.set_exception(exc)
+                continue
+            self.batches += 1
+            self.items += len(batch)
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
+
+    def stats(self):
+        return {"batches": self.batches, "items": self.items, "mean_batch": round(self.items / self.batches, 2) if self.batches else 0.0}
@@ -0,0 +1,102 @@
+"""Recall@k / QPS benchmark: exact vs cluster-pruned TF-IDF search.
+
+Builds synthetic grievance corpora of each requested size by mixing the words of
+random pairs of source texts, fits the engine's TF-IDF vectorizer, and reports per
+size the exact QPS and, for every ``nprobe``, approximate QPS and recall@k against
+exact search. Output is JSON.
+
+    cd backend
+    PYTHONPATH=. python scripts/bench_ann.py --source ../../hf_combined.csv --sizes 10000,100000,300000
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import time
+from typing import Dict, List
+
+import pandas as pd
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from app.core.config import settings
+from app.services.ann_index import ClusterPrunedIndex, ExactIndex
+
+
+def synthetic_texts(source: List[str], size: int, rng: random.Random) -> List[str]:
+    texts = []
+    for _ in range(size):
+        words = rng.choice(source).split() + rng.choice(source).split()
+        texts.append(" ".join(rng.sample(words, max(1, len(words) * 2 // 3))))
+    return texts
+
+
+def timed_search(index, queries, k: int, **kwargs) -> Dict[str, object]:
+    results = []
+    started = time.perf_counter()
+    for i in range(queries.shape[0]):
+        results.append(index.search(queries[i], k, **kwargs))
+    elapsed = time.perf_counter() - started
+    return {"results": results, "qps": round(queries.shape[0] / elapsed, 1)}
+
+
+def recall_at_k(exact, approx, k: int) -> float:
+    """Share of approximate hits scoring at least the exact k-th score (tie-safe recall@k)."""
+    hits = total = 0
+    for (_, exact_scores), (_, approx_scores) in zip(exact, approx):
+        if exact_scores.size == 0 or exact_scores[0] <= 0:
+            continue  # query shares no terms with the corpus; every answer is equally right
+        threshold = exact_scores[-1] - 1e-9
+        hits += int((approx_scores >= threshold).sum())
+        total += min(k, exact_scores.size)
+    return round(hits / total, 4) if total else 1.0
+
+
+def run_size(source: List[str], size: int, args: argparse.Namespace) -> Dict[str, object]:
+    rng = random.Random(args.seed + size)
+    texts = synthetic_texts(source, size, rng)
+    vectorizer = TfidfVectorizer(stop_words="english", ngram_range=(1, 2), min_df=1)
+    vectors = vectorizer.fit_transform(texts)
+    queries = vectorizer.transform(synthetic_texts(source, args.queries, rng))
+
+    exact = timed_search(ExactIndex(vectors), queries, args.k)
+    started = time.perf_counter()
+    approx_index = ClusterPrunedIndex(vectors, n_lists=args.lists, seed=args.seed)
+    build_seconds = time.perf_counter() - started
+
+    approx = []
+    for nprobe in [int(n) for n in args.nprobe.split(",")]:
+        run = timed_search(approx_index, queries, args.k, nprobe=nprobe)
+        approx.append({"nprobe": nprobe, "qps": run["qps"], "recall_at_k": recall_at_k(exact["results"], run["results"], args.k)})
+    return {
+        "size": size,
+        "features": vectors.shape[1],
+        "lists": approx_index.n_lists,
+        "build_seconds": round(build_seconds, 3),
+        "exact_qps": exact["qps"],
+        "approx": approx,
+    }
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Exact vs approximate TF-IDF search: recall@k and QPS")
+    parser.add_argument("--source", default=settings.data_file, help="CSV with a 'text' column to synthesize from")
+    parser.add_argument("--sizes", default="10000,50000,200000", help="comma-separated corpus sizes")
+    parser.add_argument("--queries", type=int, default=200, help="queries per size")
+    parser.add_argument("--k", type=int, default=3, help="neighbours per query (recall@k)")
+    parser.add_argument("--lists", type=int, default=0, help="inverted lists (0 = sqrt(size))")
+    parser.add_argument("--nprobe", default="1,4,8,16,32", help="comma-separated nprobe values")
+    parser.add_argument("--seed", type=int, default=0)
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    source = [t for t in pd.read_csv(args.source)["text"].astype(str).tolist() if t.strip()]
+    report = {"k": args.k, "queries": args.queries, "results": [run_size(source, int(s), args) for s in args.sizes.split(",")]}
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,7 @@
+import json
+
+from app.core.config import settings
+from app.services.artifacts import build_artifacts
+
+manifest = build_artifacts(settings.data_file, settings.model_store)
+print(json.dumps(manifest, indent=2))
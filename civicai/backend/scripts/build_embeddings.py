@@ -0,0 +1,13 @@
+"""Embeds knowledge-base rows that are not in the embedding store yet (run after CSV updates).
+
+    python -m scripts.build_embeddings
+"""
+
+from app.core.config import settings
+from app.services.ai_engine import read_dataset
+from app.services.embedding_store import E5Encoder, EmbeddingStore, build_embeddings
+
+store = EmbeddingStore(settings.embedding_store or f"{settings.model_store}/embeddings")
+encoder = E5Encoder(settings.embedding_model_dir or settings.classifier_dir, num_threads=settings.classifier_threads)
+added = build_embeddings(read_dataset(settings.data_file)["text"], store, encoder)
+print(f"Embedded {added} new rows; store now holds {store.meta()['count'] if store.meta() else 0}.")
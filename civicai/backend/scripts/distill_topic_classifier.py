@@ -0,0 +1,241 @@
+"""Distils the fine-tuned E5 topic classifier into smaller students and reports the trade-off.
+
+The teacher (``train_e5_classifier.py`` output) labels the training split of
+``train_topic_data.csv`` with temperature-softened probabilities; each student learns
+``alpha * soft + (1 - alpha) * true label``. Students:
+
+* ``hashed``      - softmax regression over hashed word 1-2 grams (NumPy only at
+                    serving time), saved to ``<teacher>-hashed``;
+* ``transformer`` - the teacher cut down to ``--layers`` evenly spaced encoder layers
+                    and fine-tuned on the soft targets, saved to ``<teacher>-L<layers>``
+                    in the teacher's own layout.
+
+Either directory can be served as ``CLASSIFIER_DIR``. The report compares teacher and
+students on the held-out split (the one ``train_e5_classifier.py`` evaluates on):
+accuracy, agreement with the teacher, load time, p50/p99 single-item latency, batch
+throughput and peak RSS, each measured in a fresh process.
+
+    cd backend
+    python -m scripts.distill_topic_classifier --teacher-dir ../../models/e5_topic_classifier
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import multiprocessing
+import os
+import resource
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+
+from app.core.config import settings
+from app.services.topic_classifier import E5TopicClassifier, HashedNgramClassifier, open_topic_classifier
+
+# Same held-out split as train_e5_classifier.py.
+TEST_SIZE = 0.2
+SPLIT_SEED = 42
+STUDENTS = ("hashed", "transformer")
+
+
+def load_split(data_file: str, label_encoder):
+    import pandas as pd
+    from sklearn.model_selection import train_test_split
+
+    df = pd.read_csv(data_file)
+    texts = df["text"].astype(str).tolist()
+    labels = label_encoder.transform(df["label_topic"].astype(str).tolist())
+    return train_test_split(texts, labels, test_size=TEST_SIZE, random_state=SPLIT_SEED, stratify=labels)
+
+
+def teacher_probabilities(teacher: E5TopicClassifier, texts: List[str], batch_size: int) -> np.ndarray:
+    """Teacher softmax for every text, batched by length so padding stays short."""
+    order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+    probs = None
+    for start in range(0, len(order), batch_size):
+        rows = order[start:start + batch_size]
+        batch = teacher.predict_proba([texts[i] for i in rows])
+        if probs is None:
+            probs = np.empty((len(texts), batch.shape[1]), dtype=np.float32)
+        probs[rows] = batch
+    return probs
+
+
+def soften(probs: np.ndarray, temperature: float) -> np.ndarray:
+    """``softmax(logits / T)`` recovered from ``softmax(logits)``."""
+    logits = np.log(np.maximum(probs, 1e-12)) / temperature
+    logits -= logits.max(axis=1, keepdims=True)
+    soft = np.exp(logits)
+    return soft / soft.sum(axis=1, keepdims=True)
+
+
+def train_transformer_student(
+    teacher_dir: str, out_dir: str, texts: List[str], soft: np.ndarray, labels: np.ndarray, args: argparse.Namespace
+) -> None:
+    import shutil
+
+    import torch
+    from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+    tokenizer = AutoTokenizer.from_pretrained(teacher_dir)
+    model = AutoModelForSequenceClassification.from_pretrained(teacher_dir)
+    encoder = model.base_model.encoder
+    keep = np.linspace(0, len(encoder.layer) - 1, args.layers).round().astype(int)
+    encoder.layer = torch.nn.ModuleList(encoder.layer[int(i)] for i in keep)
+    model.config.num_hidden_layers = args.layers
+    model.train()
+
+    optimizer = torch.optim.AdamW(model.parameters(), lr=args.learning_rate)
+    soft_targets = torch.from_numpy(soft)
+    hard_targets = torch.from_numpy(np.asarray(labels, dtype=np.int64))
+    # Length-bucketed batches (dynamic padding), visited in a new random order each epoch.
+    order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+    batches = [order[start:start + args.batch_size] for start in range(0, len(order), args.batch_size)]
+    rng = np.random.default_rng(SPLIT_SEED)
+    for epoch in range(args.epochs):
+        started, total = time.perf_counter(), 0.0
+        for b in rng.permutation(len(batches)):
+            rows = batches[b]
+            encoded = tokenizer([texts[i] for i in rows], padding=True, truncation=True, max_length=args.max_length, return_tensors="pt")
+            encoded.pop("token_type_ids", None)
+            logits = model(**encoded).logits
+            distill = torch.nn.functional.kl_div(
+                torch.log_softmax(logits / args.temperature, dim=-1), soft_targets[rows], reduction="batchmean"
+            ) * args.temperature ** 2
+            loss = args.alpha * distill + (1 - args.alpha) * torch.nn.functional.cross_entropy(logits, hard_targets[rows])
+            optimizer.zero_grad()
+            loss.backward()
+            optimizer.step()
+            total += float(loss)
+        print(f"epoch {epoch + 1}: loss {total / len(batches):.4f} ({time.perf_counter() - started:.0f}s)")
+
+    model.eval()
+    model.save_pretrained(out_dir)
+    tokenizer.save_pretrained(out_dir)
+    shutil.copy(Path(teacher_dir) / "label_encoder.pkl", Path(out_dir) / "label_encoder.pkl")
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100.0 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def measure(job: Dict[str, object]) -> Dict[str, object]:
+    """Runs in a fresh process so load time and peak RSS belong to this model alone."""
+    texts, labels = job["texts"], job["labels"]
+    classifier = open_topic_classifier(job["model_dir"], num_threads=job["threads"])
+    started = time.perf_counter()
+    classifier.load()
+    load_seconds = time.perf_counter() - started
+    classifier.predict_batch(texts[:8])  # warm-up
+
+    latencies = []
+    for text in texts[: job["single_items"]]:
+        started = time.perf_counter()
+        classifier.predict_batch([text])
+        latencies.append(time.perf_counter() - started)
+    latencies.sort()
+
+    predictions = []
+    started = time.perf_counter()
+    for start in range(0, len(texts), job["batch_size"]):
+        predictions.extend(p.label for p in classifier.predict_batch(texts[start:start + job["batch_size"]]))
+    batch_seconds = time.perf_counter() - started
+    return {
+        "model_dir": job["model_dir"],
+        "accuracy": round(float(np.mean([p == l for p, l in zip(predictions, labels)])), 4),
+        "load_seconds": round(load_seconds, 3),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+        "batch_items_per_s": round(len(texts) / batch_seconds, 1),
+        "peak_rss_bytes": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024,
+        "disk_bytes": sum(f.stat().st_size for f in Path(job["model_dir"]).rglob("*") if f.is_file() and "onnx" not in f.parts),
+        "predictions": predictions,
+    }
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--teacher-dir", default=settings.classifier_dir or "../../models/e5_topic_classifier")
+    parser.add_argument("--data-file", default="../../train_topic_data.csv")
+    parser.add_argument("--students", default="hashed,transformer", help=f"comma-separated subset of {STUDENTS}")
+    parser.add_argument("--temperature", type=float, default=2.0)
+    parser.add_argument("--alpha", type=float, default=0.7, help="weight of the teacher's soft targets")
+    parser.add_argument("--layers", type=int, default=2, help="transformer student depth (2-4)")
+    parser.add_argument("--epochs", type=int, default=3, help="transformer student epochs")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--learning-rate", type=float, default=5e-5)
+    parser.add_argument("--max-length", type=int, default=128)
+    parser.add_argument("--threads", type=int, default=settings.classifier_threads)
+    parser.add_argument("--single-items", type=int, default=500, help="texts timed one at a time for p50/p99")
+    parser.add_argument("--report", default="", help="JSON report path (default: next to the teacher)")
+    return parser.parse_args()
+
+
+def main() -> None:
+    import joblib
+
+    args = parse_args()
+    teacher_dir = args.teacher_dir.rstrip("/")
+    students = [name.strip() for name in args.students.split(",") if name.strip()]
+    unknown = set(students) - set(STUDENTS)
+    if unknown:
+        raise SystemExit(f"Unknown students {sorted(unknown)}; expected {STUDENTS}")
+
+    label_encoder = joblib.load(Path(teacher_dir) / "label_encoder.pkl")
+    train_texts, test_texts, train_labels, test_labels = load_split(args.data_file, label_encoder)
+    print(f"Teacher-labelling {len(train_texts)} training rows...")
+    teacher = E5TopicClassifier(teacher_dir, num_threads=args.threads, max_length=args.max_length)
+    soft = soften(teacher_probabilities(teacher, train_texts, 64), args.temperature)
+    targets = args.alpha * soft + (1 - args.alpha) * np.eye(soft.shape[1], dtype=np.float32)[train_labels]
+
+    model_dirs = {"teacher": teacher_dir}
+    if "hashed" in students:
+        model_dirs["hashed"] = f"{teacher_dir}-hashed"
+        started = time.perf_counter()
+        HashedNgramClassifier.fit(train_texts, targets, label_encoder, model_dirs["hashed"])
+        print(f"hashed student trained in {time.perf_counter() - started:.0f}s")
+    if "transformer" in students:
+        model_dirs["transformer"] = f"{teacher_dir}-L{args.layers}"
+        train_transformer_student(teacher_dir, model_dirs["transformer"], train_texts, soft, train_labels, args)
+
+    labels = [str(label) for label in label_encoder.inverse_transform(test_labels)]
+    results = {}
+    for name, model_dir in model_dirs.items():
+        job = {
+            "model_dir": model_dir,
+            "texts": test_texts,
+            "labels": labels,
+            "threads": args.threads,
+            "batch_size": args.batch_size,
+            "single_items": args.single_items,
+        }
+        with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+            results[name] = pool.submit(measure, job).result()
+    teacher_predictions = results["teacher"]["predictions"]
+    for result in results.values():
+        predictions = result.pop("predictions")
+        result["teacher_agreement"] = round(float(np.mean([a == b for a, b in zip(predictions, teacher_predictions)])), 4)
+
+    report = {"test_items": len(test_texts), "threads": args.threads or os.cpu_count(), "batch_size": args.batch_size, "models": results}
+    report_path = args.report or str(Path(teacher_dir).parent / "distill_report.json")
+    Path(report_path).write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"{'model':<12}{'acc':>8}{'agree':>8}{'p50 ms':>10}{'p99 ms':>10}{'items/s':>10}{'RSS MB':>9}")
+    for name, result in results.items():
+        print(
+            f"{name:<12}{result['accuracy']:>8.4f}{result['teacher_agreement']:>8.4f}{result['p50_ms']:>10.2f}"
+            f"{result['p99_ms']:>10.2f}{result['batch_items_per_s']:>10.1f}{result['peak_rss_bytes'] / 2**20:>9.0f}"
+        )
+    print("Report:", report_path)
+
+
+if __name__ == "__main__":
+    main()
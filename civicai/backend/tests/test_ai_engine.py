@@ -0,0 +1,188 @@
+import numpy as np
+import pandas as pd
+
+from app.services.ai_engine import HybridAIEngine, load_engine
+from app.services.artifacts import build_artifacts, current_version
+from app.services.embedding_store import EmbeddingStore, build_embeddings, text_key
+from app.services.engine_registry import EngineRegistry
+from app.services.topic_classifier import HashedNgramClassifier, MicroBatcher, TopicPrediction, open_topic_classifier
+
+
+def make_engine(tmp_path, **kwargs):
+    rows = [
+        {"text": "garbage not cleared in ward 12", "category": "Garbage"},
+        {"text": "water supply issue for two days", "category": "Water"},
+        {"text": "no water supply since morning", "category": "Water"},
+        {"text": "pothole near school", "category": "Road"},
+    ]
+    data = tmp_path / "data.csv"
+    pd.DataFrame([dict(r, solution="s", department="d", location="Ward 12", resolved_status="yes") for r in rows]).to_csv(data, index=False)
+    return HybridAIEngine(str(data), **kwargs)
+
+
+def test_query_returns_match_and_neighbours(tmp_path):
+    engine = make_engine(tmp_path)
+    result = engine.query("No water supply since morning", k=2)
+    assert result.match.category == "Water"
+    assert result.similar == ("no water supply since morning", "water supply issue for two days")
+    assert engine.top_similar("No water supply since morning", k=2) == list(result.similar)
+
+
+def test_query_cache_keys_on_normalized_message(tmp_path):
+    engine = make_engine(tmp_path)
+    first = engine.query("Pothole near   SCHOOL!")
+    assert engine.query("pothole near school") is first
+    assert engine.cache.stats()["hits"] == 1
+
+    expiring = make_engine(tmp_path, cache_ttl=-1)
+    expiring.query("pothole near school")
+    expiring.query("pothole near school")
+    assert expiring.cache.stats()["hits"] == 0
+
+
+def test_approx_search_with_all_lists_probed_matches_exact(tmp_path):
+    exact = make_engine(tmp_path)
+    approx = make_engine(tmp_path, search_mode="approx", n_lists=2, nprobe=2)
+    for message in ["no water since morning", "garbage in ward 12", "pothole"]:
+        assert approx.query(message, k=2) == exact.query(message, k=2)
+
+
+def test_engine_from_prebuilt_artifacts_matches_fitted_engine(tmp_path):
+    fitted = make_engine(tmp_path)
+    store = tmp_path / "models"
+    build_artifacts(str(tmp_path / "data.csv"), str(store))
+    loaded = load_engine(str(tmp_path / "data.csv"), str(store))
+    assert loaded.version == current_version(str(store))
+    for message in ["no water since morning", "garbage in ward 12", "pothole"]:
+        assert loaded.query(message) == fitted.query(message)
+
+
+def test_registry_reload_swaps_in_rebuilt_engine(tmp_path):
+    make_engine(tmp_path)  # writes data.csv
+    registry = EngineRegistry(str(tmp_path / "data.csv"), str(tmp_path / "models"))
+    old = registry.service
+    assert registry.status()["version"] == "fitted"
+
+    with (tmp_path / "data.csv").open("a") as fp:
+        fp.write("streetlight not working,Power,s,d,Ward 12,yes\n")
+    assert registry.reload(wait=True)
+    status = registry.status()
+    assert status["last_error"] is None and status["version"] == current_version(str(tmp_path / "models"))
+    assert registry.service is not old
+    assert registry.service.ai.match("streetlight not working").category == "Power"
+    assert old.ai.match("streetlight not working").category != "Power"
+
+
+def test_micro_batcher_groups_concurrent_calls_and_feeds_engine_tier(tmp_path):
+    seen = []
+
+    def predict_batch(texts):
+        seen.append(len(texts))
+        return [TopicPrediction("Road" if "pothole" in t else "Water", 0.9) for t in texts]
+
+    batcher = MicroBatcher(predict_batch, max_batch_size=8, max_wait_ms=50)
+    futures = [batcher.submit(f"pothole {i}") for i in range(8)]
+    assert [f.result(5).label for f in futures] == ["Road"] * 8
+    assert seen == [8]
+
+    engine = make_engine(tmp_path, classifier=batcher)
+    match = engine.match("pothole complaint")
+    assert (match.category, match.topic_confidence) == ("Road", 0.9)
+
+
+def test_classifier_sees_the_raw_message_while_the_cache_keys_on_its_normal_form(tmp_path):
+    seen = []
+
+    class RecordingClassifier:
+        def predict(self, text):
+            seen.append(text)
+            return TopicPrediction("Road", 0.9)
+
+    engine = make_engine(tmp_path, classifier=RecordingClassifier())
+    engine.query("Pothole near   SCHOOL!")
+    engine.query("pothole near school")
+    engine.query_batch(["No water, since morning?", "no water since morning", "Garbage!"])
+    assert seen == ["Pothole near   SCHOOL!", "No water, since morning?", "Garbage!"]
+
+
+class HashingEncoder:
+    """Deterministic bag-of-words vectors standing in for E5."""
+
+    model_dir = "hashing"
+
+    def encode(self, texts, prefix=""):
+        vectors = np.zeros((len(texts), 16), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for word in text.split():
+                vectors[row, text_key(word) % 16] += 1.0
+        return vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-9)
+
+    def predict(self, text):
+        return self.encode([text])[0]
+
+
+def test_embedding_store_appends_incrementally_and_fuses_with_tfidf(tmp_path):
+    engine = make_engine(tmp_path)
+    store = EmbeddingStore(str(tmp_path / "embeddings"))
+    encoder = HashingEncoder()
+    assert build_embeddings(engine.rows["text"][:2], store, encoder) == 2
+    assert build_embeddings(engine.rows["text"], store, encoder) == 2  # only the new rows
+    vectors, keys = store.open()
+    assert vectors.dtype == np.float16 and vectors.shape == (4, 16) and len(set(keys.tolist())) == 4
+
+    fused = make_engine(tmp_path, embeddings=store, query_encoder=encoder, dense_weight=0.5)
+    assert fused.dense.coverage == 1.0
+    result = fused.query("no water supply since morning", k=2)
+    assert result.similar[0] == "no water supply since morning"
+    assert result.match == engine.query("no water supply since morning", k=2).match
+
+
+def test_query_batch_matches_single_queries(tmp_path):
+    messages = ["no water since morning", "garbage in ward 12", "pothole", "No water since morning!"]
+    for options in ({}, {"search_mode": "approx", "n_lists": 2, "nprobe": 1}):
+        single = make_engine(tmp_path, **options)
+        batched = make_engine(tmp_path, **options)
+        expected = [single.query(message, k=2) for message in messages]
+        assert batched.query_batch(messages, k=2) == expected
+        assert batched.cache.stats()["size"] == 3  # duplicate normalized once
+
+
+def test_predict_severity_counts_each_urgency_term_once(tmp_path):
+    engine = make_engine(tmp_path)
+    assert engine.predict_severity("pothole") == 0.2
+    assert engine.predict_severity("URGENT: flood flood, no water") == 0.56
+    assert engine.predict_severity("floodanger") == 0.44  # overlapping terms both count
+
+
+def test_hashed_student_learns_soft_targets_and_opens_from_its_directory(tmp_path):
+    from sklearn.preprocessing import LabelEncoder
+
+    encoder = LabelEncoder().fit(["Road", "Water"])
+    texts = ["pothole on main road", "road caved in", "no water supply", "water pipe burst"] * 10
+    targets = np.array([[0.9, 0.1], [0.8, 0.2], [0.1, 0.9], [0.2, 0.8]] * 10)
+    HashedNgramClassifier.fit(texts, targets, encoder, str(tmp_path / "student"), n_features=1 << 10)
+
+    student = open_topic_classifier(str(tmp_path / "student"))
+    assert isinstance(student, HashedNgramClassifier)
+    assert [p.label for p in student.predict_batch(["big pothole on the road", "water supply cut"])] == ["Road", "Water"]
+
+
+def test_batch_with_dense_fusion_makes_one_encoder_call_on_raw_text(tmp_path):
+    engine = make_engine(tmp_path)
+    store = EmbeddingStore(str(tmp_path / "embeddings"))
+    encoder = HashingEncoder()
+    build_embeddings(engine.rows["text"], store, encoder)
+    calls = []
+
+    def encode_queries(texts):
+        calls.append(list(texts))
+        return list(encoder.encode(texts))
+
+    batcher = MicroBatcher(encode_queries, max_batch_size=32, max_wait_ms=50)
+    fused = make_engine(tmp_path, embeddings=store, query_encoder=batcher, dense_weight=0.5)
+    messages = ["No water supply!", "garbage in ward 12", "Pothole near SCHOOL", "water issue", "pothole"]
+    results = fused.query_batch(messages, k=2)
+    assert calls == [messages]
+
+    single = make_engine(tmp_path, embeddings=store, query_encoder=encoder, dense_weight=0.5)
+    assert results == [single.query(message, k=2) for message in messages]
@@ -0,0 +1,54 @@
+from collections import Counter
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import create_engine, select, update
+from sqlalchemy.orm import sessionmaker
+
+from app.db.base import Base
+from app.models.entities import Complaint, ComplaintRollup, Ticket
+from app.services.analytics import backfill_rollups, summarize
+from app.services.grievance_service import GrievanceService
+
+
+def make_session():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    return sessionmaker(bind=engine)()
+
+
+def test_rollup_tracks_tickets_and_matches_row_counts():
+    db = make_session()
+    service = GrievanceService(ai=None)
+    service._create_tickets(db, [("u1", "leak", "Water", "Ward 1", 0.2, "BWSSB"), ("u2", "leak", "Water", "Ward 1", 0.2, "BWSSB")])
+    service.create_ticket(db, "u3", "pothole", "Road", "Ward 2", 0.5, "BBMP")
+    db.execute(update(Ticket).where(Ticket.id == 1).values(status="RESOLVED"))
+    db.commit()
+
+    complaints = db.scalars(select(Complaint)).all()
+    summary = summarize(db)
+    assert summary == {
+        "total_complaints": 3,
+        "total_tickets": 3,
+        "by_category": dict(Counter(c.category for c in complaints)),
+        "by_area": dict(Counter(c.location for c in complaints)),
+        "sla_open": 2,
+    }
+    assert db.get(ComplaintRollup, (date.today(), "Water", "Ward 1")).complaints == 2
+
+    tomorrow = date.today() + timedelta(days=1)
+    assert summarize(db, start=tomorrow)["total_complaints"] == 0
+    assert summarize(db, start=tomorrow)["total_tickets"] == 0
+    assert summarize(db, end=date.today()) == summary
+
+
+def test_backfill_builds_rollup_from_existing_complaints():
+    db = make_session()
+    db.add_all([
+        Complaint(user_id="u", text="t", category="Water", location="Ward 1", level=2, created_at=datetime(2026, 1, 5, 9)),
+        Complaint(user_id="u", text="t", category="Water", location="Ward 1", level=2, created_at=datetime(2026, 1, 5, 18)),
+        Complaint(user_id="u", text="t", category="Road", location="Ward 2", level=2, created_at=datetime(2026, 1, 6, 8)),
+    ])
+    db.commit()
+    assert backfill_rollups(db) == 2
+    assert backfill_rollups(db) == 0
+    assert summarize(db, start=date(2026, 1, 5), end=date(2026, 1, 5))["by_category"] == {"Water": 2}
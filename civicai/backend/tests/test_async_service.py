@@ -0,0 +1,37 @@
+import asyncio
+import threading
+
+import pytest
+
+pytest.importorskip("aiosqlite")
+
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.db.base import Base
+from app.services.grievance_service import GrievanceService, run_matching
+from app.services.status_cache import ticket_status_async
+
+
+def test_async_tickets_and_status(tmp_path):
+    path = tmp_path / "civicai.db"
+    Base.metadata.create_all(create_engine(f"sqlite:///{path}"))
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    service = GrievanceService(ai=None)
+
+    async def scenario():
+        async with async_sessionmaker(engine, expire_on_commit=False)() as db:
+            tracking_id = await service.create_ticket_async(db, "u1", "leak", "Water", "Ward 1", 0.2, "BWSSB")
+            status = await ticket_status_async(db, tracking_id)
+            assert status == {"tracking_id": tracking_id, "status": "OPEN", "authority": "BWSSB", "logs": ["Day1: Ticket created"]}
+            assert await service.set_status_async(db, tracking_id, "RESOLVED")
+            assert (await ticket_status_async(db, tracking_id))["status"] == "RESOLVED"
+            assert not await service.set_status_async(db, "CIV-MISSING", "RESOLVED")
+        await engine.dispose()
+
+    asyncio.run(scenario())
+
+
+def test_run_matching_uses_the_match_pool():
+    name = asyncio.run(run_matching(lambda: threading.current_thread().name))
+    assert name.startswith("match")
@@ -0,0 +1,118 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.api import routes
+from app.api.routes import get_service
+from app.db.base import Base
+from app.db.session import get_db
+from app.main import app
+from app.models.entities import Complaint, Log, Ticket
+from app.services.bulk_ingest import BulkIngester
+from app.services.grievance_service import GrievanceService
+
+
+class FakeAI:
+    def query_batch(self, messages, k=3, cache=True):
+        if any("boom" in message for message in messages):
+            raise RuntimeError("model crashed")
+        return [SimpleNamespace(match=SimpleNamespace(category="Water", department="BWSSB")) for _ in messages]
+
+    def predict_severity(self, text):
+        return 0.2
+
+
+def ingest(fmt, body, chunk_rows=2, piece=7):
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    ingester = BulkIngester(GrievanceService(FakeAI()), db, fmt, chunk_rows=chunk_rows)
+    raw = body.encode("utf-8")
+    for start in range(0, len(raw), piece):  # splits records and multi-byte characters
+        ingester.feed(raw[start:start + piece])
+    ingester.close()
+    results = [json.loads(line) for line in "".join(ingester.iter_results()).splitlines()]
+    return db, results
+
+
+def test_csv_rows_are_filed_in_order_with_per_row_errors():
+    body = '\ufeffuser_id,text,location\nu1,"pipe burst,\nno water",Ward 1\nu2,,Ward 2\nu3,నీరు లేదు,Ward 3\nu4,leak,Ward 4'
+    db, results = ingest("csv", body)
+    assert [r["row"] for r in results] == [1, 2, 3, 4]
+    assert results[1] == {"row": 2, "error": "missing text"}
+    assert all(r["tracking_id"].startswith("CIV-") and r["authority"] == "BWSSB" for r in results if r["row"] != 2)
+    texts = db.scalars(select(Complaint.text).order_by(Complaint.id)).all()
+    assert texts == ["pipe burst,\nno water", "నీరు లేదు", "leak"]
+    assert db.scalar(select(func.count()).select_from(Ticket)) == 3
+    assert db.scalar(select(func.count()).select_from(Log)) == 3
+
+
+def test_ndjson_rejects_bad_lines_and_csv_needs_header_fields():
+    body = '{"user_id": "u1", "text": "leak", "location": "Ward 1"}\nnot json\n[1]\n'
+    _, results = ingest("ndjson", body)
+    assert [r.get("error") for r in results] == [None, "not valid JSON", "not a JSON object"]
+    with pytest.raises(ValueError):
+        ingest("csv", "user_id,text\nu1,leak\n")
+
+
+def test_failed_chunk_reports_its_rows_and_later_chunks_still_file():
+    body = "user_id,text,location\nu1,leak,W1\nu2,leak,W2\nu3,boom,W3\nu4,,W4\nu5,leak,W5\n"
+    db, results = ingest("csv", body)
+    assert [r["row"] for r in results] == [1, 2, 3, 4, 5]
+    assert results[2] == {"row": 3, "error": "not filed: RuntimeError"}
+    assert results[3] == {"row": 4, "error": "missing text"}
+    assert "tracking_id" in results[0] and "tracking_id" in results[1] and "tracking_id" in results[4]
+    assert db.scalar(select(func.count()).select_from(Ticket)) == 3
+
+
+def test_stray_quote_in_an_unquoted_field_does_not_stall_streaming():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    ingester = BulkIngester(GrievanceService(FakeAI()), db, "csv", chunk_rows=2)
+    ingester.feed(b'user_id,text,location\nu1,he said "no water,Ward 1\n')
+    for n in range(2, 50):
+        ingester.feed(f'u{n},"leak, again",Ward {n}\r\n'.encode())
+        assert len(ingester.buffer) == 0
+    ingester.close()
+    results = [json.loads(line) for line in "".join(ingester.iter_results()).splitlines()]
+    assert len(results) == 49 and all("tracking_id" in r for r in results)
+    assert db.scalars(select(Complaint.text).order_by(Complaint.id)).first() == 'he said "no water'
+
+
+def test_oversized_and_malformed_records_become_row_errors(monkeypatch):
+    monkeypatch.setattr("app.services.bulk_ingest.MAX_RECORD_CHARS", 300_000)
+    unclosed = 'u2,"never closed ' + "x" * 400_000
+    huge_field = 'u3,"' + "y" * 200_000 + '",Ward 3\n'  # over csv.field_size_limit()
+    body = f"user_id,text,location\nu1,leak,Ward 1\n{huge_field}u4,leak,Ward 4\n{unclosed}"
+    _, results = ingest("csv", body, piece=4096)
+    errors = [r.get("error", "") for r in results]
+    assert errors[0] == "" and errors[2] == ""
+    assert errors[1].startswith("malformed CSV")
+    assert errors[3].startswith("record longer than 300000 characters")
+
+
+def test_route_closes_the_result_spool_when_it_rejects_an_upload(monkeypatch):
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    spools = []
+
+    class TrackedIngester(BulkIngester):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            spools.append(self.results)
+
+    monkeypatch.setattr(routes, "BulkIngester", TrackedIngester)
+    app.dependency_overrides[get_db] = lambda: sessionmaker(bind=engine)()
+    app.dependency_overrides[get_service] = lambda: GrievanceService(FakeAI())
+    try:
+        response = TestClient(app).post("/complaints/bulk?format=csv", content=b"user_id,text\nu1,leak\n")
+    finally:
+        app.dependency_overrides.clear()
+    assert response.status_code == 400 and "missing location" in response.json()["detail"]
+    assert spools and spools[0].closed
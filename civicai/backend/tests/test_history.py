@@ -0,0 +1,34 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db.base import Base
+from app.models.entities import Complaint
+from app.services.history import decode_cursor, history_page
+
+
+def test_history_pages_cover_every_complaint_once_newest_first():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    start = datetime(2026, 1, 1)
+    # Three complaints per timestamp, so pages split ties on created_at.
+    db.add_all(
+        Complaint(user_id="u1" if i % 4 else "u2", text=f"c{i}", category="Water", location="Ward 1", created_at=start + timedelta(hours=i // 3))
+        for i in range(40)
+    )
+    db.commit()
+
+    seen, cursor = [], None
+    while True:
+        page, cursor = history_page(db, "u1", 4, cursor)
+        seen.extend(page)
+        if cursor is None:
+            break
+    assert len(seen) == len({c.id for c in seen}) == 30
+    assert [(c.created_at, c.id) for c in seen] == sorted(((c.created_at, c.id) for c in seen), reverse=True)
+
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor")
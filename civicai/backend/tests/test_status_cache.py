@@ -0,0 +1,140 @@
+import asyncio
+import threading
+import time
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+from app.db.base import Base
+from app.models.entities import Ticket
+from app.services.grievance_service import GrievanceService
+from app.services.status_cache import StatusCache, status_cache, ticket_status
+
+
+def test_local_fallback_caches_and_invalidates():
+    cache = StatusCache(redis_url="", maxsize=10, ttl=60)
+    assert cache.get("CIV-1") is None
+    cache.put("CIV-1", {"status": "OPEN"})
+    assert cache.get("CIV-1") == {"status": "OPEN"}
+    cache.invalidate("CIV-1")
+    assert cache.get("CIV-1") is None
+    assert cache.stats() == {"backend": "local", "hits": 1, "misses": 2, "errors": 0}
+
+
+def test_ticket_status_reads_through_and_writes_invalidate():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    service = GrievanceService(ai=None)
+    tracking_id = service.create_ticket(db, "u1", "leak", "Water", "Ward 1", 0.2, "BWSSB")
+
+    first = ticket_status(db, tracking_id)
+    assert first == {"tracking_id": tracking_id, "status": "OPEN", "authority": "BWSSB", "logs": ["Day1: Ticket created"]}
+    hits = status_cache.hits
+    assert ticket_status(db, tracking_id) == first
+    assert status_cache.hits == hits + 1
+
+    assert service.set_status(db, tracking_id, "RESOLVED")
+    assert ticket_status(db, tracking_id)["status"] == "RESOLVED"
+    service.follow_up(db, db.scalar(select(Ticket).where(Ticket.tracking_id == tracking_id)))
+    assert len(ticket_status(db, tracking_id)["logs"]) == 3
+    assert ticket_status(db, "CIV-MISSING") is None
+
+
+def test_async_calls_leave_the_event_loop_only_for_redis():
+    async def thread_of_get(cache):
+        cache.get = lambda tracking_id: threading.get_ident()
+        return threading.get_ident(), await cache.get_async("CIV-1")
+
+    loop_thread, get_thread = asyncio.run(thread_of_get(StatusCache(redis_url="redis://unreachable:6379/0")))
+    assert get_thread != loop_thread
+    loop_thread, get_thread = asyncio.run(thread_of_get(StatusCache(redis_url="")))
+    assert get_thread == loop_thread
+
+
+def test_status_loaded_before_an_invalidation_is_not_cached():
+    cache = StatusCache(redis_url="", maxsize=10, ttl=60, tombstone_ttl=0.05)
+    assert cache.get("CIV-1") is None
+    loaded_at = time.monotonic()  # a reader loads the old status ...
+    cache.invalidate("CIV-1")  # ... while a writer commits a change
+    cache.put("CIV-1", {"status": "OPEN"}, loaded_at)
+    assert cache.get("CIV-1") is None
+
+    time.sleep(0.06)
+    cache.put("CIV-1", {"status": "RESOLVED"}, loaded_at)  # a load that outlived the tombstone
+    assert cache.get("CIV-1") is None
+    cache.put("CIV-1", {"status": "RESOLVED"}, time.monotonic())
+    assert cache.get("CIV-1") == {"status": "RESOLVED"}
+    cache.put("CIV-1", {"status": "OPEN"}, time.monotonic())  # read-through puts never overwrite
+    assert cache.get("CIV-1") == {"status": "RESOLVED"}
+
+
+class FakeRedis:
+    def __init__(self):
+        self.values = {}
+        self.down = False
+
+    def get(self, key):
+        if self.down:
+            raise ConnectionError("down")
+        return self.values.get(key)
+
+    def set(self, key, value, px=None, nx=False):
+        if self.down:
+            raise ConnectionError("down")
+        if not (nx and self.values.get(key) is not None):
+            self.values[key] = value.encode() if isinstance(value, str) else value
+
+    def pipeline(self, transaction=True):
+        return self
+
+    def execute(self):
+        pass
+
+
+def test_redis_is_retried_with_backoff_after_failures(monkeypatch):
+    clock = [100.0]
+    monkeypatch.setattr("app.services.status_cache.time.monotonic", lambda: clock[0])
+    server = FakeRedis()
+    attempts = []
+    cache = StatusCache(redis_url="redis://cache:6379/0")
+    cache._connect = lambda: attempts.append(clock[0]) or (None if server.down else server)
+
+    server.down = True
+    assert cache.stats()["backend"] == "local"
+    clock[0] += 0.5
+    assert cache.stats()["backend"] == "local"
+    clock[0] += 0.5
+    assert cache.stats()["backend"] == "local"
+    clock[0] += 1.5
+    assert cache.stats()["backend"] == "local"
+    assert attempts == [100.0, 101.0]  # then 2s, doubling up to a minute
+
+    server.down = False
+    clock[0] += 0.5
+    cache.put("CIV-1", {"status": "OPEN"})
+    assert cache.stats()["backend"] == "redis"
+    assert cache.get("CIV-1") == {"status": "OPEN"}
+
+    server.down = True  # a failing call falls back until the next retry
+    assert cache.get("CIV-1") is None
+    assert cache.stats() == {"backend": "local", "hits": 1, "misses": 1, "errors": 1}
+    server.down = False
+    clock[0] += 1.0
+    assert cache.get("CIV-1") == {"status": "OPEN"}
+
+
+def test_counters_are_exact_under_concurrent_use():
+    cache = StatusCache(redis_url="", maxsize=10, ttl=60)
+    cache.put("CIV-1", {"status": "OPEN"})
+
+    def hammer(tracking_id):
+        for _ in range(2000):
+            cache.get(tracking_id)
+
+    threads = [threading.Thread(target=hammer, args=(f"CIV-{n % 2}",)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert (cache.hits, cache.misses) == (8000, 8000)
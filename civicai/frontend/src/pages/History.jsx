@@ -5,14 +5,23 @@ export default function History() {
   const [userId, setUserId] = useState('u1')
   const [rows, setRows] = useState([])
   const [error, setError] = useState('')
+  const [loading, setLoading] = useState(false)
+  const [page, setPage] = useState({ user: '', cursor: '' })
 
-  const load = async () => {
+  // The API returns 50 rows per request; X-Next-Cursor, when present, fetches the next 50.
+  const load = async (more = false) => {
+    if (loading) return
+    const user = more ? page.user : userId
     setError('')
+    setLoading(true)
     try {
-      const { data } = await api.get(`/history/${userId}`)
-      setRows(data)
+      const res = await api.get(`/history/${user}`, { params: more ? { cursor: page.cursor } : {} })
+      setRows(more ? [...rows, ...res.data] : res.data)
+      setPage({ user, cursor: res.headers['x-next-cursor'] || '' })
     } catch (err) {
       setError(err?.response?.data?.detail || err.message)
+    } finally {
+      setLoading(false)
     }
   }
 
@@ -21,7 +30,7 @@ export default function History() {
       <h2 className="text-2xl font-semibold">Complaint History</h2>
       <div className="flex gap-3 max-w-xl">
         <input className="input-premium" value={userId} onChange={(e) => setUserId(e.target.value)} />
-        <button className="btn-premium" onClick={load}>Load</button>
+        <button className="btn-premium disabled:opacity-60" onClick={() => load()} disabled={loading}>Load</button>
       </div>
       {error && <p className="text-rose-300">{error}</p>}
       <div className="grid grid-cols-2 gap-3">
@@ -32,6 +41,11 @@ export default function History() {
           </div>
         ))}
       </div>
+      {page.cursor && (
+        <button className="btn-premium disabled:opacity-60" onClick={() => load(true)} disabled={loading}>
+          {loading ? 'Loading...' : 'Load more'}
+        </button>
+      )}
     </div>
   )
 }
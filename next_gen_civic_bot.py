@@ -2,59 +2,984 @@ from __future__ import annotations
 
 import argparse
 import csv
+import hashlib
+import heapq
+import json
+import logging
+import math
+import mmap
+import multiprocessing
+import os
 import re
+import struct
+import sys
+import threading
+import time
+from array import array
 from collections import Counter, defaultdict
-from dataclasses import dataclass, field
+from collections.abc import Sequence
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Dict, Iterable, List, Optional, Tuple
 
+logger = logging.getLogger(__name__)
+
 TOKEN_RE = re.compile(r"[a-zA-Z0-9']+")
+DEFAULT_TOPIC = "General civic issue"
+SCORING_MODES = ("bm25", "overlap")
+BM25_K1 = 1.5
+BM25_B = 0.75
+COMPLAINT_KEYWORDS = ("complaint", "issue", "problem", "report", "water", "garbage", "road")
+RELATED_CONTEXT_LIMIT = 2
+
+# (days open, action) pairs, latest first; tickets change state only at these boundaries.
+FOLLOW_UP_SCHEDULE: Tuple[Tuple[int, str], ...] = (
+    (5, "Public alert issued"),
+    (3, "Escalated to higher authority"),
+    (2, "Reminder sent"),
+    (1, "Ticket created"),
+)
+
+SNAPSHOT_MAGIC = b"CIVSNAP1"
+SNAPSHOT_VERSION = 1
 
 
 def tokenize(text: str) -> List[str]:
     return TOKEN_RE.findall(text.lower())
 
 
-@dataclass
+_EPOCH = datetime(1970, 1, 1)
+
+
+def to_epoch(moment: datetime) -> int:
+    """Naive UTC datetime -> whole epoch seconds (the resolution records are kept at)."""
+    return (moment - _EPOCH) // timedelta(seconds=1)
+
+
+def from_epoch(seconds: int) -> datetime:
+    return _EPOCH + timedelta(seconds=seconds)
+
+
+class StringPool:
+    """Interns repeated strings (wards, topics, actions, ...) as small integer ids."""
+
+    __slots__ = ("_ids", "_values")
+
+    def __init__(self) -> None:
+        self._ids: Dict[str, int] = {}
+        self._values: List[str] = []
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def id(self, value: str) -> int:
+        value_id = self._ids.get(value)
+        if value_id is None:
+            value_id = self._ids[value] = len(self._values)
+            self._values.append(value)
+        return value_id
+
+    def value(self, value_id: int) -> str:
+        return self._values[value_id]
+
+    def values(self) -> List[str]:
+        return list(self._values)
+
+
+class StringPools:
+    """The interning pools behind one bot's complaint and ticket records."""
+
+    __slots__ = ("users", "wards", "topics", "statuses", "actions")
+
+    def __init__(self) -> None:
+        self.users = StringPool()
+        self.wards = StringPool()
+        self.topics = StringPool()
+        self.statuses = StringPool()
+        self.actions = StringPool()
+
+    def to_state(self) -> Dict[str, List[str]]:
+        return {name: getattr(self, name).values() for name in self.__slots__}
+
+    @classmethod
+    def from_state(cls, state: Dict[str, List[str]]) -> "StringPools":
+        """Pools holding ``state``'s values under the same ids."""
+        pools = cls()
+        for name in cls.__slots__:
+            pool = getattr(pools, name)
+            for value in state[name]:
+                pool.id(value)
+        return pools
+
+
 class Complaint:
-    user_id: str
-    ward: str
-    issue_type: str
-    description: str
-    created_at: datetime = field(default_factory=datetime.utcnow)
+    """A citizen complaint with an epoch-second timestamp.
+
+    Standalone value object; :class:`ComplaintStore` interns its strings when it is
+    filed.
+    """
+
+    __slots__ = ("user_id", "ward", "issue_type", "description", "_created")
+
+    def __init__(
+        self,
+        user_id: str,
+        ward: str,
+        issue_type: str,
+        description: str,
+        created_at: Optional[datetime] = None,
+    ):
+        self.user_id = user_id
+        self.ward = ward
+        self.issue_type = issue_type
+        self.description = description
+        self._created = to_epoch(created_at or datetime.utcnow())
+
+    @property
+    def created_at(self) -> datetime:
+        return from_epoch(self._created)
+
+    @created_at.setter
+    def created_at(self, value: datetime) -> None:
+        self._created = to_epoch(value)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Complaint):
+            return NotImplemented
+        return (self.user_id, self.ward, self.issue_type, self.description, self._created) == (
+            other.user_id,
+            other.ward,
+            other.issue_type,
+            other.description,
+            other._created,
+        )
+
+    def __repr__(self) -> str:
+        return (
+            f"Complaint(user_id={self.user_id!r}, ward={self.ward!r}, issue_type={self.issue_type!r}, "
+            f"description={self.description!r}, created_at={self.created_at!r})"
+        )
+
+
+class ComplaintStore(Sequence):
+    """Column store of complaints indexed by complaint id.
+
+    Each complaint costs a few array slots (ids into ``pools``) plus a reference to
+    its description; indexing materialises a :class:`Complaint` from the row.
+    """
+
+    def __init__(self, pools: Optional[StringPools] = None) -> None:
+        self.pools = pools if pools is not None else StringPools()
+        self.user_ids = array("I")
+        self.wards = array("I")
+        self.issues = array("I")
+        self.created = array("q")
+        self.descriptions: List[str] = []
+
+    def __len__(self) -> int:
+        return len(self.descriptions)
+
+    def __getitem__(self, complaint_id):
+        if isinstance(complaint_id, slice):
+            return [self[i] for i in range(*complaint_id.indices(len(self)))]
+        pools = self.pools
+        complaint = Complaint.__new__(Complaint)
+        complaint.user_id = pools.users.value(self.user_ids[complaint_id])
+        complaint.ward = pools.wards.value(self.wards[complaint_id])
+        complaint.issue_type = pools.topics.value(self.issues[complaint_id])
+        complaint.description = self.descriptions[complaint_id]
+        complaint._created = self.created[complaint_id]
+        return complaint
+
+    def append(self, complaint: Complaint) -> int:
+        pools = self.pools
+        self.user_ids.append(pools.users.id(complaint.user_id))
+        self.wards.append(pools.wards.id(complaint.ward))
+        self.issues.append(pools.topics.id(complaint.issue_type))
+        self.created.append(complaint._created)
+        self.descriptions.append(complaint.description)
+        return len(self.descriptions) - 1
+
+
+class ActionLog(Sequence):
+    """``(datetime, action)`` list view over a ticket's epoch-second and action-id arrays."""
+
+    __slots__ = ("_ticket",)
+
+    def __init__(self, ticket: "Ticket"):
+        self._ticket = ticket
+
+    def __len__(self) -> int:
+        return len(self._ticket._action_ids)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        ticket = self._ticket
+        return from_epoch(ticket._action_times[index]), ticket._store.pools.actions.value(ticket._action_ids[index])
+
+    def append(self, entry: Tuple[datetime, str]) -> None:
+        moment, action = entry
+        self._ticket._action_times.append(to_epoch(moment))
+        self._ticket._action_ids.append(self._ticket._store.pools.actions.id(action))
 
 
-@dataclass
 class Ticket:
-    ticket_id: str
-    ward: str
-    issue_type: str
-    complaints: List[Complaint]
-    created_at: datetime = field(default_factory=datetime.utcnow)
-    status: str = "open"
-    last_action: str = "Ticket created"
-    action_log: List[Tuple[datetime, str]] = field(default_factory=list)
+    """A civic ticket; strings are interned ids, times epoch seconds, logs packed arrays.
+
+    ``store`` is the complaint store of the owning bot (its pools intern the ticket's
+    strings and its rows back ``complaint_ids``); a standalone ticket gets its own.
+    """
+
+    __slots__ = (
+        "ticket_id",
+        "_store",
+        "_ward",
+        "_issue",
+        "complaint_ids",
+        "_created",
+        "_status",
+        "_last_action",
+        "_action_times",
+        "_action_ids",
+    )
+
+    def __init__(
+        self,
+        ticket_id: str,
+        ward: str,
+        issue_type: str,
+        complaint_ids: Iterable[int],
+        created_at: Optional[datetime] = None,
+        status: str = "open",
+        last_action: str = "Ticket created",
+        action_log: Iterable[Tuple[datetime, str]] = (),
+        store: Optional[ComplaintStore] = None,
+    ):
+        self.ticket_id = ticket_id
+        self._store = store if store is not None else ComplaintStore()
+        pools = self._store.pools
+        self._ward = pools.wards.id(ward)
+        self._issue = pools.topics.id(issue_type)
+        self.complaint_ids = array("I", complaint_ids)
+        self._created = to_epoch(created_at or datetime.utcnow())
+        self._status = pools.statuses.id(status)
+        self._last_action = pools.actions.id(last_action)
+        self._action_times = array("q")
+        self._action_ids = array("H")
+        for entry in action_log:
+            self.action_log.append(entry)
+        self._action_times.append(self._created)
+        self._action_ids.append(self._last_action)
+
+    @property
+    def ward(self) -> str:
+        return self._store.pools.wards.value(self._ward)
+
+    @property
+    def issue_type(self) -> str:
+        return self._store.pools.topics.value(self._issue)
+
+    @property
+    def created_at(self) -> datetime:
+        return from_epoch(self._created)
+
+    @property
+    def status(self) -> str:
+        return self._store.pools.statuses.value(self._status)
+
+    @status.setter
+    def status(self, value: str) -> None:
+        self._status = self._store.pools.statuses.id(value)
+
+    @property
+    def last_action(self) -> str:
+        return self._store.pools.actions.value(self._last_action)
+
+    @last_action.setter
+    def last_action(self, value: str) -> None:
+        self._last_action = self._store.pools.actions.id(value)
+
+    @property
+    def action_log(self) -> ActionLog:
+        return ActionLog(self)
+
+    @property
+    def complaints(self) -> List[Complaint]:
+        """The ticket's complaint records, read from the store (``complaint_ids`` is the source)."""
+        return [self._store[complaint_id] for complaint_id in self.complaint_ids]
+
+    def __repr__(self) -> str:
+        return (
+            f"Ticket(ticket_id={self.ticket_id!r}, ward={self.ward!r}, issue_type={self.issue_type!r}, "
+            f"complaint_ids={list(self.complaint_ids)!r}, created_at={self.created_at!r}, "
+            f"status={self.status!r}, last_action={self.last_action!r})"
+        )
+
+
+class CorpusIndex:
+    """Token id -> postings (doc id, term frequency) index in flat CSR arrays.
+
+    Postings for token id ``t`` live in ``doc_ids[indptr[t]:indptr[t + 1]]`` with the
+    matching counts in ``term_freqs``; doc ids within a posting list are ascending.
+    """
+
+    def __init__(self) -> None:
+        self.indptr = array("I", [0])
+        self.doc_ids = array("I")
+        self.term_freqs = array("I")
+        self.doc_lengths = array("I")
+        self.total_length = 0
+        self.avg_doc_length = 0.0
+
+    @classmethod
+    def build(cls, docs: Iterable[Dict[int, int]], vocab_size: int) -> "CorpusIndex":
+        """Builds the index from per-document token id counts, in doc id order."""
+        index = cls()
+        posting_docs: List[List[int]] = [[] for _ in range(vocab_size)]
+        posting_tfs: List[List[int]] = [[] for _ in range(vocab_size)]
+        doc_lengths = index.doc_lengths
+        for doc_id, counts in enumerate(docs):
+            doc_lengths.append(sum(counts.values()))
+            for token_id, tf in counts.items():
+                posting_docs[token_id].append(doc_id)
+                posting_tfs[token_id].append(tf)
+
+        for doc_list, tf_list in zip(posting_docs, posting_tfs):
+            index.doc_ids.extend(doc_list)
+            index.term_freqs.extend(tf_list)
+            index.indptr.append(len(index.doc_ids))
+
+        index.total_length = sum(doc_lengths)
+        index.avg_doc_length = index.total_length / max(1, len(doc_lengths))
+        return index
+
+    @property
+    def num_docs(self) -> int:
+        return len(self.doc_lengths)
+
+    def postings(self, token_id: int):
+        """``(doc_ids, term_freqs)`` for ``token_id``, or ``None`` when it has no postings."""
+        if token_id + 1 >= len(self.indptr):
+            return None
+        start, end = self.indptr[token_id], self.indptr[token_id + 1]
+        if start == end:
+            return None
+        return self.doc_ids[start:end], self.term_freqs[start:end]
+
+    def score(self, token_ids: Iterable[int], scoring: str = "bm25") -> Dict[int, float]:
+        """Scores every document that shares at least one of the (unique) ``token_ids``."""
+        return self.score_batch([list(token_ids)], scoring)[0]
+
+    def score_batch(self, queries: List[List[int]], scoring: str = "bm25") -> List[Dict[int, float]]:
+        return CorpusSegments((self,)).score_batch(queries, scoring)
+
+    @staticmethod
+    def top_k(scores: Dict[int, float], limit: int) -> List[int]:
+        """Highest-scoring doc ids; ties keep corpus order, as the old stable sort did."""
+        return heapq.nlargest(limit, scores, key=lambda doc_id: (scores[doc_id], -doc_id))
+
+
+class PostingsDelta:
+    """Small postings segment for ingested documents, keyed sparsely by token id.
+
+    Unlike :class:`CorpusIndex` its size depends only on the documents it holds, so
+    building or merging one is O(new data) rather than O(vocabulary).
+    """
+
+    __slots__ = ("token_postings", "doc_lengths", "total_length")
+
+    def __init__(self) -> None:
+        self.token_postings: Dict[int, Tuple[array, array]] = {}
+        self.doc_lengths = array("I")
+        self.total_length = 0
+
+    @classmethod
+    def build(cls, docs: Iterable[Dict[int, int]]) -> "PostingsDelta":
+        delta = cls()
+        for doc_id, counts in enumerate(docs):
+            length = sum(counts.values())
+            delta.doc_lengths.append(length)
+            delta.total_length += length
+            for token_id, tf in counts.items():
+                entry = delta.token_postings.get(token_id)
+                if entry is None:
+                    entry = delta.token_postings[token_id] = (array("I"), array("I"))
+                entry[0].append(doc_id)
+                entry[1].append(tf)
+        return delta
+
+    @classmethod
+    def merge(cls, first: "PostingsDelta", second: "PostingsDelta") -> "PostingsDelta":
+        """Concatenates two adjacent segments; ``second``'s doc ids are shifted past ``first``."""
+        merged = cls()
+        offset = first.num_docs
+        merged.doc_lengths = first.doc_lengths + second.doc_lengths
+        merged.total_length = first.total_length + second.total_length
+        for token_id, (docs, tfs) in first.token_postings.items():
+            merged.token_postings[token_id] = (array("I", docs), array("I", tfs))
+        for token_id, (docs, tfs) in second.token_postings.items():
+            entry = merged.token_postings.get(token_id)
+            if entry is None:
+                entry = merged.token_postings[token_id] = (array("I"), array("I"))
+            entry[0].extend(doc_id + offset for doc_id in docs)
+            entry[1].extend(tfs)
+        return merged
+
+    @property
+    def num_docs(self) -> int:
+        return len(self.doc_lengths)
+
+    def postings(self, token_id: int):
+        return self.token_postings.get(token_id)
+
+
+class CorpusSegments:
+    """Immutable stack of postings segments: the loaded index plus ingested deltas.
+
+    Segment ``i`` covers global doc ids ``bases[i]`` onwards. Ingestion publishes a
+    new stack with :meth:`with_segment`, so readers holding the old one keep a
+    consistent view. BM25 statistics (N, avgdl, df) are computed across all segments.
+    """
+
+    MAX_TIER_RATIO = 2
+
+    __slots__ = ("segments", "bases", "num_docs", "total_length")
+
+    def __init__(self, segments: Tuple[object, ...]):
+        self.segments = segments
+        self.bases: List[int] = []
+        num_docs = total_length = 0
+        for segment in segments:
+            self.bases.append(num_docs)
+            num_docs += segment.num_docs
+            total_length += segment.total_length
+        self.num_docs = num_docs
+        self.total_length = total_length
+
+    def with_segment(self, delta: PostingsDelta) -> "CorpusSegments":
+        """New stack with ``delta`` appended, merging similar-sized deltas (never the base)."""
+        segments = list(self.segments) + [delta]
+        while len(segments) > 2 and segments[-2].num_docs <= self.MAX_TIER_RATIO * segments[-1].num_docs:
+            second = segments.pop()
+            segments[-1] = PostingsDelta.merge(segments[-1], second)
+        return CorpusSegments(tuple(segments))
+
+    def merged(self, vocab_size: int) -> CorpusIndex:
+        """Single CSR index over every segment (used for snapshots)."""
+        if len(self.segments) == 1 and isinstance(self.segments[0], CorpusIndex):
+            return self.segments[0]
+        index = CorpusIndex()
+        for segment in self.segments:
+            index.doc_lengths.extend(segment.doc_lengths)
+        for token_id in range(vocab_size):
+            for base, segment in zip(self.bases, self.segments):
+                postings = segment.postings(token_id)
+                if postings is not None:
+                    index.doc_ids.extend(doc_id + base for doc_id in postings[0])
+                    index.term_freqs.extend(postings[1])
+            index.indptr.append(len(index.doc_ids))
+        index.total_length = self.total_length
+        index.avg_doc_length = self.total_length / max(1, self.num_docs)
+        return index
+
+    def score_batch(self, queries: List[List[int]], scoring: str = "bm25") -> List[Dict[int, float]]:
+        """Scores a batch of (unique) token id lists, reading each posting list once.
+
+        Tokens are applied in ascending id order so a query scores identically alone
+        or inside any batch.
+        """
+        by_token: Dict[int, List[int]] = defaultdict(list)
+        for query_idx, token_ids in enumerate(queries):
+            for token_id in token_ids:
+                by_token[token_id].append(query_idx)
+
+        scores: List[Dict[int, float]] = [defaultdict(float) for _ in queries]
+        num_docs = self.num_docs
+        length_norm = BM25_K1 * BM25_B * num_docs / max(self.total_length, 1e-9)
+        for token_id in sorted(by_token):
+            found = []
+            df = 0
+            for base, segment in zip(self.bases, self.segments):
+                postings = segment.postings(token_id)
+                if postings is not None:
+                    found.append((base, segment.doc_lengths, postings))
+                    df += len(postings[0])
+            if not df:
+                continue
+
+            if scoring == "overlap":
+                for base, _, (docs, _) in found:
+                    for query_idx in by_token[token_id]:
+                        row = scores[query_idx]
+                        for doc_id in docs:
+                            row[doc_id + base] += 1
+                continue
+
+            idf = math.log(1.0 + (num_docs - df + 0.5) / (df + 0.5))
+            contributions = [
+                (
+                    doc_id + base,
+                    idf * tf * (BM25_K1 + 1.0) / (tf + BM25_K1 * (1.0 - BM25_B) + length_norm * lengths[doc_id]),
+                )
+                for base, lengths, (docs, tfs) in found
+                for doc_id, tf in zip(docs, tfs)
+            ]
+            for query_idx in by_token[token_id]:
+                row = scores[query_idx]
+                for doc_id, value in contributions:
+                    row[doc_id] += value
+        return scores
+
+
+class TopicMatrix:
+    """Sparse topic x vocabulary count matrix, stored column-wise (CSC).
+
+    Column ``t`` holds the topics whose training examples contain token id ``t``:
+    ``topic_ids[indptr[t]:indptr[t + 1]]`` with their token counts in ``counts``.
+    A query is scored against every topic at once by walking only its own columns.
+    """
+
+    def __init__(self) -> None:
+        self.labels: List[str] = []
+        self.indptr = array("I", [0])
+        self.topic_ids = array("I")
+        self.counts = array("I")
+
+    @classmethod
+    def build(cls, topic_token_counts: Dict[str, Dict[int, int]], vocab_size: int) -> "TopicMatrix":
+        """Builds the matrix from per-topic token id counts; topic ids follow dict order."""
+        matrix = cls()
+        column_topics: List[List[int]] = [[] for _ in range(vocab_size)]
+        column_counts: List[List[int]] = [[] for _ in range(vocab_size)]
+        for topic_id, (label, counts) in enumerate(topic_token_counts.items()):
+            matrix.labels.append(label)
+            for token_id, count in counts.items():
+                column_topics[token_id].append(topic_id)
+                column_counts[token_id].append(count)
+
+        for topic_list, count_list in zip(column_topics, column_counts):
+            matrix.topic_ids.extend(topic_list)
+            matrix.counts.extend(count_list)
+            matrix.indptr.append(len(matrix.topic_ids))
+        return matrix
+
+    def column(self, token_id: int) -> List[Tuple[int, int]]:
+        """``(topic id, count)`` pairs for ``token_id``."""
+        if token_id + 1 >= len(self.indptr):
+            return []
+        start, end = self.indptr[token_id], self.indptr[token_id + 1]
+        return list(zip(self.topic_ids[start:end], self.counts[start:end]))
+
+    def score_batch(self, queries: List[Dict[int, int]]) -> List[Dict[int, int]]:
+        return TopicSegments((self,)).score_batch(queries)
+
+    @staticmethod
+    def top_n(scores: Dict[int, int], n: int) -> List[int]:
+        """Best-scoring topic ids with a positive score; ties go to the earlier topic."""
+        positive = [topic_id for topic_id, score in scores.items() if score > 0]
+        if n == 1 and positive:
+            return [max(positive, key=lambda topic_id: (scores[topic_id], -topic_id))]
+        return heapq.nlargest(n, positive, key=lambda topic_id: (scores[topic_id], -topic_id))
+
+
+class TopicDelta:
+    """Token id -> {topic id: count} counts from ingested training examples."""
+
+    __slots__ = ("columns", "num_examples")
+
+    def __init__(self) -> None:
+        self.columns: Dict[int, Dict[int, int]] = {}
+        self.num_examples = 0
+
+    @classmethod
+    def build(cls, examples: Iterable[Tuple[int, Dict[int, int]]]) -> "TopicDelta":
+        delta = cls()
+        for topic_id, counts in examples:
+            delta.num_examples += 1
+            for token_id, count in counts.items():
+                column = delta.columns.setdefault(token_id, {})
+                column[topic_id] = column.get(topic_id, 0) + count
+        return delta
+
+    @classmethod
+    def merge(cls, first: "TopicDelta", second: "TopicDelta") -> "TopicDelta":
+        merged = cls()
+        merged.num_examples = first.num_examples + second.num_examples
+        merged.columns = {token_id: dict(column) for token_id, column in first.columns.items()}
+        for token_id, column in second.columns.items():
+            target = merged.columns.setdefault(token_id, {})
+            for topic_id, count in column.items():
+                target[topic_id] = target.get(topic_id, 0) + count
+        return merged
+
+    def column(self, token_id: int) -> List[Tuple[int, int]]:
+        return list(self.columns.get(token_id, {}).items())
+
+
+class TopicSegments:
+    """Immutable stack of topic count segments (loaded matrix + ingested deltas).
+
+    Counts for the same (topic, token) are summed across segments before the
+    ``min`` overlap is taken, so scores equal those of one merged matrix.
+    """
+
+    MAX_TIER_RATIO = 2
+
+    __slots__ = ("segments",)
+
+    def __init__(self, segments: Tuple[object, ...]):
+        self.segments = segments
+
+    def with_segment(self, delta: TopicDelta) -> "TopicSegments":
+        segments = list(self.segments) + [delta]
+        while len(segments) > 2 and segments[-2].num_examples <= self.MAX_TIER_RATIO * segments[-1].num_examples:
+            second = segments.pop()
+            segments[-1] = TopicDelta.merge(segments[-1], second)
+        return TopicSegments(tuple(segments))
+
+    def merged(self, labels: List[str], vocab_size: int) -> TopicMatrix:
+        """Single CSC matrix over every segment (used for snapshots)."""
+        if len(self.segments) == 1 and isinstance(self.segments[0], TopicMatrix):
+            return self.segments[0]
+        matrix = TopicMatrix()
+        matrix.labels = labels
+        for token_id in range(vocab_size):
+            for topic_id, count in sorted(self.column(token_id)):
+                matrix.topic_ids.append(topic_id)
+                matrix.counts.append(count)
+            matrix.indptr.append(len(matrix.topic_ids))
+        return matrix
+
+    def column(self, token_id: int) -> List[Tuple[int, int]]:
+        columns = [column for column in (segment.column(token_id) for segment in self.segments) if column]
+        if len(columns) <= 1:
+            return columns[0] if columns else []
+        summed: Dict[int, int] = defaultdict(int)
+        for column in columns:
+            for topic_id, count in column:
+                summed[topic_id] += count
+        return list(summed.items())
+
+    def score_batch(self, queries: List[Dict[int, int]]) -> List[Dict[int, int]]:
+        """Multiset-overlap scores ``sum_t min(q[t], M[topic, t])`` for each query.
+
+        Columns are visited once per distinct token across the whole batch.
+        """
+        by_token: Dict[int, List[Tuple[int, int]]] = defaultdict(list)
+        for query_idx, counts in enumerate(queries):
+            for token_id, count in counts.items():
+                by_token[token_id].append((query_idx, count))
+
+        scores: List[Dict[int, int]] = [defaultdict(int) for _ in queries]
+        for token_id, query_counts in by_token.items():
+            column = self.column(token_id)
+            for query_idx, q_count in query_counts:
+                row = scores[query_idx]
+                for topic_id, count in column:
+                    row[topic_id] += count if count < q_count else q_count
+        return scores
+
+
+class StringTable(Sequence):
+    """Read-only sequence of strings packed into one UTF-8 blob plus an offsets array.
+
+    ``offsets`` has one more entry than there are strings; ``start``/``stop`` select a
+    sub-range so slices share the underlying (possibly memory-mapped) buffers.
+    """
+
+    def __init__(self, offsets, blob, start: int = 0, stop: Optional[int] = None):
+        self.offsets = offsets
+        self.blob = blob
+        self.start = start
+        self.stop = len(offsets) - 1 if stop is None else stop
+
+    @classmethod
+    def from_strings(cls, strings: Iterable[str]) -> "StringTable":
+        offsets = array("Q", [0])
+        blob = bytearray()
+        for value in strings:
+            blob += value.encode("utf-8")
+            offsets.append(len(blob))
+        return cls(offsets, bytes(blob))
+
+    def __len__(self) -> int:
+        return self.stop - self.start
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                return [self[i] for i in range(start, stop, step)]
+            return StringTable(self.offsets, self.blob, self.start + start, self.start + stop)
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("string table index out of range")
+        pos = self.start + index
+        return str(self.blob[self.offsets[pos]:self.offsets[pos + 1]], "utf-8")
+
+
+class CorpusTexts(Sequence):
+    """``(source, text)`` view over interned source ids and a packed text table.
+
+    Rows ingested after loading are kept in a plain list behind the packed ones.
+    """
+
+    def __init__(self, sources: List[str], doc_sources, texts: StringTable):
+        self.sources = sources
+        self.doc_sources = doc_sources
+        self.texts = texts
+        self.extra: List[Tuple[str, str]] = []
+
+    def __len__(self) -> int:
+        return len(self.texts) + len(self.extra)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        packed = len(self.texts)
+        if index >= packed:
+            return self.extra[index - packed]
+        return self.sources[self.doc_sources[index]], self.texts[index]
+
+    def extend(self, rows: Iterable[Tuple[str, str]]) -> None:
+        self.extra.extend(rows)
 
-    def __post_init__(self) -> None:
-        self.action_log.append((self.created_at, self.last_action))
+
+def source_fingerprint(path: Path) -> Dict[str, object]:
+    """Size, mtime and content hash of a source file, used to validate snapshots."""
+    stat = path.stat()
+    digest = hashlib.sha256()
+    with path.open("rb") as fp:
+        for chunk in iter(lambda: fp.read(1 << 20), b""):
+            digest.update(chunk)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": digest.hexdigest()}
 
 
 class CivicDataStore:
     """Loads BBMP/Reddit data and provides lightweight topic + context matching."""
 
-    def __init__(self, train_file: str = "train_topic_data.csv", reddit_file: str = "hf_combined.csv"):
+    def __init__(
+        self,
+        train_file: str = "train_topic_data.csv",
+        reddit_file: str = "hf_combined.csv",
+        scoring: str = "bm25",
+    ):
+        if scoring not in SCORING_MODES:
+            raise ValueError(f"Unknown scoring mode {scoring!r}; expected one of {SCORING_MODES}")
         self.train_file = Path(train_file)
         self.reddit_file = Path(reddit_file)
+        self.scoring = scoring
 
         self.topic_examples: Dict[str, List[str]] = defaultdict(list)
         self.topic_token_counts: Dict[str, Counter] = defaultdict(Counter)
         self.topic_frequency: Counter = Counter()
         self.corpus_texts: List[Tuple[str, str]] = []  # (source, text)
 
-    def load(self) -> None:
+        self.vocab: Dict[str, int] = {}
+        self.corpus_index = CorpusIndex()
+        self.topic_matrix = TopicMatrix()
+        self._snapshot_map: Optional[mmap.mmap] = None
+
+        # Published views read by queries; ingestion swaps in new ones under _ingest_lock.
+        self._corpus = CorpusSegments((self.corpus_index,))
+        self._topics = TopicSegments((self.topic_matrix,))
+        self._topic_ids: Dict[str, int] = {}
+        self._ingest_lock = threading.Lock()
+
+    def load(self, snapshot: Optional[str] = None) -> None:
+        """Loads the CSVs, or a still-valid ``snapshot`` of them (rewriting it when stale)."""
+        if snapshot and self.load_snapshot(snapshot):
+            return
         self._load_train_topics()
         self._load_corpus_posts()
+        if snapshot:
+            self.save_snapshot(snapshot)
+
+    def _source_fingerprints(self) -> Dict[str, Dict[str, object]]:
+        return {
+            "train_file": source_fingerprint(self.train_file),
+            "reddit_file": source_fingerprint(self.reddit_file),
+        }
+
+    def save_snapshot(self, path: str) -> None:
+        """Writes the loaded state as one binary file of aligned, mmap-able arrays.
+
+        Layout: magic, a little header (JSON: source fingerprints, array sections and
+        their offsets), then each section's raw bytes padded to 8-byte boundaries.
+        """
+        with self._ingest_lock:
+            self._write_snapshot(path)
+
+    def _write_snapshot(self, path: str) -> None:
+        topic_labels = self.topic_matrix.labels
+        example_indptr = array("I", [0])
+        examples: List[str] = []
+        for label in topic_labels:
+            examples.extend(self.topic_examples.get(label, ()))
+            example_indptr.append(len(examples))
+
+        source_ids: Dict[str, int] = {}
+        doc_sources = array("H")
+        for source, _ in self.corpus_texts:
+            doc_sources.append(source_ids.setdefault(source, len(source_ids)))
+
+        vocab = StringTable.from_strings(self.vocab)
+        labels = StringTable.from_strings(topic_labels)
+        example_table = StringTable.from_strings(examples)
+        texts = StringTable.from_strings(text for _, text in self.corpus_texts)
+        index = self._corpus.merged(len(self.vocab))
+        matrix = self._topics.merged(topic_labels, len(self.vocab))
+        sections = {
+            "vocab_offsets": vocab.offsets,
+            "vocab_blob": vocab.blob,
+            "topic_label_offsets": labels.offsets,
+            "topic_label_blob": labels.blob,
+            "topic_frequency": array("I", (self.topic_frequency[label] for label in topic_labels)),
+            "topic_example_indptr": example_indptr,
+            "topic_example_offsets": example_table.offsets,
+            "topic_example_blob": example_table.blob,
+            "topic_indptr": matrix.indptr,
+            "topic_ids": matrix.topic_ids,
+            "topic_counts": matrix.counts,
+            "doc_sources": doc_sources,
+            "text_offsets": texts.offsets,
+            "text_blob": texts.blob,
+            "corpus_indptr": index.indptr,
+            "corpus_doc_ids": index.doc_ids,
+            "corpus_term_freqs": index.term_freqs,
+            "doc_lengths": index.doc_lengths,
+        }
+
+        header: Dict[str, object] = {
+            "version": SNAPSHOT_VERSION,
+            "token_pattern": TOKEN_RE.pattern,
+            "byteorder": sys.byteorder,
+            "sources": self._source_fingerprints(),
+            "source_names": list(source_ids),
+            "avg_doc_length": index.avg_doc_length,
+            "sections": {},
+        }
+        offset = 0
+        for name, data in sections.items():
+            view = memoryview(data)
+            header["sections"][name] = [offset, view.nbytes, view.format]
+            offset += -(-view.nbytes // 8) * 8
+
+        header_bytes = json.dumps(header).encode("utf-8")
+        header_bytes += b" " * (-(len(SNAPSHOT_MAGIC) + 8 + len(header_bytes)) % 8)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as fp:
+            fp.write(SNAPSHOT_MAGIC)
+            fp.write(struct.pack("<Q", len(header_bytes)))
+            fp.write(header_bytes)
+            for data in sections.values():
+                view = memoryview(data)
+                fp.write(view)
+                fp.write(b"\0" * (-view.nbytes % 8))
+        os.replace(tmp_path, path)
+
+    def load_snapshot(self, path: str) -> bool:
+        """Maps a snapshot written by :meth:`save_snapshot` into this store.
+
+        Returns ``False`` (leaving the store untouched) when the file is missing, was
+        written by another format version, or any source CSV's size, mtime or hash no
+        longer matches.
+        """
+        try:
+            fp = open(path, "rb")
+        except FileNotFoundError:
+            return False
+        with fp:
+            if fp.read(len(SNAPSHOT_MAGIC)) != SNAPSHOT_MAGIC:
+                return False
+            (header_len,) = struct.unpack("<Q", fp.read(8))
+            header = json.loads(fp.read(header_len))
+            if (
+                header.get("version") != SNAPSHOT_VERSION
+                or header.get("token_pattern") != TOKEN_RE.pattern
+                or header.get("byteorder") != sys.byteorder
+            ):
+                return False
+            try:
+                if header["sources"] != self._source_fingerprints():
+                    return False
+            except FileNotFoundError:
+                return False
+            data_start = len(SNAPSHOT_MAGIC) + 8 + header_len
+            mapped = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+
+        buffer = memoryview(mapped)
+        arrays = {}
+        for name, (offset, nbytes, typecode) in header["sections"].items():
+            view = buffer[data_start + offset:data_start + offset + nbytes]
+            arrays[name] = view if typecode == "B" else view.cast(typecode)
+
+        vocab_tokens = StringTable(arrays["vocab_offsets"], arrays["vocab_blob"])
+        labels = list(StringTable(arrays["topic_label_offsets"], arrays["topic_label_blob"]))
+        examples = StringTable(arrays["topic_example_offsets"], arrays["topic_example_blob"])
+        example_indptr = arrays["topic_example_indptr"]
+
+        matrix = TopicMatrix()
+        matrix.labels = labels
+        matrix.indptr = arrays["topic_indptr"]
+        matrix.topic_ids = arrays["topic_ids"]
+        matrix.counts = arrays["topic_counts"]
+
+        index = CorpusIndex()
+        index.indptr = arrays["corpus_indptr"]
+        index.doc_ids = arrays["corpus_doc_ids"]
+        index.term_freqs = arrays["corpus_term_freqs"]
+        index.doc_lengths = arrays["doc_lengths"]
+        index.avg_doc_length = header["avg_doc_length"]
+        index.total_length = sum(index.doc_lengths)
+
+        self.vocab = {token: token_id for token_id, token in enumerate(vocab_tokens)}
+        self.topic_matrix = matrix
+        self.corpus_index = index
+        self._topic_ids = {label: topic_id for topic_id, label in enumerate(labels)}
+        self._topics = TopicSegments((matrix,))
+        self._corpus = CorpusSegments((index,))
+        self.corpus_texts = CorpusTexts(
+            header["source_names"],
+            arrays["doc_sources"],
+            StringTable(arrays["text_offsets"], arrays["text_blob"]),
+        )
+        self.topic_frequency = Counter(dict(zip(labels, arrays["topic_frequency"])))
+        self.topic_examples = defaultdict(list)
+        self.topic_token_counts = defaultdict(Counter)
+        for topic_id, label in enumerate(labels):
+            self.topic_examples[label] = examples[example_indptr[topic_id]:example_indptr[topic_id + 1]]
+            self.topic_token_counts[label] = Counter()
+        for token_id, token in zip(range(len(matrix.indptr) - 1), vocab_tokens):
+            start, end = matrix.indptr[token_id], matrix.indptr[token_id + 1]
+            for topic_id, count in zip(matrix.topic_ids[start:end], matrix.counts[start:end]):
+                self.topic_token_counts[labels[topic_id]][token] = count
+        self._snapshot_map = mapped
+        return True
+
+    def _intern_tokens(self, tokens: Iterable[str]) -> Dict[int, int]:
+        """Maps tokens to vocabulary ids (adding unseen ones) and counts them."""
+        vocab = self.vocab
+        counts: Dict[int, int] = {}
+        for token, tf in Counter(tokens).items():
+            token_id = vocab.get(token)
+            if token_id is None:
+                token_id = vocab[token] = len(vocab)
+            counts[token_id] = tf
+        return counts
+
+    def _query_token_ids(self, tokens: Iterable[str]) -> List[int]:
+        vocab = self.vocab
+        return [vocab[token] for token in set(tokens) if token in vocab]
+
+    def _query_token_counts(self, tokens: Iterable[str]) -> Dict[int, int]:
+        vocab = self.vocab
+        return {vocab[token]: count for token, count in Counter(tokens).items() if token in vocab}
 
     def _load_train_topics(self) -> None:
         with self.train_file.open(newline="", encoding="utf-8") as fp:
@@ -68,6 +993,11 @@ class CivicDataStore:
                 self.topic_frequency[topic] += 1
                 self.topic_token_counts[topic].update(tokenize(text))
 
+        interned = {topic: self._intern_tokens(counts.elements()) for topic, counts in self.topic_token_counts.items()}
+        self.topic_matrix = TopicMatrix.build(interned, len(self.vocab))
+        self._topic_ids = {label: topic_id for topic_id, label in enumerate(self.topic_matrix.labels)}
+        self._topics = TopicSegments((self.topic_matrix,))
+
     def _load_corpus_posts(self) -> None:
         with self.reddit_file.open(newline="", encoding="utf-8") as fp:
             reader = csv.DictReader(fp)
@@ -77,38 +1007,436 @@ class CivicDataStore:
                 if text:
                     self.corpus_texts.append((source, text))
 
+        docs = [self._intern_tokens(tokenize(text)) for _, text in self.corpus_texts]
+        self.corpus_index = CorpusIndex.build(docs, len(self.vocab))
+        self._corpus = CorpusSegments((self.corpus_index,))
+
+    def add_posts(self, posts: Iterable[Tuple[str, str]]) -> int:
+        """Adds ``(source, text)`` community posts to the related-post index in place.
+
+        Costs O(size of ``posts``): the new rows become a small postings segment that
+        is published atomically, so concurrent queries see either none or all of them.
+        Returns the number of posts added (empty texts are skipped, as in :meth:`load`).
+        """
+        rows = []
+        for source, text in posts:
+            text = (text or "").strip()
+            if text:
+                rows.append(((source or "unknown").strip().lower(), text))
+        if not rows:
+            return 0
+
+        with self._ingest_lock:
+            delta = PostingsDelta.build([self._intern_tokens(tokenize(text)) for _, text in rows])
+            self.corpus_texts.extend(rows)
+            self._corpus = self._corpus.with_segment(delta)
+        return len(rows)
+
+    def add_training_examples(self, examples: Iterable[Tuple[str, str]]) -> int:
+        """Adds ``(text, topic)`` training rows to the topic model in place.
+
+        New topics get the next topic ids; like :meth:`add_posts` the update is one
+        atomic swap of the topic segments. Returns the number of examples added.
+        """
+        rows = []
+        for text, topic in examples:
+            text = (text or "").strip()
+            if text:
+                rows.append((text, (topic or "Unknown").strip()))
+        if not rows:
+            return 0
+
+        with self._ingest_lock:
+            labels = self.topic_matrix.labels
+            interned = []
+            for text, topic in rows:
+                tokens = tokenize(text)
+                topic_id = self._topic_ids.get(topic)
+                if topic_id is None:
+                    topic_id = self._topic_ids[topic] = len(labels)
+                    labels.append(topic)
+                examples_for_topic = self.topic_examples[topic]
+                if not isinstance(examples_for_topic, list):
+                    examples_for_topic = self.topic_examples[topic] = list(examples_for_topic)
+                examples_for_topic.append(text)
+                self.topic_frequency[topic] += 1
+                self.topic_token_counts[topic].update(tokens)
+                interned.append((topic_id, self._intern_tokens(tokens)))
+            self._topics = self._topics.with_segment(TopicDelta.build(interned))
+        return len(rows)
+
     def infer_topic(self, query: str) -> Tuple[str, float]:
-        query_tokens = tokenize(query)
-        if not query_tokens or not self.topic_examples:
-            return "General civic issue", 0.0
+        return self.infer_topics([query])[0]
+
+    def infer_topics(self, queries: List[str]) -> List[Tuple[str, float]]:
+        """Best topic and confidence for each query, scored as one batch."""
+        return [ranked[0] if ranked else (DEFAULT_TOPIC, 0.0) for ranked in self.rank_topics_batch(queries, top_n=1)]
 
-        best_topic = "General civic issue"
-        best_score = 0.0
+    def rank_topics(self, query: str, top_n: int = 3) -> List[Tuple[str, float]]:
+        """Up to ``top_n`` (topic, score) pairs for ``query``, best first."""
+        return self.rank_topics_batch([query], top_n=top_n)[0]
 
-        query_counter = Counter(query_tokens)
-        for topic, token_counts in self.topic_token_counts.items():
-            overlap = sum((query_counter & token_counts).values())
-            score = overlap / max(1, len(query_tokens))
-            if score > best_score:
-                best_topic = topic
-                best_score = score
+    def rank_topics_batch(self, queries: List[str], top_n: int = 3) -> List[List[Tuple[str, float]]]:
+        return self._rank_topic_tokens([tokenize(query) for query in queries], top_n)
 
-        return best_topic, round(best_score, 3)
+    def _rank_topic_tokens(self, token_lists: List[List[str]], top_n: int) -> List[List[Tuple[str, float]]]:
+        topics = self._topics
+        labels = self.topic_matrix.labels
+        if not labels:
+            return [[] for _ in token_lists]
+
+        scores = topics.score_batch([self._query_token_counts(tokens) for tokens in token_lists])
+        ranked: List[List[Tuple[str, float]]] = []
+        for tokens, topic_scores in zip(token_lists, scores):
+            total = max(1, len(tokens))
+            best = TopicMatrix.top_n(topic_scores, top_n)
+            ranked.append([(labels[topic_id], round(topic_scores[topic_id] / total, 3)) for topic_id in best])
+        return ranked
 
     def find_related_posts(self, query: str, limit: int = 3) -> List[Tuple[str, str]]:
-        query_tokens = set(tokenize(query))
-        if not query_tokens:
-            return []
+        return self.find_related_posts_batch([query], limit=limit)[0]
+
+    def find_related_posts_batch(self, queries: List[str], limit: int = 3) -> List[List[Tuple[str, str]]]:
+        related = self._related_doc_ids([tokenize(query) for query in queries], limit)
+        return [[self.corpus_texts[doc_id] for doc_id in doc_ids] for doc_ids in related]
+
+    def _related_doc_ids(self, token_lists: List[List[str]], limit: int) -> List[List[int]]:
+        if limit <= 0:
+            return [[] for _ in token_lists]
+        scores = self._corpus.score_batch([self._query_token_ids(tokens) for tokens in token_lists], self.scoring)
+        return [CorpusIndex.top_k(doc_scores, limit) for doc_scores in scores]
+
+    def analyze_batch(
+        self, token_lists: List[List[str]], wants_topic: List[bool], related_limit: int
+    ) -> List[Tuple[Optional[Tuple[str, float]], List[int]]]:
+        """Best topic (where requested) and related-post doc ids for pre-tokenized queries."""
+        topic_rows = [idx for idx, wanted in enumerate(wants_topic) if wanted]
+        ranked = self._rank_topic_tokens([token_lists[idx] for idx in topic_rows], top_n=1)
+        topics: List[Optional[Tuple[str, float]]] = [None] * len(token_lists)
+        for idx, best in zip(topic_rows, ranked):
+            topics[idx] = best[0] if best else (DEFAULT_TOPIC, 0.0)
+        return list(zip(topics, self._related_doc_ids(token_lists, related_limit)))
+
+
+class CorpusIngestor:
+    """Feeds new rows from a drop directory into a loaded :class:`CivicDataStore`.
+
+    * ``*.jsonl`` files are tailed: each poll reads the complete lines appended since
+      the last one (from the start again if the file was truncated or rotated). Rows
+      with a ``label_topic`` are training examples, the others community posts
+      (``source``, ``text``).
+    * ``*.csv`` files are read whole once their size and mtime are unchanged across two
+      polls (or at once with ``settled=True``), and again if replaced; a
+      ``label_topic`` column makes them training data, as in ``train.csv``.
+
+    Malformed lines and unreadable files are logged and skipped (counted in
+    ``skipped``), so one bad row cannot stall ingestion.
+    """
+
+    def __init__(self, datastore: CivicDataStore, directory: str):
+        self.datastore = datastore
+        self.directory = Path(directory)
+        self._offsets: Dict[Path, Tuple[int, int]] = {}  # path -> (inode, bytes consumed)
+        self._csv_seen: Dict[Path, Tuple[int, int, int]] = {}  # path -> (inode, size, mtime) last poll
+        self._csv_done: Dict[Path, Tuple[int, int, int]] = {}  # path -> the same, when it was read
+        self.skipped = 0
+
+    def poll(self, settled: bool = False) -> Tuple[int, int]:
+        """Ingests whatever is new; returns ``(posts added, training examples added)``.
+
+        ``settled=True`` reads CSVs without waiting for a second poll, for one-shot runs
+        that will not poll again.
+        """
+        posts: List[Tuple[str, str]] = []
+        examples: List[Tuple[str, str]] = []
+        for path in sorted(self.directory.glob("*.jsonl")):
+            self._tail_jsonl(path, posts, examples)
+        for path in sorted(self.directory.glob("*.csv")):
+            self._read_settled_csv(path, posts, examples, settled)
+        return self.datastore.add_posts(posts), self.datastore.add_training_examples(examples)
+
+    def run(self, stop: threading.Event, interval: float = 5.0) -> None:
+        while not stop.is_set():
+            try:
+                self.poll()
+            except Exception:
+                logger.exception("Ingestion poll of %s failed; retrying in %.0fs", self.directory, interval)
+            stop.wait(interval)
+
+    @staticmethod
+    def _route(row: Dict[str, str], posts: List[Tuple[str, str]], examples: List[Tuple[str, str]]) -> None:
+        if "label_topic" in row:
+            examples.append((row.get("text") or "", row.get("label_topic") or ""))
+        else:
+            posts.append((row.get("source") or "", row.get("text") or ""))
+
+    def _tail_jsonl(self, path: Path, posts: List[Tuple[str, str]], examples: List[Tuple[str, str]]) -> None:
+        with path.open("rb") as fp:
+            stat = os.fstat(fp.fileno())
+            inode, offset = self._offsets.get(path, (stat.st_ino, 0))
+            if inode != stat.st_ino or offset > stat.st_size:  # rotated or truncated
+                offset = 0
+            fp.seek(offset)
+            chunk = fp.read()
+        end = chunk.rfind(b"\n") + 1  # leave a partially written last line for the next poll
+        position = offset
+        for line in chunk[:end].splitlines(keepends=True):
+            start, position = position, position + len(line)
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError:
+                row = None
+            if not isinstance(row, dict):
+                self.skipped += 1
+                logger.warning("Skipping malformed line at byte %d of %s", start, path)
+                continue
+            self._route(row, posts, examples)
+        self._offsets[path] = (stat.st_ino, offset + end)
+
+    def _read_settled_csv(
+        self, path: Path, posts: List[Tuple[str, str]], examples: List[Tuple[str, str]], settled: bool
+    ) -> None:
+        stat = path.stat()
+        signature = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+        if self._csv_done.get(path) == signature:
+            return
+        if not settled and self._csv_seen.get(path) != signature:
+            self._csv_seen[path] = signature
+            return
+        rows: List[Dict[str, str]] = []
+        try:
+            with path.open(newline="", encoding="utf-8") as fp:
+                rows = list(csv.DictReader(fp))
+        except (UnicodeDecodeError, csv.Error) as exc:
+            self.skipped += 1
+            logger.warning("Skipping unreadable CSV %s: %s", path, exc)
+        for row in rows:
+            self._route(row, posts, examples)
+        self._csv_done[path] = signature
+
+
+# Datastore inherited by forked batch workers (see NextGenCivicBot._analyze).
+_WORKER_DATASTORE: Optional[CivicDataStore] = None
+
+
+def _analyze_chunk(chunk: Tuple[List[List[str]], List[bool], int]) -> List[Tuple[Optional[Tuple[str, float]], List[int]]]:
+    token_lists, wants_topic, related_limit = chunk
+    return _WORKER_DATASTORE.analyze_batch(token_lists, wants_topic, related_limit)
+
+
+class FollowUpQueue:
+    """Min-heap of ticket follow-up deadlines with lazy removal of superseded entries."""
+
+    def __init__(self) -> None:
+        self._heap: List[Tuple[datetime, int, str]] = []
+        self._due: Dict[str, datetime] = {}
+        self._order: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._due)
+
+    def schedule(self, ticket_id: str, due: datetime) -> None:
+        """(Re)schedules ``ticket_id``; an earlier pending deadline for it is dropped."""
+        order = self._order.setdefault(ticket_id, len(self._order))
+        self._due[ticket_id] = due
+        heapq.heappush(self._heap, (due, order, ticket_id))
+
+    def cancel(self, ticket_id: str) -> None:
+        self._due.pop(ticket_id, None)
+
+    def next_due(self) -> Optional[datetime]:
+        heap = self._heap
+        while heap and self._due.get(heap[0][2]) != heap[0][0]:
+            heapq.heappop(heap)
+        return heap[0][0] if heap else None
+
+    def pop_due(self, now: datetime) -> List[str]:
+        """Removes and returns the tickets due at ``now``, in scheduling (creation) order."""
+        due: List[Tuple[int, str]] = []
+        heap = self._heap
+        while heap and heap[0][0] <= now:
+            deadline, order, ticket_id = heapq.heappop(heap)
+            if self._due.get(ticket_id) == deadline:
+                del self._due[ticket_id]
+                due.append((order, ticket_id))
+        due.sort()
+        return [ticket_id for _, ticket_id in due]
+
+
+class TicketJournal:
+    """Durable bot state: an append-only event log plus periodic compacted snapshots.
+
+    Events (complaint registrations, follow-up actions, status changes) are JSON
+    lines in ``journal-<first seq>.log`` segments. Writes are buffered and fsynced
+    in groups (every ``fsync_every`` events, or ``fsync_interval`` seconds after the
+    last sync; a timer thread covers idle periods), so a crash can lose at most one
+    unsynced group. Recovery cuts a torn final line off its segment before new events
+    are appended. Every ``snapshot_every`` events the
+    bot state is copied, a new segment is started, and a background thread writes
+    ``snapshot-<seq>.json`` and deletes the segments it covers. Recovery loads the
+    newest snapshot and replays only the events after it.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        fsync_every: int = 64,
+        fsync_interval: float = 1.0,
+        snapshot_every: int = 50_000,
+    ):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self.snapshot_every = snapshot_every
+        self.seq = 0
+        self._events_since_snapshot = 0
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        self._fp = None
+        self._lock = threading.Lock()  # the writer vs the periodic sync thread
+        self._stop = threading.Event()
+        self._sync_thread: Optional[threading.Thread] = None
+        self._snapshot_thread: Optional[threading.Thread] = None
 
-        scored: List[Tuple[int, str, str]] = []
-        for source, text in self.corpus_texts:
-            text_tokens = set(tokenize(text))
-            score = len(query_tokens & text_tokens)
-            if score > 0:
-                scored.append((score, source, text))
+    def _segments(self) -> List[Path]:
+        return sorted(self.directory.glob("journal-*.log"))
 
-        scored.sort(key=lambda item: item[0], reverse=True)
-        return [(source, text) for _, source, text in scored[:limit]]
+    def _snapshots(self) -> List[Path]:
+        return sorted(self.directory.glob("snapshot-*.json"))
+
+    def load(self) -> Tuple[Optional[Dict[str, object]], List[Dict[str, object]]]:
+        """Latest snapshot (or ``None``) and the logged events that follow it, in order."""
+        state = None
+        for path in reversed(self._snapshots()):
+            try:
+                state = json.loads(path.read_text(encoding="utf-8"))
+                break
+            except ValueError:
+                continue  # a snapshot torn by a crash; fall back to the previous one
+        base_seq = state["seq"] if state else 0
+
+        events: List[Dict[str, object]] = []
+        for segment in self._segments():
+            events.extend(event for event in self._read_segment(segment) if event["seq"] > base_seq)
+        self.seq = events[-1]["seq"] if events else base_seq
+        return state, events
+
+    def _read_segment(self, segment: Path) -> List[Dict[str, object]]:
+        """Events in ``segment``. A torn final write is cut off the file, so a segment
+        reopened for appending never continues a partial line."""
+        data = segment.read_bytes()
+        events = []
+        offset = 0
+        line_no = 0
+        while offset < len(data):
+            line_no += 1
+            end = data.find(b"\n", offset)
+            next_offset = len(data) if end < 0 else end + 1
+            try:
+                event = json.loads(data[offset:next_offset])
+            except ValueError:
+                if next_offset < len(data):
+                    raise ValueError(f"Corrupt journal entry in {segment}:{line_no}")
+                self._repair(segment, offset, b"")
+                break
+            if end < 0:
+                self._repair(segment, len(data), b"\n")  # complete event, newline not written
+            events.append(event)
+            offset = next_offset
+        return events
+
+    @staticmethod
+    def _repair(segment: Path, size: int, tail: bytes) -> None:
+        with segment.open("r+b") as fp:
+            fp.truncate(size)
+            fp.seek(size)
+            fp.write(tail)
+            fp.flush()
+            os.fsync(fp.fileno())
+
+    def open(self) -> None:
+        """Starts a fresh segment for new events (call after :meth:`load`)."""
+        self._fp = (self.directory / f"journal-{self.seq + 1:012d}.log").open("a", encoding="utf-8")
+        if self.fsync_interval > 0 and self._sync_thread is None:
+            self._stop.clear()
+            self._sync_thread = threading.Thread(target=self._sync_periodically, daemon=True)
+            self._sync_thread.start()
+
+    def _sync_periodically(self) -> None:
+        """Syncs a group left pending by an idle writer once it is ``fsync_interval`` old."""
+        while not self._stop.wait(self.fsync_interval):
+            if time.monotonic() - self._last_sync >= self.fsync_interval:
+                self.sync()
+
+    def append(self, event: Dict[str, object]) -> None:
+        with self._lock:
+            self.seq += 1
+            event["seq"] = self.seq
+            self._fp.write(json.dumps(event, separators=(",", ":")) + "\n")
+            self._events_since_snapshot += 1
+            self._unsynced += 1
+            due = self._unsynced >= self.fsync_every or time.monotonic() - self._last_sync >= self.fsync_interval
+        if due:
+            self.sync()
+
+    def sync(self) -> None:
+        with self._lock:
+            if self._fp is None or not self._unsynced:
+                return
+            self._fp.flush()
+            os.fsync(self._fp.fileno())
+            self._unsynced = 0
+            self._last_sync = time.monotonic()
+
+    def snapshot_due(self) -> bool:
+        return self._events_since_snapshot >= self.snapshot_every
+
+    def snapshot(self, state: Dict[str, object]) -> None:
+        """Rolls to a new segment and writes ``state`` (a private copy) in the background."""
+        self.wait_for_snapshot()
+        self.sync()
+        with self._lock:
+            self._fp.close()
+            state["seq"] = self.seq
+            self._events_since_snapshot = 0
+            self.open()
+        self._snapshot_thread = threading.Thread(target=self._write_snapshot, args=(state,), daemon=True)
+        self._snapshot_thread.start()
+
+    def _write_snapshot(self, state: Dict[str, object]) -> None:
+        seq = state["seq"]
+        path = self.directory / f"snapshot-{seq:012d}.json"
+        tmp_path = path.with_suffix(".tmp")
+        with tmp_path.open("w", encoding="utf-8") as fp:
+            json.dump(state, fp, separators=(",", ":"), default=list)
+            fp.flush()
+            os.fsync(fp.fileno())
+        os.replace(tmp_path, path)
+        for old in self._snapshots():
+            if old != path:
+                old.unlink()
+        for segment in self._segments():
+            if int(segment.stem.split("-")[1]) <= seq:
+                segment.unlink()
+
+    def wait_for_snapshot(self) -> None:
+        if self._snapshot_thread is not None:
+            self._snapshot_thread.join()
+            self._snapshot_thread = None
+
+    def close(self) -> None:
+        self.wait_for_snapshot()
+        if self._sync_thread is not None:
+            self._stop.set()
+            self._sync_thread.join()
+            self._sync_thread = None
+        if self._fp is not None:
+            self.sync()
+            self._fp.close()
+            self._fp = None
 
 
 class NextGenCivicBot:
@@ -118,29 +1446,56 @@ class NextGenCivicBot:
         self.datastore = datastore
         self.predictive_threshold = predictive_threshold
         self.escalation_threshold = escalation_threshold
-        self.complaints_by_key: Dict[Tuple[str, str], List[Complaint]] = defaultdict(list)
+        self.complaints = ComplaintStore()  # complaint id -> complaint
+        self.complaints_by_key: Dict[Tuple[str, str], array] = defaultdict(lambda: array("I"))
         self.tickets: Dict[str, Ticket] = {}
+        self._open_tickets: Dict[Tuple[str, str], str] = {}  # (ward, issue) -> open ticket id
+        self._follow_ups = FollowUpQueue()
         self._ticket_counter = 1
+        self.journal: Optional[TicketJournal] = None
 
     def register_query(self, user_id: str, ward: str, query: str) -> Dict[str, object]:
-        inferred_topic, confidence = self.datastore.infer_topic(query)
-        complaint = Complaint(
-            user_id=user_id,
-            ward=ward,
-            issue_type=inferred_topic,
-            description=query,
-        )
-        return self.register_complaint(complaint, confidence=confidence)
+        return self.register_queries([(user_id, ward, query)])[0]
+
+    def register_queries(self, items: Iterable[Tuple[str, str, str]], workers: int = 1) -> List[Dict[str, object]]:
+        """Registers ``(user_id, ward, query)`` items in order, analysing them as one batch.
+
+        Topic and related-post scoring may fan out to ``workers`` processes; tickets are
+        always assigned sequentially, so IDs and counts match one-by-one registration.
+        """
+        items = list(items)
+        analyses = self._analyze([query for _, _, query in items], [True] * len(items), workers)
+        results = []
+        for (user_id, ward, query), (topic, doc_ids) in zip(items, analyses):
+            inferred_topic, confidence = topic
+            complaint = Complaint(
+                user_id=user_id,
+                ward=ward,
+                issue_type=inferred_topic,
+                description=query,
+            )
+            related_posts = [self.datastore.corpus_texts[doc_id] for doc_id in doc_ids]
+            results.append(self._record_complaint(complaint, confidence, related_posts))
+        return results
 
     def register_complaint(self, complaint: Complaint, confidence: float = 1.0) -> Dict[str, object]:
-        key = (complaint.ward, complaint.issue_type)
-        self.complaints_by_key[key].append(complaint)
+        related_posts = self.datastore.find_related_posts(complaint.description, limit=RELATED_CONTEXT_LIMIT)
+        return self._record_complaint(complaint, confidence, related_posts)
 
-        ticket_id = self._ensure_ticket(key)
-        related_posts = self.datastore.find_related_posts(complaint.description, limit=2)
+    @property
+    def pools(self) -> StringPools:
+        """This bot's string pools (shared by its complaint store and tickets)."""
+        return self.complaints.pools
 
+    def _record_complaint(
+        self,
+        complaint: Complaint,
+        confidence: float,
+        related_posts: List[Tuple[str, str]],
+    ) -> Dict[str, object]:
+        key = (complaint.ward, complaint.issue_type)
         return {
-            "ticket": ticket_id,
+            "ticket": self.add_complaint(complaint),
             "topic": complaint.issue_type,
             "topic_confidence": confidence,
             "predictive_alert": self._predictive_alert_message(key),
@@ -148,18 +1503,83 @@ class NextGenCivicBot:
             "related_context": related_posts,
         }
 
+    def add_complaint(self, complaint: Complaint, opened_at: Optional[datetime] = None) -> str:
+        """Files an already classified complaint (no scoring or alerts); returns its ticket id.
+
+        A new ticket is opened at ``opened_at`` (default now) when the complaint's ward
+        and issue have no open ticket.
+        """
+        key = (complaint.ward, complaint.issue_type)
+        complaint_id = len(self.complaints)
+        self.complaints.append(complaint)
+        self.complaints_by_key[key].append(complaint_id)
+
+        ticket_count = self._ticket_counter
+        ticket_id = self._ensure_ticket(key, complaint_id, opened_at)
+        if self.journal is not None:
+            self._journal(
+                {
+                    "op": "complaint",
+                    "user": complaint.user_id,
+                    "ward": complaint.ward,
+                    "issue": complaint.issue_type,
+                    "text": complaint.description,
+                    "at": complaint._created,
+                    "opened_at": self.tickets[ticket_id]._created if self._ticket_counter != ticket_count else None,
+                }
+            )
+        return ticket_id
+
     def respond(self, user_id: str, ward: str, query: str) -> str:
-        lower_query = query.lower()
+        return self.respond_many([(user_id, ward, query)])[0]
+
+    def respond_many(self, items: Iterable[Tuple[str, str, str]], workers: int = 1) -> List[str]:
+        """Batch version of :meth:`respond`; replies come back in input order.
+
+        Scoring for the whole batch happens up front (optionally in ``workers``
+        processes); status lookups and ticket updates are then applied in order.
+        """
+        items = list(items)
+        kinds = [self._query_kind(query.lower()) for _, _, query in items]
+        analyses = self._analyze(
+            [query if kind != "status" else "" for (_, _, query), kind in zip(items, kinds)],
+            [kind == "complaint" for kind in kinds],
+            workers,
+        )
+        return [
+            self._respond_analyzed(user_id, ward, query, kind, analysis)
+            for (user_id, ward, query), kind, analysis in zip(items, kinds, analyses)
+        ]
 
+    @staticmethod
+    def _query_kind(lower_query: str) -> str:
         if "status" in lower_query and "tkt-" in lower_query:
-            ticket_id = self._extract_ticket_id(lower_query)
+            return "status"
+        if any(word in lower_query for word in COMPLAINT_KEYWORDS):
+            return "complaint"
+        return "chat"
+
+    def _respond_analyzed(
+        self,
+        user_id: str,
+        ward: str,
+        query: str,
+        kind: str,
+        analysis: Tuple[Optional[Tuple[str, float]], List[int]],
+    ) -> str:
+        if kind == "status":
+            ticket_id = self._extract_ticket_id(query.lower())
             if ticket_id and ticket_id in self.tickets:
                 ticket = self.tickets[ticket_id]
                 return f"{ticket_id} is {ticket.status}. Last action: {ticket.last_action}."
             return "I could not find that ticket ID."
 
-        if any(word in lower_query for word in ["complaint", "issue", "problem", "report", "water", "garbage", "road"]):
-            data = self.register_query(user_id=user_id, ward=ward, query=query)
+        topic, doc_ids = analysis
+        related_posts = [self.datastore.corpus_texts[doc_id] for doc_id in doc_ids]
+        if kind == "complaint":
+            inferred_topic, confidence = topic
+            complaint = Complaint(user_id=user_id, ward=ward, issue_type=inferred_topic, description=query)
+            data = self._record_complaint(complaint, confidence, related_posts)
             lines = [
                 f"Ticket {data['ticket']} created for topic: {data['topic']} (confidence={data['topic_confidence']}).",
                 str(data["predictive_alert"]),
@@ -172,24 +1592,46 @@ class NextGenCivicBot:
                     lines.append(f"- [{source}] {text[:120]}")
             return "\n".join(lines)
 
-        suggestions = self.datastore.find_related_posts(query, limit=2)
-        if suggestions:
-            bullets = "\n".join([f"- [{s}] {t[:120]}" for s, t in suggestions])
+        if related_posts:
+            bullets = "\n".join([f"- [{s}] {t[:120]}" for s, t in related_posts])
             return f"I did not detect a complaint, but here are related civic discussions:\n{bullets}"
 
         return "Please share issue details (what happened + area/ward) and I will create a civic ticket."
 
+    def _analyze(
+        self, queries: List[str], wants_topic: List[bool], workers: int
+    ) -> List[Tuple[Optional[Tuple[str, float]], List[int]]]:
+        """Tokenizes once and scores topics/related posts for a batch of queries.
+
+        With ``workers > 1`` the batch is split across forked processes, which share
+        the already-loaded datastore copy-on-write; chunk results keep input order.
+        """
+        token_lists = [tokenize(query) for query in queries]
+        if workers <= 1 or len(queries) < 2 or "fork" not in multiprocessing.get_all_start_methods():
+            return self.datastore.analyze_batch(token_lists, wants_topic, RELATED_CONTEXT_LIMIT)
+
+        global _WORKER_DATASTORE
+        _WORKER_DATASTORE = self.datastore
+        step = -(-len(queries) // workers)
+        chunks = [
+            (token_lists[start:start + step], wants_topic[start:start + step], RELATED_CONTEXT_LIMIT)
+            for start in range(0, len(queries), step)
+        ]
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("fork")) as pool:
+            return [analysis for chunk in pool.map(_analyze_chunk, chunks) for analysis in chunk]
+
     def _extract_ticket_id(self, text: str) -> Optional[str]:
         match = re.search(r"tkt-\d{4}", text)
         return match.group(0).upper() if match else None
 
-    def _ensure_ticket(self, key: Tuple[str, str]) -> str:
-        ward, issue = key
-        for ticket in self.tickets.values():
-            if ticket.ward == ward and ticket.issue_type == issue and ticket.status == "open":
-                ticket.complaints.append(self.complaints_by_key[key][-1])
-                return ticket.ticket_id
+    def _ensure_ticket(self, key: Tuple[str, str], complaint_id: int, opened_at: Optional[datetime] = None) -> str:
+        ticket_id = self._open_tickets.get(key)
+        ticket = self.tickets.get(ticket_id) if ticket_id else None
+        if ticket is not None and ticket.status == "open":
+            ticket.complaint_ids.append(complaint_id)
+            return ticket.ticket_id
 
+        ward, issue = key
         ticket_id = f"TKT-{self._ticket_counter:04d}"
         self._ticket_counter += 1
 
@@ -197,11 +1639,141 @@ class NextGenCivicBot:
             ticket_id=ticket_id,
             ward=ward,
             issue_type=issue,
-            complaints=list(self.complaints_by_key[key]),
+            complaint_ids=[complaint_id],
+            created_at=opened_at,
+            store=self.complaints,
         )
         self.tickets[ticket_id] = ticket
+        self._open_tickets[key] = ticket_id
+        self._schedule_follow_up(ticket, ticket.created_at)
         return ticket_id
 
+    def ticket_complaints(self, ticket_id: str) -> List[Complaint]:
+        return self.tickets[ticket_id].complaints
+
+    def set_ticket_status(self, ticket_id: str, status: str, now: Optional[datetime] = None) -> None:
+        """Changes a ticket's status, keeping the open-ticket index in step."""
+        ticket = self.tickets[ticket_id]
+        if status == ticket.status:
+            return
+        now = now or datetime.utcnow()
+        ticket.status = status
+        ticket.last_action = f"Status changed to {status}"
+        ticket.action_log.append((now, ticket.last_action))
+        if self.journal is not None:
+            self._journal({"op": "status", "ticket": ticket_id, "status": status, "at": to_epoch(now)})
+
+        key = (ticket.ward, ticket.issue_type)
+        if status == "open":
+            current = self.tickets.get(self._open_tickets.get(key, ""))
+            if current is None or current.status != "open":
+                self._open_tickets[key] = ticket_id
+            self._schedule_follow_up(ticket, now)
+            return
+
+        self._follow_ups.cancel(ticket_id)
+        if self._open_tickets.get(key) == ticket_id:
+            del self._open_tickets[key]
+
+    def attach_journal(self, journal: TicketJournal) -> int:
+        """Recovers state from ``journal`` (snapshot + log tail) and logs to it from now on.
+
+        Returns the number of replayed log events.
+        """
+        state, events = journal.load()
+        if state is not None:
+            self._restore_state(state)
+        for event in events:
+            self._apply_event(event)
+        for ticket in self.tickets.values():
+            if ticket.status == "open":
+                self._schedule_follow_up(ticket, from_epoch(ticket._action_times[-1]))
+        journal.open()
+        self.journal = journal
+        return len(events)
+
+    def _journal(self, event: Dict[str, object]) -> None:
+        self.journal.append(event)
+        if self.journal.snapshot_due():
+            self.journal.snapshot(self.export_state())
+
+    def _apply_event(self, event: Dict[str, object]) -> None:
+        op = event["op"]
+        if op == "complaint":
+            complaint = Complaint(event["user"], event["ward"], event["issue"], event["text"], from_epoch(event["at"]))
+            opened_at = event.get("opened_at")
+            self.add_complaint(complaint, from_epoch(opened_at) if opened_at is not None else None)
+        elif op == "action":
+            ticket = self.tickets[event["ticket"]]
+            ticket.last_action = event["action"]
+            ticket.action_log.append((from_epoch(event["at"]), event["action"]))
+        elif op == "status":
+            self.set_ticket_status(event["ticket"], event["status"], from_epoch(event["at"]))
+        else:
+            raise ValueError(f"Unknown journal event {op!r}")
+
+    def export_state(self) -> Dict[str, object]:
+        """Copy of all ticket/complaint state; pool ids refer to the ``pools`` lists."""
+        complaints = self.complaints
+        return {
+            "ticket_counter": self._ticket_counter,
+            "pools": complaints.pools.to_state(),
+            "complaints": {
+                "user_ids": array("I", complaints.user_ids),
+                "wards": array("I", complaints.wards),
+                "issues": array("I", complaints.issues),
+                "created": array("q", complaints.created),
+                "descriptions": list(complaints.descriptions),
+            },
+            "tickets": [
+                [
+                    t.ticket_id,
+                    t._ward,
+                    t._issue,
+                    array("I", t.complaint_ids),
+                    t._created,
+                    t._status,
+                    t._last_action,
+                    array("q", t._action_times),
+                    array("H", t._action_ids),
+                ]
+                for t in self.tickets.values()
+            ],
+        }
+
+    def _restore_state(self, state: Dict[str, object]) -> None:
+        pools = StringPools.from_state(state["pools"])
+        columns = state["complaints"]
+        store = ComplaintStore(pools)
+        store.user_ids = array("I", columns["user_ids"])
+        store.wards = array("I", columns["wards"])
+        store.issues = array("I", columns["issues"])
+        store.created = array("q", columns["created"])
+        store.descriptions = columns["descriptions"]
+        self.complaints = store
+        self.complaints_by_key = defaultdict(lambda: array("I"))
+        for complaint_id, (ward, issue) in enumerate(zip(store.wards, store.issues)):
+            self.complaints_by_key[(pools.wards.value(ward), pools.topics.value(issue))].append(complaint_id)
+
+        self.tickets = {}
+        self._open_tickets = {}
+        for ticket_id, ward, issue, complaint_ids, created, status, last_action, times, action_ids in state["tickets"]:
+            ticket = Ticket.__new__(Ticket)
+            ticket.ticket_id = ticket_id
+            ticket._store = store
+            ticket._ward = ward
+            ticket._issue = issue
+            ticket.complaint_ids = array("I", complaint_ids)
+            ticket._created = created
+            ticket._status = status
+            ticket._last_action = last_action
+            ticket._action_times = array("q", times)
+            ticket._action_ids = array("H", action_ids)
+            self.tickets[ticket_id] = ticket
+            if ticket.status == "open":
+                self._open_tickets[(ticket.ward, ticket.issue_type)] = ticket_id
+        self._ticket_counter = state["ticket_counter"]
+
     def _predictive_alert_message(self, key: Tuple[str, str]) -> str:
         ward, issue = key
         count = len(self.complaints_by_key[key])
@@ -230,10 +1802,16 @@ class NextGenCivicBot:
         )
 
     def run_follow_up_cycle(self, now: Optional[datetime] = None) -> List[str]:
+        """Applies the follow-up schedule to open tickets whose next deadline has passed.
+
+        Only due tickets are touched. ``now`` is expected not to move backwards
+        between calls.
+        """
         now = now or datetime.utcnow()
         updates: List[str] = []
 
-        for ticket in self.tickets.values():
+        for ticket_id in self._follow_ups.pop_due(now):
+            ticket = self.tickets[ticket_id]
             if ticket.status != "open":
                 continue
 
@@ -244,51 +1822,152 @@ class NextGenCivicBot:
                 ticket.last_action = next_action
                 ticket.action_log.append((now, next_action))
                 updates.append(f"{ticket.ticket_id}: {next_action}")
+                if self.journal is not None:
+                    self._journal({"op": "action", "ticket": ticket_id, "action": next_action, "at": to_epoch(now)})
+            self._schedule_follow_up(ticket, now)
 
         return updates
 
+    def next_follow_up_at(self) -> Optional[datetime]:
+        """Earliest pending follow-up deadline, or ``None`` when nothing is scheduled."""
+        return self._follow_ups.next_due()
+
+    def serve_follow_ups(
+        self,
+        stop: threading.Event,
+        on_updates=print,
+        max_sleep: float = 3600.0,
+        lock: Optional[threading.Lock] = None,
+    ) -> None:
+        """Runs follow-up cycles until ``stop`` is set, sleeping until the next deadline.
+
+        ``max_sleep`` bounds each wait so tickets created meanwhile are picked up;
+        ``lock`` (if given) is held around each cycle for callers sharing the bot.
+        """
+        lock = lock or threading.Lock()
+        while not stop.is_set():
+            with lock:
+                now = datetime.utcnow()
+                updates = self.run_follow_up_cycle(now)
+                next_due = self.next_follow_up_at()
+            if updates:
+                on_updates(updates)
+            delay = max_sleep if next_due is None else (next_due - now).total_seconds()
+            stop.wait(min(max(delay, 0.0), max_sleep))
+
+    def _schedule_follow_up(self, ticket: Ticket, now: datetime) -> None:
+        """Queues the ticket for the next sweep at or after ``now`` that can act on it.
+
+        That is ``now`` itself while its current stage's action is still pending (a
+        reopened ticket, whose last action is the status change), else the next stage
+        boundary.
+        """
+        days_open = (now - ticket.created_at).days
+        current = self._scheduled_action(days_open)
+        if current is not None and current != ticket.last_action:
+            self._follow_ups.schedule(ticket.ticket_id, now)
+            return
+        upcoming = [days for days, _ in FOLLOW_UP_SCHEDULE if days > days_open]
+        if upcoming:
+            self._follow_ups.schedule(ticket.ticket_id, ticket.created_at + timedelta(days=min(upcoming)))
+
     @staticmethod
     def _scheduled_action(days_open: int) -> Optional[str]:
-        if days_open >= 5:
-            return "Public alert issued"
-        if days_open >= 3:
-            return "Escalated to higher authority"
-        if days_open >= 2:
-            return "Reminder sent"
-        if days_open >= 1:
-            return "Ticket created"
+        for days, action in FOLLOW_UP_SCHEDULE:
+            if days_open >= days:
+                return action
         return None
 
 
+def read_batch_file(path: str, default_user: str, default_ward: str) -> Iterable[Tuple[str, str, str]]:
+    """Yields ``(user_id, ward, query)`` from a JSONL file.
+
+    The query is taken from the first of ``query``, ``text``, ``message`` or ``body``;
+    missing user/ward fields fall back to the CLI defaults.
+    """
+    with open(path, encoding="utf-8") as fp:
+        for line in fp:
+            if not line.strip():
+                continue
+            row = json.loads(line)
+            query = next((str(row[key]) for key in ("query", "text", "message", "body") if row.get(key)), "")
+            yield str(row.get("user_id") or row.get("user") or default_user), str(row.get("ward") or default_ward), query
+
+
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Data-backed Next-Gen Civic Bot demo")
     parser.add_argument("--query", default="", help="single query to process")
     parser.add_argument("--user", default="demo_user", help="user id")
     parser.add_argument("--ward", default="12", help="ward number")
     parser.add_argument("--interactive", action="store_true", help="start interactive chat loop")
+    parser.add_argument("--scoring", choices=SCORING_MODES, default="bm25", help="related-post ranking")
+    parser.add_argument("--snapshot", default="", help="binary datastore snapshot to load (rebuilt when stale)")
+    parser.add_argument("--follow-up-daemon", action="store_true", help="run follow-ups in the background (interactive)")
+    parser.add_argument("--batch-file", default="", help="JSONL of queries to answer in one batch")
+    parser.add_argument("--workers", type=int, default=1, help="worker processes for --batch-file scoring")
+    parser.add_argument("--journal", default="", help="directory for the durable ticket journal (recovered on start)")
+    parser.add_argument("--top-topics", type=int, default=0, help="also print the N best topics for --query")
+    parser.add_argument("--ingest-dir", default="", help="directory of new .jsonl/.csv rows to add without reloading")
     return parser.parse_args()
 
 
 def main() -> None:
     args = parse_args()
 
-    datastore = CivicDataStore()
-    datastore.load()
+    datastore = CivicDataStore(scoring=args.scoring)
+    datastore.load(snapshot=args.snapshot or None)
     bot = NextGenCivicBot(datastore, predictive_threshold=3, escalation_threshold=5)
 
+    journal = None
+    if args.journal:
+        journal = TicketJournal(args.journal)
+        replayed = bot.attach_journal(journal)
+        print(f"Recovered {len(bot.tickets)} tickets ({replayed} journal events replayed).")
+    try:
+        run_cli(args, datastore, bot)
+    finally:
+        if journal is not None:
+            journal.close()
+
+
+def run_cli(args: argparse.Namespace, datastore: CivicDataStore, bot: NextGenCivicBot) -> None:
+    ingestor = CorpusIngestor(datastore, args.ingest_dir) if args.ingest_dir else None
+    if ingestor is not None:
+        # Only the interactive loop polls again, so other modes take CSVs as they are now.
+        posts, examples = ingestor.poll(settled=not args.interactive)
+        print(f"Ingested {posts} posts and {examples} training examples from {args.ingest_dir}.")
+
+    if args.batch_file:
+        items = list(read_batch_file(args.batch_file, args.user, args.ward))
+        for (user_id, ward, query), reply in zip(items, bot.respond_many(items, workers=args.workers)):
+            print(json.dumps({"user_id": user_id, "ward": ward, "query": query, "response": reply}))
+        return
+
     if args.query:
+        if args.top_topics > 0:
+            print("Top topics:", datastore.rank_topics(args.query, top_n=args.top_topics))
         print(bot.respond(args.user, args.ward, args.query))
         print("Follow-up cycle (after 5 days):")
         print(bot.run_follow_up_cycle(datetime.utcnow() + timedelta(days=5)))
         return
 
     if args.interactive:
+        lock = threading.Lock()
+        stop = threading.Event()
+        if args.follow_up_daemon:
+            threading.Thread(target=bot.serve_follow_ups, args=(stop,), kwargs={"lock": lock}, daemon=True).start()
+        if ingestor is not None:
+            threading.Thread(target=ingestor.run, args=(stop,), daemon=True).start()
         print("Next-Gen Civic Bot is ready. Type 'exit' to stop.")
-        while True:
-            query = input("> ").strip()
-            if query.lower() in {"exit", "quit"}:
-                break
-            print(bot.respond(args.user, args.ward, query))
+        try:
+            while True:
+                query = input("> ").strip()
+                if query.lower() in {"exit", "quit"}:
+                    break
+                with lock:
+                    print(bot.respond(args.user, args.ward, query))
+        finally:
+            stop.set()
         return
 
     sample_queries = [
@@ -1,11 +1,16 @@
+import argparse
+import hashlib
 import os
+import shutil
 import pandas as pd
 import torch
 
-from datasets import Dataset
+import transformers
+from datasets import Dataset, DatasetDict, load_from_disk
 from transformers import (
     AutoTokenizer,
     AutoModelForSequenceClassification,
+    DataCollatorWithPadding,
     TrainingArguments,
     Trainer
 )
@@ -17,11 +22,27 @@ import joblib
 
 # ---------------- CONFIG ----------------
 
-MODEL_NAME = "intfloat/e5-base-v2"
-DATA_FILE = "train_topic_data.csv"
-OUT_DIR = "models/e5_topic_classifier"
+parser = argparse.ArgumentParser(description="Fine-tune E5 on train_topic_data.csv (CPU friendly).")
+parser.add_argument("--model-name", default="intfloat/e5-base-v2")
+parser.add_argument("--data-file", default="train_topic_data.csv")
+parser.add_argument("--out-dir", default="models/e5_topic_classifier")
+parser.add_argument("--epochs", type=float, default=2)
+parser.add_argument("--batch-size", type=int, default=32)
+parser.add_argument("--eval-batch-size", type=int, default=16)
+parser.add_argument("--max-length", type=int, default=128)
+parser.add_argument("--threads", type=int, default=0, help="torch intra-op threads (0 = all cores)")
+parser.add_argument("--workers", type=int, default=min(4, os.cpu_count() or 1), help="tokenization / data loader processes")
+parser.add_argument("--cache-dir", default=".cache/e5_tokens", help="tokenized dataset cache ('' disables)")
+args = parser.parse_args()
+
+MODEL_NAME = args.model_name
+DATA_FILE = args.data_file
+OUT_DIR = args.out_dir
+TEST_SIZE = 0.2
+SPLIT_SEED = 42
 
 os.makedirs(OUT_DIR, exist_ok=True)
+torch.set_num_threads(args.threads or os.cpu_count() or 1)
 
 
 # ---------------- LOAD DATA ----------------
@@ -51,8 +72,8 @@ print("Number of classes:", num_labels)
 X_train, X_test, y_train, y_test = train_test_split(
     texts,
     labels_encoded,
-    test_size=0.2,
-    random_state=42,
+    test_size=TEST_SIZE,
+    random_state=SPLIT_SEED,
     stratify=labels_encoded
 )
 
@@ -68,44 +89,67 @@ tokenizer = AutoTokenizer.from_pretrained(MODEL_NAME)
 
 
 def tokenize(batch):
-    return tokenizer(
+    # No padding here: the collator pads each batch to its own longest example, and
+    # most rows are short category strings.
+    encoded = tokenizer(
         batch["text"],
-        padding="max_length",
         truncation=True,
-        max_length=128
+        max_length=args.max_length,
+        return_token_type_ids=False
     )
+    encoded["length"] = [len(ids) for ids in encoded["input_ids"]]
+    return encoded
 
 
-# ---------------- HF DATASET ----------------
+# ---------------- HF DATASET (cached) ----------------
 
-train_df = pd.DataFrame({
-    "text": X_train,
-    "label": y_train
-})
-
-test_df = pd.DataFrame({
-    "text": X_test,
-    "label": y_test
-})
-
-
-train_ds = Dataset.from_pandas(train_df)
-test_ds = Dataset.from_pandas(test_df)
-
-
-train_ds = train_ds.map(tokenize, batched=True)
-test_ds = test_ds.map(tokenize, batched=True)
-
-
-train_ds.set_format(
-    "torch",
-    columns=["input_ids", "attention_mask", "label"]
-)
-
-test_ds.set_format(
-    "torch",
-    columns=["input_ids", "attention_mask", "label"]
-)
+# The cache key covers everything the tokenized rows depend on: the CSV bytes, the
+# tokenizer and its settings, and the split.
+digest = hashlib.sha256()
+with open(DATA_FILE, "rb") as fp:
+    for block in iter(lambda: fp.read(1 << 20), b""):
+        digest.update(block)
+digest.update(repr((
+    MODEL_NAME,
+    type(tokenizer).__name__,
+    len(tokenizer),
+    args.max_length,
+    transformers.__version__,
+    list(le.classes_),
+    TEST_SIZE,
+    SPLIT_SEED,
+)).encode("utf-8"))
+cache_path = os.path.join(args.cache_dir, digest.hexdigest()[:16]) if args.cache_dir else None
+
+if cache_path and os.path.isdir(cache_path):
+    print("Loading tokenized dataset from", cache_path)
+    tokenized = load_from_disk(cache_path)
+else:
+    train_df = pd.DataFrame({
+        "text": X_train,
+        "label": y_train
+    })
+
+    test_df = pd.DataFrame({
+        "text": X_test,
+        "label": y_test
+    })
+
+    tokenized = DatasetDict({
+        "train": Dataset.from_pandas(train_df),
+        "test": Dataset.from_pandas(test_df),
+    }).map(tokenize, batched=True, remove_columns=["text"], num_proc=args.workers if args.workers > 1 else None)
+
+    if cache_path:
+        shutil.rmtree(cache_path + ".tmp", ignore_errors=True)  # left by an interrupted run
+        tokenized.save_to_disk(cache_path + ".tmp")
+        os.replace(cache_path + ".tmp", cache_path)
+        print("Cached tokenized dataset in", cache_path)
+
+train_ds = tokenized["train"]
+test_ds = tokenized["test"]
+
+data_collator = DataCollatorWithPadding(tokenizer)
 
 
 # ---------------- LOAD MODEL ----------------
@@ -147,10 +191,17 @@ training_args = TrainingArguments(
 
     learning_rate=2e-5,
 
-    per_device_train_batch_size=32,
-    per_device_eval_batch_size=16,
+    per_device_train_batch_size=args.batch_size,
+    per_device_eval_batch_size=args.eval_batch_size,
+
+    num_train_epochs=args.epochs,
+
+    # Batches of similar length, padded per batch by the collator.
+    group_by_length=True,
+    length_column_name="length",
 
-    num_train_epochs=2,
+    dataloader_num_workers=args.workers,
+    dataloader_persistent_workers=args.workers > 0,
 
 
     weight_decay=0.01,
@@ -172,7 +223,8 @@ trainer = Trainer(
     model=model,
     args=training_args,
     train_dataset=train_ds,
-    eval_dataset=test_ds
+    eval_dataset=test_ds,
+    data_collator=data_collator
 )
 
 